@@ -0,0 +1,773 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import struct
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+import exe
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+BENCH_API_KEYS = {"newsapi": "bench", "cryptocompare": "bench"}
+BENCH_RATES = [100, 1000, 5000, 20000]
+BENCH_DURATION = 5.0
+BENCH_DRAIN = 1.0
+BENCH_FRAME_POOL = 10000
+BENCH_SEND_INTERVAL = 0.005
+BENCH_QUEUE_SAMPLE_MS = 50
+BENCH_OUTPUT = "bench_results.json"
+BENCH_GAP_TRADES = 200
+BENCH_GAP_TRADE_ID = 10 ** 9
+BENCH_RECONNECT_TIMEOUT = 10.0
+BENCH_RATE_LIMIT = {"per_minute": 600000, "burst": 10000}
+BENCH_NEWS_REQUESTS = 6
+PRODUCTION_RATE_LIMITS = {provider: dict(config) for provider, config in exe.RATE_LIMITS.items()}
+BENCH_DEPTH_LEVELS = 1000
+BENCH_DEPTH_EVENTS = 5000
+BENCH_DEPTH_EVENT_LEVELS = 20
+BENCH_HUB_SUBSCRIBERS = 8
+BENCH_HUB_TICKS = 20000
+BENCH_HUB_TIMEOUT = 30.0
+BENCH_ARCHIVE_DAYS = 730
+BENCH_ARCHIVE_READ_DAYS = [1, 30, 365]
+
+def encode_frame(payload, opcode=0x1):
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 65536:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+class StandInWebSocketServer:
+    def __init__(self, host="127.0.0.1", port=0):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(16)
+        self.host = host
+        self.port = self.sock.getsockname()[1]
+        self.lock = threading.Lock()
+        self.clients = []
+        self.connections = 0
+        self.connected = threading.Event()
+        self.running = True
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/stream"
+
+    def accept_loop(self):
+        while self.running:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.serve_client, args=(conn,), daemon=True).start()
+
+    def serve_client(self, conn):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = conn.recv(4096)
+            if not chunk:
+                conn.close()
+                return
+            request += chunk
+        key = ""
+        for line in request.decode("latin-1").split("\r\n"):
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "sec-websocket-key":
+                key = value.strip()
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        conn.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.lock:
+            self.clients.append(conn)
+            self.connections += 1
+        self.connected.set()
+        try:
+            while conn.recv(4096):
+                pass
+        except OSError:
+            pass
+        self.remove_client(conn)
+
+    def remove_client(self, conn):
+        with self.lock:
+            if conn in self.clients:
+                self.clients.remove(conn)
+            if not self.clients:
+                self.connected.clear()
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+    def send(self, data):
+        with self.lock:
+            clients = list(self.clients)
+        for conn in clients:
+            try:
+                conn.sendall(data)
+            except OSError:
+                self.remove_client(conn)
+
+    def drop_clients(self):
+        with self.lock:
+            clients = list(self.clients)
+        for conn in clients:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.remove_client(conn)
+
+    def close(self):
+        self.running = False
+        self.drop_clients()
+        self.sock.close()
+
+def market_payload(crypto_ids):
+    return [{
+        "id": crypto_id,
+        "name": crypto_id.capitalize(),
+        "current_price": 50000.0,
+        "market_cap": 1e12,
+        "total_volume": 3e10,
+        "price_change_percentage_24h": 1.5,
+    } for crypto_id in crypto_ids]
+
+def price_table_payload(crypto_ids, currencies):
+    table = {}
+    for crypto_id in crypto_ids:
+        quotes = table[crypto_id] = {}
+        for currency in currencies:
+            quotes[currency] = 50000.0
+            quotes[f"{currency}_market_cap"] = 1e12
+            quotes[f"{currency}_24h_vol"] = 3e10
+            quotes[f"{currency}_24h_change"] = 1.5
+    return table
+
+def history_payload(days=30):
+    now_ms = int(time.time() * 1000)
+    return {"prices": [[now_ms - (days - i) * 86400000, 50000.0 + i * 100] for i in range(days + 1)]}
+
+def agg_trades_payload(query):
+    trades = StandInHttpHandler.agg_trades.get(query["symbol"][0], [])
+    start_ms = int(query.get("startTime", [0])[0])
+    end_ms = int(query.get("endTime", [2 ** 62])[0])
+    limit = int(query.get("limit", [500])[0])
+    return [trade for trade in trades if start_ms <= trade["T"] <= end_ms][:limit]
+
+def klines_payload(query):
+    symbols = [c["symbol"] for c in exe.CRYPTOCURRENCIES]
+    base = 100.0 * (symbols.index(query["symbol"][0][:-4]) + 1)
+    seconds = exe.CANDLE_TIMEFRAMES[query["interval"][0]]
+    limit = int(query.get("limit", [500])[0])
+    last = int(time.time()) // seconds * seconds
+    return [[
+        (last - (limit - 1 - i) * seconds) * 1000, f"{base:.8f}", f"{base * 1.001:.8f}", f"{base * 0.999:.8f}",
+        f"{base:.8f}", "1.00000000", (last - (limit - 2 - i) * seconds) * 1000 - 1,
+    ] for i in range(limit)]
+
+class StandInHttpHandler(BaseHTTPRequestHandler):
+    agg_trades = {}
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path.endswith("/aggTrades"):
+            payload = agg_trades_payload(parse_qs(urlparse(self.path).query))
+        elif path.endswith("/klines"):
+            payload = klines_payload(parse_qs(urlparse(self.path).query))
+        elif path.endswith("/coins/markets"):
+            query = parse_qs(urlparse(self.path).query)
+            payload = market_payload(query.get("ids", ["bitcoin"])[0].split(","))
+        elif path.endswith("/simple/price"):
+            query = parse_qs(urlparse(self.path).query)
+            payload = price_table_payload(query.get("ids", ["bitcoin"])[0].split(","), query.get("vs_currencies", ["usd"])[0].split(","))
+        elif path.endswith("/market_chart"):
+            payload = history_payload(int(parse_qs(urlparse(self.path).query).get("days", ["30"])[0]))
+        elif path.endswith("/v2/everything"):
+            payload = {"articles": [{"title": f"Bench headline {i}"} for i in range(10)]}
+        elif path.endswith("/data/v2/news/"):
+            payload = {"Data": [{"title": f"Bench comment {i}"} for i in range(10)]}
+        else:
+            self.send_error(404)
+            return
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class StandInHttpServer:
+    def __init__(self, host="127.0.0.1", port=0):
+        self.server = ThreadingHTTPServer((host, port), StandInHttpHandler)
+        self.server.daemon_threads = True
+        self.host = host
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def point_engine_at(ws_server, http_server):
+    exe.BINANCE_STREAM_URL = ws_server.url
+    exe.BINANCE_REST_URL = f"{http_server.url}/api/v3"
+    exe.COINGECKO_API_URL = f"{http_server.url}/api/v3"
+    exe.NEWSAPI_URL = f"{http_server.url}/v2/everything"
+    exe.CRYPTOCOMPARE_NEWS_URL = f"{http_server.url}/data/v2/news/"
+    exe.RATE_LIMITS = {provider: dict(BENCH_RATE_LIMIT) for provider in exe.RATE_LIMITS}
+
+def synthetic_frames(count=BENCH_FRAME_POOL, seed=1):
+    rng = random.Random(seed)
+    symbols = [c["symbol"] for c in exe.CRYPTOCURRENCIES]
+    prices = {symbol: 100.0 * (i + 1) for i, symbol in enumerate(symbols)}
+    frames = []
+    now_ms = int(time.time() * 1000)
+    for i in range(count):
+        symbol = symbols[i % len(symbols)]
+        prices[symbol] *= 1 + rng.gauss(0, 0.0005)
+        frames.append(trade_frame(symbol, prices[symbol], rng.random(), now_ms + i, i))
+    return frames
+
+def recorded_frames(directory, count=BENCH_FRAME_POOL):
+    frames = []
+    for chunk in exe.TickRecording(directory).chunks():
+        for raw_symbol, trade_time, price, quantity in chunk.tolist():
+            frames.append(trade_frame(raw_symbol.decode("ascii"), price, quantity, trade_time, len(frames)))
+            if len(frames) >= count:
+                return frames
+    return frames
+
+def trade_frame(symbol, price, quantity, trade_time, trade_id):
+    pair = f"{symbol.lower()}usdt"
+    message = {
+        "stream": f"{pair}@trade",
+        "data": {
+            "e": "trade",
+            "E": trade_time,
+            "s": pair.upper(),
+            "t": trade_id,
+            "p": f"{price:.8f}",
+            "q": f"{quantity:.8f}",
+            "T": trade_time,
+            "m": False,
+            "M": True,
+        },
+    }
+    return encode_frame(json.dumps(message, separators=(",", ":")).encode())
+
+def stream_phase(ws_server, frames, rate, duration):
+    sent = 0
+    started = time.perf_counter()
+    while True:
+        elapsed = time.perf_counter() - started
+        if elapsed >= duration:
+            break
+        target = int(rate * elapsed)
+        if target > sent:
+            batch = b"".join(frames[(sent + i) % len(frames)] for i in range(target - sent))
+            ws_server.send(batch)
+            sent = target
+        time.sleep(BENCH_SEND_INTERVAL)
+    return sent, time.perf_counter() - started
+
+def percentiles(values):
+    if not len(values):
+        return {"p50_ms": None, "p99_ms": None, "p999_ms": None, "max_ms": None}
+    values = np.asarray(values) * 1000
+    p50, p99, p999 = np.percentile(values, [50, 99, 99.9])
+    return {"p50_ms": float(p50), "p99_ms": float(p99), "p999_ms": float(p999), "max_ms": float(values.max())}
+
+def tick_to_render(arrivals, renders):
+    arrivals = np.asarray(arrivals)
+    renders = np.sort(np.asarray(renders))
+    if not len(arrivals) or not len(renders):
+        return np.empty(0), len(arrivals)
+    index = np.searchsorted(renders, arrivals, side="left")
+    rendered = index < len(renders)
+    return renders[index[rendered]] - arrivals[rendered], int((~rendered).sum())
+
+def time_call(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+def best_rate(count, fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return count / best
+
+def decode_benchmark(frames, repeat=3):
+    payloads = [(frame[2:] if frame[1] < 126 else frame[4:]).decode() for frame in frames]
+    decoder = exe.TradeDecoder(batch_capacity=len(payloads))
+
+    def json_loads():
+        for payload in payloads:
+            data = json.loads(payload)["data"]
+            float(data["p"])
+            float(data["q"])
+
+    def fast_decode():
+        decode = decoder.decode
+        for payload in payloads:
+            decode(payload)
+
+    def batch_decode():
+        for start in range(0, len(payloads), exe.TRADE_DECODE_BATCH_CAPACITY):
+            decoder.decode_batch(payloads[start:start + exe.TRADE_DECODE_BATCH_CAPACITY])
+
+    return {
+        "json_loads_per_second": best_rate(len(payloads), json_loads, repeat),
+        "fast_decode_per_second": best_rate(len(payloads), fast_decode, repeat),
+        "batch_decode_per_second": best_rate(len(payloads), batch_decode, repeat),
+        "decoder": decoder.stats(),
+    }
+
+def depth_frames(count=BENCH_DEPTH_EVENTS, levels=BENCH_DEPTH_EVENT_LEVELS, seed=1):
+    rng = random.Random(seed)
+    symbols = [c["symbol"] for c in exe.CRYPTOCURRENCIES]
+    frames = []
+    for i in range(count):
+        symbol = symbols[i % len(symbols)]
+        update_id = i // len(symbols) + 1
+        sides = {}
+        for side, sign, start in (("b", -1, 1000.0), ("a", 1, 1000.01)):
+            sides[side] = [
+                [f"{start + sign * rng.randrange(BENCH_DEPTH_LEVELS + 200) * 0.01:.2f}",
+                 f"{0.0 if rng.random() < 0.3 else rng.random():.4f}"]
+                for _ in range(levels)
+            ]
+        frames.append(json.dumps({
+            "stream": f"{symbol.lower()}usdt{exe.DEPTH_STREAM_SUFFIX}",
+            "data": {"e": "depthUpdate", "E": 0, "s": f"{symbol}USDT", "U": update_id, "u": update_id,
+                     "b": sides["b"], "a": sides["a"]},
+        }, separators=(",", ":")))
+    return frames
+
+def depth_benchmark(repeat=3):
+    frames = depth_frames()
+    snapshot = {
+        "lastUpdateId": 0,
+        "bids": [[f"{1000.0 - i * 0.01:.2f}", "1"] for i in range(BENCH_DEPTH_LEVELS)],
+        "asks": [[f"{1000.01 + i * 0.01:.2f}", "1"] for i in range(BENCH_DEPTH_LEVELS)],
+    }
+    engine = exe.CryptoEngine(BENCH_API_KEYS)
+
+    def apply_all():
+        for book in engine.order_books.values():
+            book.reset()
+            book.load_snapshot(snapshot)
+        for frame in frames:
+            engine.handle_message(frame)
+
+    events_per_second = best_rate(len(frames), apply_all, repeat)
+    stats = {symbol: book.stats() for symbol, book in engine.order_books.items()}
+    engine.scheduler.shutdown()
+    engine.http_client.close()
+    return {
+        "events_per_second": events_per_second,
+        "levels_per_second": events_per_second * BENCH_DEPTH_EVENT_LEVELS * 2,
+        "resyncs": sum(book["resyncs"] for book in stats.values()),
+    }
+
+def drain_socket(sock):
+    try:
+        while sock.recv(65536):
+            pass
+    except OSError:
+        pass
+
+def news_budget_check(requests=BENCH_NEWS_REQUESTS):
+    limiter = exe.RateLimiter(PRODUCTION_RATE_LIMITS)
+    priority = exe.REQUEST_PRIORITIES["news"]
+    started = time.perf_counter()
+    granted = [limiter.acquire("newsapi", priority) for _ in range(requests)]
+    elapsed = time.perf_counter() - started
+    assert all(granted) and elapsed < 60, f"foreground news requests denied: {granted} after {elapsed:.1f}s"
+    return {"requests": requests, "granted": sum(granted), "elapsed_s": elapsed, "budget": limiter.stats()["newsapi"]}
+
+def archive_benchmark(days=BENCH_ARCHIVE_DAYS, read_days=BENCH_ARCHIVE_READ_DAYS):
+    rng = np.random.default_rng(1)
+    minutes = days * 1440
+    timestamps = (int(time.time()) // 60 - minutes) * 60000 + np.arange(minutes, dtype=np.int64) * 60000
+    prices = 50000.0 * np.exp(np.cumsum(rng.normal(0, 0.0005, minutes)))
+    directory = tempfile.mkdtemp(prefix="bench-archive-")
+    try:
+        archive = exe.HistoryArchiveStore(directory).get("bitcoin")
+        started = time.perf_counter()
+        for start in range(0, minutes, 1440):
+            archive.append(timestamps[max(start - 1, 0):start + 1440], prices[max(start - 1, 0):start + 1440])
+        append_s = time.perf_counter() - started
+        reads = {}
+        for read in read_days:
+            start_ms = int(timestamps[-1]) - read * exe.DAY_MS
+            reads[f"{read}d"] = time_call(lambda: exe.HistoryArchiveStore(directory).get("bitcoin").read(start_ms), 5)
+        return {
+            "records": len(archive),
+            "blocks": len(archive.index),
+            "bytes": archive.nbytes(),
+            "bytes_per_record": archive.nbytes() / len(archive),
+            "compression_ratio": len(archive) * 16 / archive.nbytes(),
+            "daily_append_ms": append_s / days * 1000,
+            "reads": reads,
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def hub_benchmark(subscribers=BENCH_HUB_SUBSCRIBERS, ticks=BENCH_HUB_TICKS):
+    engine = exe.CryptoEngine(BENCH_API_KEYS)
+    hub = exe.FanoutServer(engine, "127.0.0.1", 0).start()
+    sockets = []
+    for _ in range(subscribers):
+        sock = socket.create_connection(("127.0.0.1", hub.port))
+        sock.sendall((
+            "GET /stream HTTP/1.1\r\nHost: bench\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            "Sec-WebSocket-Key: YmVuY2hiZW5jaGJlbmNoMQ==\r\nSec-WebSocket-Version: 13\r\n\r\n"
+        ).encode())
+        threading.Thread(target=drain_socket, args=(sock,), daemon=True).start()
+        sockets.append(sock)
+    deadline = time.monotonic() + BENCH_HUB_TIMEOUT
+    while len(hub.subscribers) < subscribers and time.monotonic() < deadline:
+        time.sleep(0.01)
+    symbols = [c["symbol"] for c in exe.CRYPTOCURRENCIES]
+    now_ms = int(time.time() * 1000)
+    started = time.perf_counter()
+    for i in range(ticks):
+        engine.publish("tick", symbols[i % len(symbols)], 100.0 + i * 0.01, 0.5, now_ms + i)
+    published = time.perf_counter() - started
+    expected = ticks * subscribers
+    while hub.stats()["sent"] + hub.stats()["conflated"] < expected and time.monotonic() < deadline:
+        time.sleep(0.005)
+    delivered = time.perf_counter() - started
+    stats = hub.stats()
+    hub.close()
+    for sock in sockets:
+        sock.close()
+    engine.scheduler.shutdown()
+    engine.http_client.close()
+    return {
+        "subscribers": subscribers,
+        "publish_us_per_tick": published / ticks * 1e6,
+        "delivered_per_second": stats["sent"] / delivered,
+        "conflated": stats["conflated"],
+        "dropped": stats["dropped"],
+    }
+
+class Probe:
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.lock = threading.Lock()
+        self.arrivals = []
+        self.renders = []
+        self.received = 0
+
+    def on_tick(self, symbol, price, quantity, trade_time):
+        self.received += 1
+        if symbol == self.symbol:
+            now = time.perf_counter()
+            with self.lock:
+                self.arrivals.append(now)
+
+    def on_render(self):
+        now = time.perf_counter()
+        with self.lock:
+            self.renders.append(now)
+
+    def take(self):
+        with self.lock:
+            arrivals, renders = self.arrivals, self.renders
+            self.arrivals, self.renders = [], []
+            received, self.received = self.received, 0
+        return arrivals, renders, received
+
+def run_phases(ws_server, frames, rates, duration, probe, queue_samples=None):
+    phases = []
+    for rate in rates:
+        probe.take()
+        if queue_samples is not None:
+            del queue_samples[:]
+        sent, elapsed = stream_phase(ws_server, frames, rate, duration)
+        time.sleep(BENCH_DRAIN)
+        arrivals, renders, received = probe.take()
+        latencies, unrendered = tick_to_render(arrivals, renders)
+        phase = {
+            "target_rate": rate,
+            "ticks_sent": sent,
+            "ticks_received": received,
+            "achieved_rate": received / elapsed if elapsed else 0.0,
+            "renders": len(renders),
+            "unrendered_ticks": unrendered,
+            "tick_to_render": percentiles(latencies),
+        }
+        if queue_samples is not None:
+            depths = [depth for depth, _ in queue_samples]
+            lags = [lag for _, lag in queue_samples]
+            phase["tk_queue_depth"] = {
+                "mean": float(np.mean(depths)) if depths else None,
+                "max": int(max(depths)) if depths else None,
+            }
+            phase["tk_loop_lag"] = percentiles(lags)
+        phase["sustained"] = (
+            received >= 0.99 * sent
+            and phase["tick_to_render"]["p99_ms"] is not None
+            and phase["tick_to_render"]["p99_ms"] < 1000
+        )
+        print(
+            f"{rate:>7} ticks/s: received {received}/{sent}, "
+            f"p50 {phase['tick_to_render']['p50_ms']} ms, p99 {phase['tick_to_render']['p99_ms']} ms"
+        )
+        phases.append(phase)
+    return phases
+
+def max_sustained(phases):
+    rates = [phase["achieved_rate"] for phase in phases if phase["sustained"]]
+    return max(rates) if rates else 0.0
+
+def reconnect_check(engine, ws_server, symbol, gap_trades=BENCH_GAP_TRADES):
+    seen = []
+    engine.subscribe("tick", lambda tick_symbol, price, quantity, trade_time: seen.append(trade_time) if tick_symbol == symbol else None)
+    trade_id = BENCH_GAP_TRADE_ID
+    started_ms = int(time.time() * 1000)
+    ws_server.send(trade_frame(symbol, 100.0, 1.0, started_ms, trade_id))
+    time.sleep(0.2)
+    gap = [
+        {"a": i, "p": f"{100.0 + i * 0.01:.8f}", "q": "1.00000000", "f": trade_id + 1 + i, "l": trade_id + 1 + i,
+         "T": started_ms + 1 + i, "m": False}
+        for i in range(gap_trades)
+    ]
+    StandInHttpHandler.agg_trades[f"{symbol}USDT"] = gap
+    dropped = time.perf_counter()
+    ws_server.drop_clients()
+    reconnected = ws_server.connected.wait(BENCH_RECONNECT_TIMEOUT)
+    reconnect_s = time.perf_counter() - dropped
+    overlap = 5
+    live = [(trade_id + gap_trades + 1 - overlap + i, started_ms + gap_trades + 1 - overlap + i) for i in range(overlap * 4)]
+    ws_server.send(b"".join(trade_frame(symbol, 101.0, 1.0, trade_time, live_id) for live_id, trade_time in live))
+    expected = [started_ms] + [trade["T"] for trade in gap] + [trade_time for _, trade_time in live[overlap:]]
+    deadline = time.perf_counter() + BENCH_RECONNECT_TIMEOUT
+    while (engine.backfilling or len(seen) < len(expected)) and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    return {
+        "reconnected": reconnected,
+        "reconnect_s": reconnect_s,
+        "gap_trades": gap_trades,
+        "backfilled_trades": engine.backfilled_trades,
+        "continuous": seen == expected,
+        "connection": engine.connection_stats(),
+    }
+
+def run_gui(args, frames, ws_server):
+    import customtkinter as ctk
+
+    root = ctk.CTk()
+    engine = exe.CryptoEngine(BENCH_API_KEYS, timer=root)
+    engine.response_cache = exe.ResponseCache(path=None)
+    probe = Probe(engine.crypto_symbol)
+    engine.subscribe("tick", probe.on_tick)
+    app = exe.CryptoApp(root, engine)
+    update_market_data = app.update_market_data
+
+    def instrumented_update_market_data():
+        update_market_data()
+        probe.on_render()
+
+    app.update_market_data = instrumented_update_market_data
+    queue_samples = []
+    results = {}
+    done = threading.Event()
+
+    def sample_queue(expected):
+        lag = max(time.perf_counter() - expected, 0.0)
+        queue_samples.append((len(root.tk.splitlist(root.tk.call("after", "info"))), lag))
+        if done.is_set():
+            root.quit()
+            return
+        interval = BENCH_QUEUE_SAMPLE_MS / 1000
+        root.after(BENCH_QUEUE_SAMPLE_MS, sample_queue, time.perf_counter() + interval)
+
+    def drive():
+        ws_server.connected.wait(10)
+        while not engine.crypto_data:
+            time.sleep(0.05)
+        results["phases"] = run_phases(ws_server, frames, args.rates, args.duration, probe, queue_samples)
+        results["reconnect"] = reconnect_check(engine, ws_server, probe.symbol)
+        done.set()
+
+    root.after(0, sample_queue, time.perf_counter())
+    threading.Thread(target=drive, daemon=True).start()
+    root.mainloop()
+
+    app.ensure_panels()
+    timestamps, prices = engine.price_history_store.downsample(engine.crypto_id, exe.QUOTE_CURRENCY, exe.PRICE_CHART_MAX_POINTS)
+    dates = exe.epoch_ms_to_num(timestamps)
+    results["handlers"] = {
+        "update_market_data": time_call(update_market_data, 200),
+        "update_system_resources": time_call(app.update_system_resources, 50),
+        "chart_full_draw": time_call(app.chart.canvas.draw, 20),
+        "chart_blit": time_call(app.chart.blit, 200),
+        "chart_set_history": time_call(lambda: app.chart.set_history(dates, prices), 50),
+    }
+    results["handlers"].update(http_costs(engine))
+    results["request_budget"] = engine.request_budget()
+    results["response_cache"] = engine.response_cache.stats()
+    results["alerts"] = engine.alert_engine.stats()
+    results["scheduler"] = engine.scheduler.stats()
+    results["history_archive"] = engine.history_archive.stats()
+    results["coalescer"] = app.current_tick_coalescer().stats()
+    results["chart"] = {"full_draws": app.chart.full_draws, "blits": app.chart.blits}
+    results["startup"] = dict(app.startup.marks)
+    engine.stop()
+    root.destroy()
+    return results
+
+def run_headless(args, frames, ws_server):
+    engine = exe.CryptoEngine(BENCH_API_KEYS)
+    engine.response_cache = exe.ResponseCache(path=None)
+    probe = Probe(engine.crypto_symbol)
+    engine.subscribe("tick", probe.on_tick)
+    coalescer = exe.TickCoalescer()
+    strings = exe.TRANSLATIONS.get(engine.language_code)
+    engine.subscribe("tick", lambda symbol, price, quantity, trade_time: coalescer.push(price, quantity) if symbol == probe.symbol else None)
+    stop = threading.Event()
+
+    def render():
+        frame = coalescer.drain()
+        if frame is None:
+            return
+        strings.text("price", currency=engine.currency, price=frame["price"] * (engine.fx_rate or 1.0))
+        strings.text("profit_loss", currency=engine.currency, profit_loss=engine.portfolio.summary(probe.symbol)["unrealized_pnl"])
+        coalescer.record_render(frame)
+        probe.on_render()
+
+    def render_loop():
+        while not stop.wait(exe.TICK_FRAME_INTERVAL_MS / 1000):
+            render()
+
+    threading.Thread(target=render_loop, daemon=True).start()
+    engine.start()
+    ws_server.connected.wait(10)
+    results = {"phases": run_phases(ws_server, frames, args.rates, args.duration, probe)}
+    results["reconnect"] = reconnect_check(engine, ws_server, probe.symbol)
+    stop.set()
+    results["handlers"] = http_costs(engine)
+    results["request_budget"] = engine.request_budget()
+    results["response_cache"] = engine.response_cache.stats()
+    results["alerts"] = engine.alert_engine.stats()
+    results["scheduler"] = engine.scheduler.stats()
+    results["history_archive"] = engine.history_archive.stats()
+    results["coalescer"] = coalescer.stats()
+    engine.stop()
+    return results
+
+def http_costs(engine):
+    url = f"{exe.COINGECKO_API_URL}/coins/markets"
+    params = {"vs_currency": "usd", "ids": engine.crypto_id}
+    engine.make_request(url, params, "crypto data")
+    return {
+        "http_get_json": time_call(lambda: engine.http_client.get_json(url, params, "crypto data"), 20),
+        "make_request_cached": time_call(lambda: engine.make_request(url, params, "crypto data"), 200),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Crypto Trading Dashboard benchmark")
+    parser.add_argument("--rates", type=lambda value: [int(rate) for rate in value.split(",")], default=BENCH_RATES,
+                        help="comma separated tick rates to push, in ticks per second")
+    parser.add_argument("--duration", type=float, default=BENCH_DURATION, help="seconds per rate")
+    parser.add_argument("--replay", help="use ticks from this recording directory instead of synthetic ones")
+    parser.add_argument("--headless", action="store_true", help="benchmark the engine without the Tk dashboard")
+    parser.add_argument("--output", default=BENCH_OUTPUT, help="where to write the JSON results")
+    args = parser.parse_args()
+
+    frames = recorded_frames(args.replay) if args.replay else synthetic_frames()
+    ws_server = StandInWebSocketServer()
+    http_server = StandInHttpServer()
+    point_engine_at(ws_server, http_server)
+    history_dir = exe.HISTORY_ARCHIVE_DIR = tempfile.mkdtemp(prefix="bench-history-")
+    headless = args.headless or not (os.environ.get("DISPLAY") or platform.system() in ("Windows", "Darwin"))
+    try:
+        results = run_headless(args, frames, ws_server) if headless else run_gui(args, frames, ws_server)
+    finally:
+        ws_server.close()
+        http_server.close()
+        shutil.rmtree(history_dir, ignore_errors=True)
+
+    results.update({
+        "mode": "headless" if headless else "gui",
+        "source": args.replay or "synthetic",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "max_sustained_ticks_per_second": max_sustained(results["phases"]),
+        "decode": decode_benchmark(frames),
+        "depth": depth_benchmark(),
+        "hub": hub_benchmark(),
+        "archive": archive_benchmark(),
+        "news_budget": news_budget_check(),
+    })
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Max sustained: {results['max_sustained_ticks_per_second']:.0f} ticks/s")
+    reconnect = results["reconnect"]
+    print(
+        f"Reconnect: {reconnect['reconnect_s']:.2f}s, backfilled {reconnect['backfilled_trades']}/{reconnect['gap_trades']}, "
+        f"continuous {reconnect['continuous']}"
+    )
+    decode = results["decode"]
+    print(
+        f"Decode per core: json {decode['json_loads_per_second']:.0f}/s, "
+        f"fast {decode['fast_decode_per_second']:.0f}/s, batch {decode['batch_decode_per_second']:.0f}/s"
+    )
+    print(f"Depth diffs: {results['depth']['events_per_second']:.0f} events/s across {len(exe.CRYPTOCURRENCIES)} books")
+    hub = results["hub"]
+    print(
+        f"Hub fan-out: {hub['delivered_per_second']:.0f} messages/s to {hub['subscribers']} subscribers, "
+        f"{hub['publish_us_per_tick']:.1f} us per tick on the ingest thread"
+    )
+    news = results["news_budget"]
+    print(f"News budget: {news['granted']}/{news['requests']} foreground requests granted in {news['elapsed_s']:.1f}s")
+    archive = results["archive"]
+    print(
+        f"History archive: {archive['records']} minute records in {archive['bytes'] / 1e6:.1f} MB "
+        f"({archive['compression_ratio']:.1f}x), 1y read {archive['reads']['365d']['p50_ms']:.1f} ms"
+    )
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
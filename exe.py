@@ -1,49 +1,3638 @@
-import requests
+import time
+STARTUP_STARTED = time.perf_counter()
 import tkinter as tk
 import customtkinter as ctk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import datetime
+import heapq
+import numpy as np
 import json
 import os
-from PIL import Image, ImageTk
-import time
-import websocket
+import random
+import re
 import threading
-import psutil  
 import platform
+import zlib
+import argparse
+from string import Formatter
+from collections import namedtuple
+from collections import OrderedDict, deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlparse, parse_qs
+
+COINGECKO_API_URL = "https://api.coingecko.com/api/v3"
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443/stream"
+BINANCE_REST_URL = "https://api.binance.com/api/v3"
+NEWSAPI_URL = "https://newsapi.org/v2/everything"
+CRYPTOCOMPARE_NEWS_URL = "https://min-api.cryptocompare.com/data/v2/news/"
+
+CRYPTOCURRENCIES = [
+    {"id": "bitcoin", "symbol": "BTC"},
+    {"id": "ethereum", "symbol": "ETH"},
+    {"id": "solana", "symbol": "SOL"},
+    {"id": "cardano", "symbol": "ADA"},
+    {"id": "ripple", "symbol": "XRP"},
+]
+
+CURRENCIES = ["USD", "TRY", "EUR", "RUB"]
+
+API_KEYS_FILE = "api_keys.json"
+LOCALES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
+DEFAULT_LANGUAGE_CODE = "en"
+
+HTTP_CONNECT_TIMEOUT = 3.05
+HTTP_READ_TIMEOUT = 10
+HTTP_POOL_SIZE = 10
+HTTP_MAX_WORKERS = 4
+
+RESPONSE_CACHE_FILE = "response_cache.json"
+RESPONSE_CACHE_MAX_ENTRIES = 256
+RESPONSE_CACHE_SAVE_MS = 5000
+RESPONSE_CACHE_TTLS = {
+    "crypto data": 60,
+    "price table": 60,
+    "price history": 3600,
+    "news": 900,
+    "professional comments": 900,
+}
+RESPONSE_CACHE_SECRET_PARAMS = {"apiKey", "api_key"}
+
+RATE_LIMITS = {
+    "binance": {"per_minute": 6000, "burst": 1000, "used_header": "X-MBX-USED-WEIGHT-1M"},
+    "coingecko": {"per_minute": 10, "burst": 5},
+    "newsapi": {"per_minute": 10, "per_day": 100, "burst": 5},
+    "cryptocompare": {"per_minute": 30, "per_day": 3000, "burst": 10},
+}
+REQUEST_PROVIDERS = {
+    "crypto data": "coingecko",
+    "price table": "coingecko",
+    "price history": "coingecko",
+    "news": "newsapi",
+    "professional comments": "cryptocompare",
+    "depth snapshot": "binance",
+    "trade backfill": "binance",
+    "candle history": "binance",
+}
+REQUEST_COSTS = {
+    "depth snapshot": 50,
+    "trade backfill": 4,
+    "candle history": 5,
+}
+REQUEST_PRIORITIES = {
+    "crypto data": 0,
+    "price table": 0,
+    "depth snapshot": 0,
+    "trade backfill": 0,
+    "price history": 1,
+    "candle history": 1,
+    "news": 2,
+    "professional comments": 2,
+}
+BACKGROUND_PRIORITY = 10
+RATE_LIMIT_MAX_WAIT_S = 30
+RATE_LIMIT_DAILY_RESERVE = 0.2
+
+WS_PING_INTERVAL_S = 20
+WS_PING_TIMEOUT_S = 10
+WS_STALE_AFTER_S = 30
+WS_WATCHDOG_INTERVAL_MS = 5000
+WS_BACKOFF_BASE_S = 1.0
+WS_BACKOFF_MAX_S = 60.0
+BACKFILL_LIMIT = 1000
+BACKFILL_WINDOW_MS = 3600000
+BACKFILL_MAX_PAGES = 20
+
+STATIC_DATA_REFRESH_MS = 1800000
+MARKET_SNAPSHOT_MAX_AGE_S = 60
+FX_REFRESH_MS = 300000
+QUOTE_CURRENCY = "USD"
+SYSTEM_RESOURCES_REFRESH_MS = 1000
+SCHEDULER_MAX_WORKERS = 2
+
+TICK_FRAME_INTERVAL_MS = 100
+TRADE_DECODE_BATCH_CAPACITY = 1024
+TRADE_MESSAGE_PATTERN = re.compile(
+    r'\{"stream":"([^"\n]*)","data":\{"e":"trade","E":\d+,"s":"[^"\n]*","t":(\d+),'
+    r'"p":"([^"\n]*)","q":"([^"\n]*)",(?:"[ba]":\d+,)*"T":(\d+)'
+)
+
+ENGINE_TOPICS = ("tick", "alert", "depth", "depth_diff", "market", "news", "metrics")
+
+HUB_HOST = "127.0.0.1"
+HUB_PORT = 8765
+HUB_URL = None
+HUB_QUEUE_LIMIT = 4096
+HUB_SEND_TIMEOUT_S = 5
+HUB_REQUEST_MAX_BYTES = 65536
+HUB_ROUTES = {
+    "/api/v3/depth": "depth snapshot",
+    "/api/v3/aggTrades": "trade backfill",
+    "/api/v3/klines": "candle history",
+    "/coingecko/coins/markets": "crypto data",
+    "/coingecko/simple/price": "price table",
+    "/newsapi": "news",
+    "/cryptocompare": "professional comments",
+}
+HUB_STATUS = {200: "200 OK", 400: "400 Bad Request", 404: "404 Not Found", 405: "405 Method Not Allowed", 502: "502 Bad Gateway"}
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+TICK_RECORD_DIR = "recordings"
+TICK_RECORD_DTYPE = np.dtype([
+    ("symbol", "S8"),
+    ("timestamp", "<i8"),
+    ("price", "<f8"),
+    ("quantity", "<f8"),
+])
+TICK_INDEX_DTYPE = np.dtype([("timestamp", "<i8"), ("record", "<i8")])
+TICK_SEGMENT_MAX_RECORDS = 1000000
+TICK_INDEX_STRIDE = 1024
+TICK_REPLAY_CHUNK = 4096
+TICK_RECORD_FLUSH_MS = 5000
+
+HISTORY_ARCHIVE_DIR = "history"
+HISTORY_INDEX_DTYPE = np.dtype([
+    ("first", "<i8"),
+    ("last", "<i8"),
+    ("offset", "<i8"),
+    ("length", "<i4"),
+    ("count", "<i4"),
+    ("scale", "<i4"),
+])
+HISTORY_BLOCK_RECORDS = 4096
+HISTORY_COMPRESSION_LEVEL = 6
+HISTORY_MAX_DECIMALS = 8
+HISTORY_INITIAL_DAYS = 365
+HISTORY_TAIL_MAX_AGE_S = 3600
+HISTORY_RANGES = {"30d": 30, "1y": 365}
+DAY_MS = 86400000
+
+PRICE_SERIES_INITIAL_CAPACITY = 64
+PRICE_CHART_MAX_POINTS = 2000
+
+CANDLE_TIMEFRAMES = {
+    "1s": 1,
+    "1m": 60,
+    "5m": 300,
+    "1h": 3600,
+}
+CANDLE_CAPACITY = 500
+KLINE_LIMIT = CANDLE_CAPACITY
+EMA_PERIOD = 20
+RSI_PERIOD = 14
+BOLLINGER_PERIOD = 20
+BOLLINGER_STDDEV = 2.0
+ATR_PERIOD = 14
+VWAP_SESSION_SECONDS = 86400
+INDICATOR_WARMUP_BLOCK = 256
+INDICATOR_LABELS = {
+    "ema": f"EMA {EMA_PERIOD}",
+    "rsi": f"RSI {RSI_PERIOD}",
+    "vwap": "VWAP",
+    "bb_mid": f"BB {BOLLINGER_PERIOD} mid",
+    "bb_upper": f"BB {BOLLINGER_PERIOD} upper",
+    "bb_lower": f"BB {BOLLINGER_PERIOD} lower",
+    "atr": f"ATR {ATR_PERIOD}",
+}
+PORTFOLIO_FILE = "portfolio.json"
+PORTFOLIO_INITIAL_CAPACITY = 64
+ALERTS_FILE = "alerts.json"
+ALERT_LATENCY_SAMPLES = 1024
+LIVE_CHART_WINDOW = 120
+CHART_MODES = list(HISTORY_RANGES) + list(CANDLE_TIMEFRAMES) + ["depth"]
+DEPTH_STREAM_SUFFIX = "@depth@100ms"
+DEPTH_SNAPSHOT_LIMIT = 1000
+DEPTH_MAX_BUFFERED_EVENTS = 1000
+DEPTH_CHART_LEVELS = 100
+
+requests = None
+HTTPAdapter = None
+plt = None
+FigureCanvasTkAgg = None
+mdates = None
+Rectangle = None
+psutil = None
+websocket = None
+socket = None
+base64 = None
+hashlib = None
+struct = None
+
+def load_http_modules():
+    global requests, HTTPAdapter
+    if requests is None:
+        import requests as requests_module
+        from requests.adapters import HTTPAdapter as adapter_class
+        HTTPAdapter = adapter_class
+        requests = requests_module
+
+def load_chart_modules():
+    global plt, FigureCanvasTkAgg, mdates, Rectangle
+    if plt is None:
+        import matplotlib.pyplot as pyplot
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg as canvas_class
+        import matplotlib.dates as dates_module
+        from matplotlib.patches import Rectangle as rectangle_class
+        FigureCanvasTkAgg = canvas_class
+        mdates = dates_module
+        Rectangle = rectangle_class
+        plt = pyplot
+
+def load_psutil():
+    global psutil
+    if psutil is None:
+        import psutil as psutil_module
+        psutil = psutil_module
+
+def load_websocket():
+    global websocket
+    if websocket is None:
+        import websocket as websocket_module
+        websocket = websocket_module
+
+def load_hub_modules():
+    global socket, base64, hashlib, struct
+    if socket is None:
+        import base64 as base64_module
+        import hashlib as hashlib_module
+        import struct as struct_module
+        import socket as socket_module
+        base64 = base64_module
+        hashlib = hashlib_module
+        struct = struct_module
+        socket = socket_module
+
+class StartupTimer:
+    def __init__(self, started=STARTUP_STARTED, verbose=False):
+        self.started = started
+        self.verbose = verbose
+        self.marks = OrderedDict()
+
+    def mark(self, name):
+        if name in self.marks:
+            return
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        previous_ms = next(reversed(self.marks.values()), 0.0)
+        self.marks[name] = elapsed_ms
+        if self.verbose:
+            print(f"Startup {name:<14} {elapsed_ms:8.1f} ms (+{elapsed_ms - previous_ms:.1f} ms)")
+
+class TickCoalescer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ticks_received = 0
+        self.ticks_coalesced = 0
+        self.frames_rendered = 0
+        self.last_render_lag = 0.0
+        self.max_render_lag = 0.0
+        self.total_render_lag = 0.0
+        self.pending = None
+        self.last_price = None
+
+    def push(self, price, quantity=0.0):
+        now = time.perf_counter()
+        with self.lock:
+            self.ticks_received += 1
+            self.last_price = price
+            frame = self.pending
+            if frame is None:
+                self.pending = {
+                    "price": price,
+                    "open": price,
+                    "high": price,
+                    "low": price,
+                    "volume": quantity,
+                    "count": 1,
+                    "first_tick_time": now,
+                }
+                return
+            self.ticks_coalesced += 1
+            frame["price"] = price
+            if price > frame["high"]:
+                frame["high"] = price
+            if price < frame["low"]:
+                frame["low"] = price
+            frame["volume"] += quantity
+            frame["count"] += 1
+
+    def drain(self):
+        with self.lock:
+            frame = self.pending
+            self.pending = None
+        return frame
+
+    def record_render(self, frame):
+        lag = time.perf_counter() - frame["first_tick_time"]
+        with self.lock:
+            self.frames_rendered += 1
+            self.last_render_lag = lag
+            self.total_render_lag += lag
+            if lag > self.max_render_lag:
+                self.max_render_lag = lag
+
+    def reset(self):
+        with self.lock:
+            self.pending = None
+
+    def stats(self):
+        with self.lock:
+            frames = self.frames_rendered
+            return {
+                "ticks_received": self.ticks_received,
+                "ticks_coalesced": self.ticks_coalesced,
+                "frames_rendered": frames,
+                "last_render_lag_ms": self.last_render_lag * 1000,
+                "avg_render_lag_ms": (self.total_render_lag / frames * 1000) if frames else 0.0,
+                "max_render_lag_ms": self.max_render_lag * 1000,
+            }
+
+class TradeRecord:
+    __slots__ = ("stream", "price", "quantity", "trade_time", "trade_id")
+
+    def __init__(self):
+        self.stream = None
+        self.price = 0.0
+        self.quantity = 0.0
+        self.trade_time = 0
+        self.trade_id = 0
+
+class TradeDecoder:
+    def __init__(self, batch_capacity=TRADE_DECODE_BATCH_CAPACITY, pattern=TRADE_MESSAGE_PATTERN):
+        self.pattern = pattern
+        self.record = TradeRecord()
+        self.fast_decodes = 0
+        self.fallback_decodes = 0
+        self.failed_decodes = 0
+        self.allocate_batch(batch_capacity)
+
+    def allocate_batch(self, capacity):
+        self.batch_capacity = capacity
+        self.batch_streams = [None] * capacity
+        self.batch_prices = np.zeros(capacity, dtype=np.float64)
+        self.batch_quantities = np.zeros(capacity, dtype=np.float64)
+        self.batch_trade_times = np.zeros(capacity, dtype=np.int64)
+        self.batch_trade_ids = np.zeros(capacity, dtype=np.int64)
+
+    def decode(self, message, record=None):
+        if record is None:
+            record = self.record
+        if self.decode_fast(message, record):
+            self.fast_decodes += 1
+            return record
+        if self.decode_json(message, record):
+            self.fallback_decodes += 1
+            return record
+        self.failed_decodes += 1
+        return None
+
+    def decode_fast(self, message, record):
+        if not isinstance(message, str):
+            return False
+        match = self.pattern.match(message)
+        if match is None:
+            return False
+        stream, trade_id, price, quantity, trade_time = match.groups()
+        try:
+            record.price = float(price)
+            record.quantity = float(quantity)
+        except ValueError:
+            return False
+        record.stream = stream
+        record.trade_time = int(trade_time)
+        record.trade_id = int(trade_id)
+        return True
+
+    def decode_json(self, message, record):
+        try:
+            envelope = json.loads(message)
+            data = envelope['data']
+            record.stream = envelope.get('stream')
+            record.price = float(data['p'])
+            record.quantity = float(data.get('q', 0.0))
+            record.trade_time = int(data.get('T', time.time() * 1000))
+            record.trade_id = int(data.get('t', 0))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return False
+        return True
+
+    def decode_batch(self, messages):
+        count = len(messages)
+        if count > self.batch_capacity:
+            self.allocate_batch(max(count, self.batch_capacity * 2))
+        if count == 0:
+            return 0
+        try:
+            rows = self.pattern.findall("\n".join(messages))
+        except TypeError:
+            rows = ()
+        if len(rows) == count:
+            streams, trade_ids, prices, quantities, trade_times = zip(*rows)
+            try:
+                self.batch_prices[:count] = prices
+                self.batch_quantities[:count] = quantities
+            except ValueError:
+                return self.decode_each(messages)
+            self.batch_streams[:count] = streams
+            self.batch_trade_times[:count] = trade_times
+            self.batch_trade_ids[:count] = trade_ids
+            self.fast_decodes += count
+            return count
+        return self.decode_each(messages)
+
+    def decode_each(self, messages):
+        record = self.record
+        count = 0
+        for message in messages:
+            if self.decode(message, record) is None:
+                continue
+            self.batch_streams[count] = record.stream
+            self.batch_prices[count] = record.price
+            self.batch_quantities[count] = record.quantity
+            self.batch_trade_times[count] = record.trade_time
+            self.batch_trade_ids[count] = record.trade_id
+            count += 1
+        return count
+
+    def stats(self):
+        return {
+            "fast": self.fast_decodes,
+            "fallback": self.fallback_decodes,
+            "failed": self.failed_decodes,
+        }
+
+class LocaleStrings:
+    def __init__(self, code, locale, fallback=None):
+        self.code = code
+        self.name = locale["name"]
+        self.currency = locale.get("currency", "USD")
+        self.order = locale.get("order", 100)
+        self.static = {}
+        self.templates = {}
+        strings = dict(fallback or {})
+        strings.update(locale["strings"])
+        self.raw = strings
+        for key, template in strings.items():
+            if any(field is not None for _, field, _, _ in Formatter().parse(template)):
+                self.templates[key] = template.format
+            else:
+                self.static[key] = template
+
+    def text(self, key, **values):
+        formatter = self.templates.get(key)
+        if formatter is None:
+            return self.static[key]
+        return formatter(**values)
+
+class TranslationCatalog:
+    def __init__(self, path=LOCALES_DIR, default_code=DEFAULT_LANGUAGE_CODE):
+        self.default_code = default_code
+        locales = {}
+        for filename in sorted(os.listdir(path)):
+            code, ext = os.path.splitext(filename)
+            if ext != ".json":
+                continue
+            with open(os.path.join(path, filename), "r", encoding="utf-8") as f:
+                locales[code] = json.load(f)
+        default = LocaleStrings(default_code, locales.pop(default_code))
+        self.locales = {default_code: default}
+        for code, locale in locales.items():
+            self.locales[code] = LocaleStrings(code, locale, fallback=default.raw)
+        ordered = sorted(self.locales.values(), key=lambda l: l.order)
+        self.languages = {l.name: l.code for l in ordered}
+
+    def get(self, code):
+        return self.locales.get(code) or self.locales[self.default_code]
+
+TRANSLATIONS = TranslationCatalog()
+LANGUAGES = TRANSLATIONS.languages
+
+def epoch_ms_to_num(timestamps):
+    utc_offset = datetime.datetime.now().astimezone().utcoffset().total_seconds()
+    return (np.asarray(timestamps, dtype=np.float64) / 1000 + utc_offset) / 86400
+
+class PriceSeries:
+    def __init__(self, capacity=PRICE_SERIES_INITIAL_CAPACITY):
+        self.timestamps = np.empty(capacity, dtype=np.int64)
+        self.prices = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def reserve(self, size):
+        capacity = len(self.timestamps)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        timestamps = np.empty(capacity, dtype=np.int64)
+        prices = np.empty(capacity, dtype=np.float64)
+        timestamps[:self.size] = self.timestamps[:self.size]
+        prices[:self.size] = self.prices[:self.size]
+        self.timestamps = timestamps
+        self.prices = prices
+
+    def merge(self, timestamps, prices):
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if not len(timestamps):
+            return
+        keep = int(np.searchsorted(self.timestamps[:self.size], timestamps[0]))
+        size = keep + len(timestamps)
+        self.reserve(size)
+        self.timestamps[keep:size] = timestamps
+        self.prices[keep:size] = prices
+        self.size = size
+
+    def view(self):
+        return self.timestamps[:self.size], self.prices[:self.size]
+
+    def slice(self, start_ms=None, end_ms=None):
+        timestamps, prices = self.view()
+        lo = 0 if start_ms is None else int(np.searchsorted(timestamps, start_ms, side='left'))
+        hi = self.size if end_ms is None else int(np.searchsorted(timestamps, end_ms, side='right'))
+        return timestamps[lo:hi], prices[lo:hi]
+
+    def downsample(self, max_points, start_ms=None, end_ms=None):
+        timestamps, prices = self.slice(start_ms, end_ms)
+        count = len(timestamps)
+        if count <= max_points:
+            return timestamps, prices
+        step = -(-count // max_points)
+        last = np.minimum(np.arange(step - 1, count + step - 1, step), count - 1)
+        return timestamps[last], prices[last]
+
+class PriceHistoryStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def get(self, crypto_id, currency):
+        key = (crypto_id, currency.lower())
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = PriceSeries()
+            return series
+
+    def merge(self, crypto_id, currency, timestamps, prices):
+        series = self.get(crypto_id, currency)
+        with self.lock:
+            series.merge(timestamps, prices)
+        return series
+
+    def downsample(self, crypto_id, currency, max_points, start_ms=None, end_ms=None):
+        series = self.get(crypto_id, currency)
+        with self.lock:
+            timestamps, prices = series.downsample(max_points, start_ms, end_ms)
+            return timestamps.copy(), prices.copy()
+
+def byte_shuffle(values):
+    return values.view(np.uint8).reshape(-1, values.itemsize).T.tobytes()
+
+def byte_unshuffle(data, dtype, count):
+    return np.frombuffer(data, dtype=np.uint8).reshape(dtype.itemsize, count).T.copy().view(dtype).ravel()
+
+def price_decimals(prices):
+    for decimals in range(HISTORY_MAX_DECIMALS + 1):
+        scaled = np.round(prices * 10.0 ** decimals)
+        if np.abs(scaled).max() >= 2 ** 53:
+            break
+        if np.array_equal(scaled / 10.0 ** decimals, prices):
+            return decimals, scaled.astype(np.int64)
+    return -1, None
+
+def encode_history_block(timestamps, prices):
+    deltas = np.diff(timestamps, prepend=timestamps[0])
+    decimals, scaled = price_decimals(prices)
+    if decimals < 0:
+        bits = prices.view(np.uint64)
+        columns = bits.copy()
+        columns[1:] ^= bits[:-1]
+    else:
+        columns = np.diff(scaled, prepend=np.int64(0))
+    return zlib.compress(byte_shuffle(deltas) + byte_shuffle(columns), HISTORY_COMPRESSION_LEVEL), decimals
+
+def decode_history_block(payload, entry):
+    count = int(entry["count"])
+    raw = zlib.decompress(payload)
+    timestamps = int(entry["first"]) + np.cumsum(byte_unshuffle(raw[:count * 8], np.dtype("<i8"), count))
+    decimals = int(entry["scale"])
+    if decimals < 0:
+        prices = np.bitwise_xor.accumulate(byte_unshuffle(raw[count * 8:], np.dtype("<u8"), count)).view(np.float64)
+    else:
+        prices = np.cumsum(byte_unshuffle(raw[count * 8:], np.dtype("<i8"), count)) / 10.0 ** decimals
+    return timestamps, prices
+
+class HistoryArchive:
+    def __init__(self, path):
+        self.data_path = path + ".bin"
+        self.index_path = path + ".idx"
+        self.lock = threading.Lock()
+        self.index = np.zeros(0, dtype=HISTORY_INDEX_DTYPE)
+        if os.path.exists(self.index_path) and os.path.exists(self.data_path):
+            count = os.path.getsize(self.index_path) // HISTORY_INDEX_DTYPE.itemsize
+            index = np.fromfile(self.index_path, dtype=HISTORY_INDEX_DTYPE, count=count)
+            written = int(np.searchsorted(index["offset"] + index["length"], os.path.getsize(self.data_path), side="right"))
+            self.index = index[:written]
+
+    def __len__(self):
+        return int(self.index["count"].sum())
+
+    def nbytes(self):
+        index = self.index
+        return int(index["offset"][-1] + index["length"][-1]) if len(index) else 0
+
+    def last_timestamp(self):
+        index = self.index
+        return int(index["last"][-1]) if len(index) else None
+
+    def read_blocks(self, lo, hi):
+        entries = self.index[lo:hi]
+        if not len(entries):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        start = int(entries["offset"][0])
+        with open(self.data_path, "rb") as data_file:
+            data_file.seek(start)
+            data = data_file.read(int(entries["offset"][-1] + entries["length"][-1]) - start)
+        blocks = []
+        for entry in entries:
+            position = int(entry["offset"]) - start
+            blocks.append(decode_history_block(data[position:position + int(entry["length"])], entry))
+        return np.concatenate([block[0] for block in blocks]), np.concatenate([block[1] for block in blocks])
+
+    def read(self, start_ms=None, end_ms=None):
+        with self.lock:
+            lo = 0 if start_ms is None else int(np.searchsorted(self.index["last"], start_ms, side="left"))
+            hi = len(self.index) if end_ms is None else int(np.searchsorted(self.index["first"], end_ms, side="right"))
+            timestamps, prices = self.read_blocks(lo, hi)
+        lo = 0 if start_ms is None else int(np.searchsorted(timestamps, start_ms, side="left"))
+        hi = len(timestamps) if end_ms is None else int(np.searchsorted(timestamps, end_ms, side="right"))
+        return timestamps[lo:hi], prices[lo:hi]
+
+    def append(self, timestamps, prices):
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        prices = np.ascontiguousarray(prices, dtype=np.float64)
+        count = len(timestamps)
+        if not count:
+            return 0
+        with self.lock:
+            block = int(np.searchsorted(self.index["last"], timestamps[0], side="left"))
+            if block == len(self.index) and block and self.index["count"][-1] < HISTORY_BLOCK_RECORDS:
+                block -= 1
+            offset = int(self.index["offset"][block]) if block < len(self.index) else self.nbytes()
+            kept_timestamps, kept_prices = self.read_blocks(block, block + 1)
+            keep = int(np.searchsorted(kept_timestamps, timestamps[0]))
+            timestamps = np.concatenate((kept_timestamps[:keep], timestamps))
+            prices = np.concatenate((kept_prices[:keep], prices))
+            entries = np.zeros(-(-len(timestamps) // HISTORY_BLOCK_RECORDS), dtype=HISTORY_INDEX_DTYPE)
+            with open(self.index_path, "ab") as index_file, open(self.data_path, "ab") as data_file:
+                index_file.truncate(block * HISTORY_INDEX_DTYPE.itemsize)
+                index_file.flush()
+                data_file.truncate(offset)
+                for i, position in enumerate(range(0, len(timestamps), HISTORY_BLOCK_RECORDS)):
+                    block_timestamps = timestamps[position:position + HISTORY_BLOCK_RECORDS]
+                    payload, decimals = encode_history_block(block_timestamps, prices[position:position + HISTORY_BLOCK_RECORDS])
+                    data_file.write(payload)
+                    entries[i] = (block_timestamps[0], block_timestamps[-1], offset, len(payload), len(block_timestamps), decimals)
+                    offset += len(payload)
+                data_file.flush()
+                index_file.write(entries.tobytes())
+            self.index = np.concatenate((self.index[:block], entries))
+        return count
+
+class HistoryArchiveStore:
+    def __init__(self, directory=HISTORY_ARCHIVE_DIR):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.archives = {}
+
+    def get(self, crypto_id):
+        with self.lock:
+            archive = self.archives.get(crypto_id)
+            if archive is None:
+                os.makedirs(self.directory, exist_ok=True)
+                archive = self.archives[crypto_id] = HistoryArchive(os.path.join(self.directory, crypto_id))
+            return archive
+
+    def stats(self):
+        with self.lock:
+            archives = dict(self.archives)
+        return {
+            crypto_id: {"records": len(archive), "blocks": len(archive.index), "bytes": archive.nbytes()}
+            for crypto_id, archive in archives.items()
+        }
+
+class MarketSnapshot:
+    def __init__(self, crypto_ids=None, currencies=None):
+        self.crypto_ids = list(crypto_ids or [c["id"] for c in CRYPTOCURRENCIES])
+        self.currencies = [currency.lower() for currency in (currencies or CURRENCIES)]
+        self.crypto_index = {crypto_id: i for i, crypto_id in enumerate(self.crypto_ids)}
+        self.currency_index = {currency: i for i, currency in enumerate(self.currencies)}
+        shape = (len(self.crypto_ids), len(self.currencies))
+        self.prices = np.full(shape, np.nan)
+        self.market_caps = np.full(shape, np.nan)
+        self.volumes = np.full(shape, np.nan)
+        self.changes = np.full(shape, np.nan)
+        self.markets = {}
+        self.updated_at = None
+        self.lock = threading.Lock()
+
+    def age(self):
+        if self.updated_at is None:
+            return float("inf")
+        return time.monotonic() - self.updated_at
+
+    def update(self, markets, price_table):
+        with self.lock:
+            for market in markets or []:
+                if market.get("id") in self.crypto_index:
+                    self.markets[market["id"]] = market
+            for crypto_id, quotes in (price_table or {}).items():
+                row = self.crypto_index.get(crypto_id)
+                if row is None:
+                    continue
+                for currency, column in self.currency_index.items():
+                    self.prices[row, column] = quotes.get(currency, np.nan)
+                    self.market_caps[row, column] = quotes.get(f"{currency}_market_cap", np.nan)
+                    self.volumes[row, column] = quotes.get(f"{currency}_24h_vol", np.nan)
+                    self.changes[row, column] = quotes.get(f"{currency}_24h_change", np.nan)
+            self.updated_at = time.monotonic()
+
+    def to_dict(self):
+        return {
+            crypto_id: {currency: self.get(crypto_id, currency) for currency in self.currencies}
+            for crypto_id in self.crypto_ids
+        }
+
+    def get(self, crypto_id, currency):
+        row = self.crypto_index.get(crypto_id)
+        column = self.currency_index.get(currency.lower())
+        if row is None or column is None:
+            return None
+        with self.lock:
+            market = self.markets.get(crypto_id)
+            price = self.prices[row, column]
+            if market is None or np.isnan(price):
+                return None
+            crypto_data = dict(market)
+            crypto_data.update({
+                "current_price": float(price),
+                "market_cap": float(np.nan_to_num(self.market_caps[row, column])),
+                "total_volume": float(np.nan_to_num(self.volumes[row, column])),
+                "price_change_percentage_24h": float(np.nan_to_num(self.changes[row, column])),
+            })
+        return crypto_data
+
+class FxRates:
+    def __init__(self, base=QUOTE_CURRENCY):
+        self.base = base.lower()
+        self.rates = {self.base: 1.0}
+
+    def update_from_snapshot(self, snapshot):
+        base_column = snapshot.currency_index.get(self.base)
+        if base_column is None:
+            return False
+        with snapshot.lock:
+            prices = snapshot.prices.copy()
+        ratios = prices / prices[:, base_column:base_column + 1]
+        rates = {self.base: 1.0}
+        for currency, column in snapshot.currency_index.items():
+            column_ratios = ratios[:, column]
+            column_ratios = column_ratios[np.isfinite(column_ratios) & (column_ratios > 0)]
+            if len(column_ratios):
+                rates[currency] = float(np.median(column_ratios))
+        changed = rates != self.rates
+        self.rates = rates
+        return changed
+
+    def rate(self, currency):
+        return self.rates.get(currency.lower())
+
+    def convert(self, values, currency):
+        rate = self.rate(currency)
+        if rate is None:
+            return None
+        return np.multiply(values, rate)
+
+def ewma_series(values, alpha, seed, block=INDICATOR_WARMUP_BLOCK):
+    values = np.asarray(values, dtype=np.float64)
+    series = np.empty(len(values))
+    powers = (1.0 - alpha) ** np.arange(1, block + 1)
+    last = seed
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        weights = powers[:len(chunk)]
+        series[start:start + len(chunk)] = weights * (last + alpha * np.cumsum(chunk / weights))
+        last = series[start + len(chunk) - 1]
+    return series
+
+class Ewma:
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.value = None
+
+    def update(self, x):
+        self.value = self.peek(x)
+        return self.value
+
+    def peek(self, x):
+        if self.value is None:
+            return x
+        return self.value + self.alpha * (x - self.value)
+
+    def warm_up(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return values
+        if self.value is None:
+            series = np.concatenate((values[:1], ewma_series(values[1:], self.alpha, values[0])))
+        else:
+            series = ewma_series(values, self.alpha, self.value)
+        self.value = float(series[-1])
+        return series
+
+class Rsi:
+    def __init__(self, period=RSI_PERIOD):
+        self.gains = Ewma(1.0 / period)
+        self.losses = Ewma(1.0 / period)
+        self.last_close = None
+
+    def level(self, gain, loss):
+        if gain is None:
+            return None
+        if loss == 0:
+            return 100.0 if gain > 0 else 50.0
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+
+    def update(self, close):
+        if self.last_close is not None:
+            change = close - self.last_close
+            self.gains.update(max(change, 0.0))
+            self.losses.update(max(-change, 0.0))
+        self.last_close = close
+        return self.level(self.gains.value, self.losses.value)
+
+    def peek(self, close):
+        if self.last_close is None:
+            return None
+        change = close - self.last_close
+        return self.level(self.gains.peek(max(change, 0.0)), self.losses.peek(max(-change, 0.0)))
+
+    def warm_up(self, closes):
+        closes = np.asarray(closes, dtype=np.float64)
+        series = np.full(len(closes), np.nan)
+        if not len(closes):
+            return series
+        previous = closes if self.last_close is None else np.concatenate(([self.last_close], closes))
+        changes = np.diff(previous)
+        self.last_close = float(closes[-1])
+        if not len(changes):
+            return series
+        gains = self.gains.warm_up(np.maximum(changes, 0.0))
+        losses = self.losses.warm_up(np.maximum(-changes, 0.0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            levels = np.where(losses > 0, 100.0 - 100.0 / (1.0 + gains / losses), np.where(gains > 0, 100.0, 50.0))
+        series[len(series) - len(levels):] = levels
+        return series
+
+class Bollinger:
+    def __init__(self, period=BOLLINGER_PERIOD, width=BOLLINGER_STDDEV):
+        self.period = period
+        self.width = width
+        self.window = deque(maxlen=period)
+        self.shift = 0.0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.updates = 0
+
+    def bands(self, total, total_sq):
+        mean = total / self.period
+        std = max(total_sq / self.period - mean * mean, 0.0) ** 0.5
+        mid = self.shift + mean
+        return mid, mid + self.width * std, mid - self.width * std
+
+    def resum(self):
+        if not self.window:
+            return
+        values = np.fromiter(self.window, dtype=np.float64, count=len(self.window))
+        self.shift = float(values.mean())
+        deltas = values - self.shift
+        self.total = float(deltas.sum())
+        self.total_sq = float(deltas @ deltas)
+
+    def update(self, x):
+        window = self.window
+        if len(window) == self.period:
+            old = window[0] - self.shift
+            self.total -= old
+            self.total_sq -= old * old
+        window.append(x)
+        delta = x - self.shift
+        self.total += delta
+        self.total_sq += delta * delta
+        self.updates += 1
+        if self.updates % self.period == 0:
+            self.resum()
+        if len(window) < self.period:
+            return None
+        return self.bands(self.total, self.total_sq)
+
+    def peek(self, x):
+        window = self.window
+        if len(window) + 1 < self.period:
+            return None
+        total, total_sq = self.total, self.total_sq
+        if len(window) == self.period:
+            old = window[0] - self.shift
+            total -= old
+            total_sq -= old * old
+        delta = x - self.shift
+        return self.bands(total + delta, total_sq + delta * delta)
+
+    def warm_up(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        combined = np.concatenate((np.fromiter(self.window, dtype=np.float64, count=len(self.window)), values))
+        series = np.full((len(values), 3), np.nan)
+        if len(combined) >= self.period:
+            windows = np.lib.stride_tricks.sliding_window_view(combined, self.period)
+            mid = windows.mean(axis=1)
+            std = windows.std(axis=1)
+            count = min(len(mid), len(values))
+            mid, std = mid[len(mid) - count:], std[len(std) - count:]
+            series[len(values) - count:] = np.column_stack((mid, mid + self.width * std, mid - self.width * std))
+        self.window.extend(values.tolist())
+        self.updates = 0
+        self.resum()
+        return series
+
+class Atr:
+    def __init__(self, period=ATR_PERIOD):
+        self.average = Ewma(1.0 / period)
+        self.last_close = None
+
+    def true_range(self, high, low):
+        if self.last_close is None:
+            return high - low
+        return max(high - low, abs(high - self.last_close), abs(low - self.last_close))
+
+    def update(self, high, low, close):
+        value = self.average.update(self.true_range(high, low))
+        self.last_close = close
+        return value
+
+    def peek(self, high, low, close):
+        return self.average.peek(self.true_range(high, low))
+
+    def warm_up(self, highs, lows, closes):
+        highs, lows, closes = (np.asarray(a, dtype=np.float64) for a in (highs, lows, closes))
+        if not len(closes):
+            return closes
+        previous = np.concatenate(([np.nan if self.last_close is None else self.last_close], closes[:-1]))
+        ranges = np.fmax(highs - lows, np.fmax(np.abs(highs - previous), np.abs(lows - previous)))
+        self.last_close = float(closes[-1])
+        return self.average.warm_up(ranges)
+
+class Vwap:
+    def __init__(self, session_seconds=VWAP_SESSION_SECONDS):
+        self.session_seconds = session_seconds
+        self.session = None
+        self.turnover = 0.0
+        self.volume = 0.0
+        self.warmed = False
+
+    def update(self, price, quantity, timestamp):
+        session = int(timestamp // self.session_seconds * self.session_seconds)
+        if self.session is None or session > self.session:
+            self.session = session
+            self.turnover = 0.0
+            self.volume = 0.0
+        elif session < self.session:
+            return
+        self.turnover += price * quantity
+        self.volume += quantity
+
+    def value(self):
+        return self.turnover / self.volume if self.volume else None
+
+    def warm_up(self, candles):
+        if not len(candles):
+            return False
+        session = int(candles[-1, 0] // self.session_seconds * self.session_seconds)
+        if candles[0, 0] > session:
+            return False
+        rows = candles[candles[:, 0] >= session]
+        self.session = session
+        self.turnover = float(rows[:, 2:5].sum(axis=1) / 3 @ rows[:, 5])
+        self.volume = float(rows[:, 5].sum())
+        self.warmed = True
+        return True
+
+def indicator_overlay(timestamps, closes):
+    ema = Ewma(2.0 / (EMA_PERIOD + 1)).warm_up(closes)
+    bands = Bollinger().warm_up(closes)
+    return timestamps, ema, bands[:, 1], bands[:, 2]
+
+class CandleIndicators:
+    def __init__(self, capacity=CANDLE_CAPACITY):
+        self.history = deque(maxlen=capacity)
+        self.reset()
+
+    def reset(self):
+        self.ema = Ewma(2.0 / (EMA_PERIOD + 1))
+        self.rsi = Rsi()
+        self.bollinger = Bollinger()
+        self.atr = Atr()
+        self.history.clear()
+
+    def close(self, candle):
+        start, _, high, low, close, _ = candle
+        self.rsi.update(close)
+        self.atr.update(high, low, close)
+        bands = self.bollinger.update(close) or (None, None, None)
+        self.history.append((start, self.ema.update(close)) + bands)
+
+    def overlay_row(self, candle):
+        close = candle[4]
+        return (candle[0], self.ema.peek(close)) + (self.bollinger.peek(close) or (None, None, None))
+
+    def values(self, candle):
+        _, _, high, low, close, _ = candle
+        mid, upper, lower = self.bollinger.peek(close) or (None, None, None)
+        return {
+            "ema": self.ema.peek(close),
+            "rsi": self.rsi.peek(close),
+            "bb_mid": mid,
+            "bb_upper": upper,
+            "bb_lower": lower,
+            "atr": self.atr.peek(high, low, close),
+        }
+
+    def warm_up(self, candles):
+        self.reset()
+        closes = candles[:, 4]
+        self.rsi.warm_up(closes)
+        self.atr.warm_up(candles[:, 2], candles[:, 3], closes)
+        rows = np.column_stack((candles[:, 0], self.ema.warm_up(closes), self.bollinger.warm_up(closes)))
+        self.history.extend(map(tuple, rows.tolist()))
+
+class CandleAggregator:
+    def __init__(self, timeframes=CANDLE_TIMEFRAMES, capacity=CANDLE_CAPACITY):
+        self.timeframes = dict(timeframes)
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.candles = {name: deque(maxlen=capacity) for name in self.timeframes}
+        self.indicators = {name: CandleIndicators(capacity) for name in self.timeframes}
+        self.vwap = Vwap()
+
+    def add_tick(self, price, quantity, timestamp):
+        with self.lock:
+            self.vwap.update(price, quantity, timestamp)
+            for name, seconds in self.timeframes.items():
+                start = int(timestamp // seconds * seconds)
+                candles = self.candles[name]
+                if candles and candles[-1][0] >= start:
+                    candle = candles[-1]
+                    if candle[0] != start:
+                        continue
+                    if price > candle[2]:
+                        candle[2] = price
+                    if price < candle[3]:
+                        candle[3] = price
+                    candle[4] = price
+                    candle[5] += quantity
+                else:
+                    if candles:
+                        self.indicators[name].close(candles[-1])
+                    candles.append([start, price, price, price, price, quantity])
+
+    def get_candles(self, timeframe, limit=None):
+        with self.lock:
+            candles = self.candles[timeframe]
+            if limit is not None and len(candles) > limit:
+                candles = islice(candles, len(candles) - limit, None)
+            return [list(candle) for candle in candles]
+
+    def get_overlay(self, timeframe, limit=None):
+        with self.lock:
+            candles = self.candles[timeframe]
+            if not candles:
+                return np.empty((0, 5))
+            indicators = self.indicators[timeframe]
+            history = indicators.history
+            if limit is not None and len(history) >= limit:
+                history = islice(history, len(history) - limit + 1, None)
+            rows = list(history)
+            rows.append(indicators.overlay_row(candles[-1]))
+        return np.array(rows, dtype=np.float64)
+
+    def indicator_values(self, timeframe):
+        with self.lock:
+            candles = self.candles[timeframe]
+            if not candles:
+                return {}
+            values = self.indicators[timeframe].values(candles[-1])
+            values["vwap"] = self.vwap.value()
+            return values
+
+    def load_history(self, timeframe, rows):
+        with self.lock:
+            live = list(self.candles[timeframe])
+            first_live = live[0][0] if live else None
+            merged = []
+            klines = {}
+            for row in rows.tolist():
+                row[0] = int(row[0])
+                if first_live is None or row[0] < first_live:
+                    merged.append(row)
+                else:
+                    klines[row[0]] = row
+            for candle in live:
+                kline = klines.get(candle[0])
+                if kline is not None:
+                    candle = [
+                        candle[0], kline[1], max(kline[2], candle[2]), min(kline[3], candle[3]),
+                        candle[4], max(kline[5], candle[5]),
+                    ]
+                merged.append(candle)
+            merged = merged[-self.capacity:]
+            self.candles[timeframe] = deque(merged, maxlen=self.capacity)
+            candles = np.array(merged, dtype=np.float64).reshape(-1, 6)
+            self.indicators[timeframe].warm_up(candles[:-1])
+            if not self.vwap.warmed:
+                self.vwap.warm_up(candles)
+
+class Portfolio:
+    def __init__(self, symbols=None, capacity=PORTFOLIO_INITIAL_CAPACITY):
+        self.symbols = list(symbols or [c["symbol"] for c in CRYPTOCURRENCIES])
+        self.symbol_codes = {symbol: code for code, symbol in enumerate(self.symbols)}
+        self.lock = threading.Lock()
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.codes = np.empty(capacity, dtype=np.int16)
+        self.quantities = np.empty(capacity, dtype=np.float64)
+        self.cost_basis = np.empty(capacity, dtype=np.float64)
+        self.stops = np.empty(capacity, dtype=np.float64)
+        self.market_values = np.empty(capacity, dtype=np.float64)
+        self.unrealized = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+        self.next_id = 1
+        self.rows = {}
+        count = len(self.symbols)
+        self.prices = np.full(count, np.nan)
+        self.coin_quantities = np.zeros(count)
+        self.coin_costs = np.zeros(count)
+        self.coin_exposures = np.zeros(count)
+        self.coin_unrealized = np.zeros(count)
+        self.coin_stopped = np.zeros(count, dtype=np.int64)
+        self.total_exposure = 0.0
+        self.total_cost = 0.0
+        self.total_unrealized = 0.0
+
+    def __len__(self):
+        return self.size
+
+    def reserve(self, size):
+        capacity = len(self.ids)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ("ids", "codes", "quantities", "cost_basis", "stops", "market_values", "unrealized"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def load(self, path=PORTFOLIO_FILE):
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r") as f:
+                positions = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading portfolio: {e}")
+            return
+        for position in positions:
+            try:
+                self.add(position["symbol"], position["quantity"], position["cost_basis"], position.get("stop", 0.0))
+            except (KeyError, ValueError, TypeError) as e:
+                print(f"Invalid portfolio position {position}: {e}")
+
+    def add(self, symbol, quantity, cost_basis, stop=0.0):
+        with self.lock:
+            position_id = self.next_id
+            self.next_id += 1
+            self.reserve(self.size + 1)
+            row = self.size
+            self.ids[row] = position_id
+            self.codes[row] = self.symbol_codes[symbol]
+            self.quantities[row] = quantity
+            self.cost_basis[row] = cost_basis
+            self.stops[row] = stop
+            self.size += 1
+            self.reindex(self.codes[row])
+            return position_id
+
+    def update(self, position_id, symbol=None, quantity=None, cost_basis=None, stop=None):
+        with self.lock:
+            row = self.row_of(position_id)
+            if row is None:
+                return
+            old_code = self.codes[row]
+            if symbol is not None:
+                self.codes[row] = self.symbol_codes[symbol]
+            if quantity is not None:
+                self.quantities[row] = quantity
+            if cost_basis is not None:
+                self.cost_basis[row] = cost_basis
+            if stop is not None:
+                self.stops[row] = stop
+            self.reindex(old_code)
+            if self.codes[row] != old_code:
+                self.reindex(self.codes[row])
+
+    def remove(self, position_id):
+        with self.lock:
+            row = self.row_of(position_id)
+            if row is None:
+                return
+            code = self.codes[row]
+            last = self.size - 1
+            for column in (self.ids, self.codes, self.quantities, self.cost_basis, self.stops,
+                           self.market_values, self.unrealized):
+                column[row] = column[last]
+            self.size = last
+            if row != last:
+                self.reindex(self.codes[row])
+            self.reindex(code)
+
+    def row_of(self, position_id):
+        rows = np.flatnonzero(self.ids[:self.size] == position_id)
+        return int(rows[0]) if len(rows) else None
+
+    def reindex(self, code):
+        rows = np.flatnonzero(self.codes[:self.size] == code)
+        self.rows[int(code)] = rows
+        self.coin_quantities[code] = self.quantities[rows].sum()
+        self.coin_costs[code] = (self.quantities[rows] * self.cost_basis[rows]).sum()
+        self.total_cost = self.coin_costs.sum()
+        self.revalue_code(code)
+
+    def revalue(self, symbol, price):
+        code = self.symbol_codes.get(symbol)
+        if code is None:
+            return
+        with self.lock:
+            self.prices[code] = price
+            if len(self.rows.get(code, ())):
+                self.revalue_code(code)
+
+    def revalue_code(self, code):
+        rows = self.rows.get(int(code))
+        price = self.prices[code]
+        if rows is None or not len(rows) or np.isnan(price):
+            self.coin_exposures[code] = self.coin_costs[code]
+            self.coin_unrealized[code] = 0.0
+            self.coin_stopped[code] = 0
+        else:
+            quantities = self.quantities[rows]
+            values = quantities * price
+            unrealized = values - quantities * self.cost_basis[rows]
+            stops = self.stops[rows]
+            self.market_values[rows] = values
+            self.unrealized[rows] = unrealized
+            self.coin_exposures[code] = values.sum()
+            self.coin_unrealized[code] = unrealized.sum()
+            self.coin_stopped[code] = np.count_nonzero((stops > 0) & (stops >= price))
+        self.total_exposure = self.coin_exposures.sum()
+        self.total_unrealized = self.coin_unrealized.sum()
+
+    def summary(self, symbol):
+        code = self.symbol_codes[symbol]
+        with self.lock:
+            return {
+                "positions": len(self.rows.get(code, ())),
+                "quantity": float(self.coin_quantities[code]),
+                "cost": float(self.coin_costs[code]),
+                "exposure": float(self.coin_exposures[code]),
+                "unrealized_pnl": float(self.coin_unrealized[code]),
+                "stopped": int(self.coin_stopped[code]),
+            }
+
+    def breakdown(self):
+        return {symbol: self.summary(symbol) for symbol in self.symbols}
+
+    def totals(self):
+        with self.lock:
+            return {
+                "positions": self.size,
+                "cost": float(self.total_cost),
+                "exposure": float(self.total_exposure),
+                "unrealized_pnl": float(self.total_unrealized),
+            }
+
+class SymbolAlerts:
+    def __init__(self):
+        self.last_price = None
+        self.above_levels = np.empty(0, dtype=np.float64)
+        self.above_ids = np.empty(0, dtype=np.int64)
+        self.below_levels = np.empty(0, dtype=np.float64)
+        self.below_ids = np.empty(0, dtype=np.int64)
+        self.cohorts = []
+        self.dynamic = []
+        self.pending = []
+
+    def __len__(self):
+        return (len(self.above_ids) + len(self.below_ids) + sum(len(ids) for _, _, ids in self.cohorts)
+                + len(self.dynamic) + len(self.pending))
+
+    def insert_level(self, direction, level, rule_id):
+        levels = self.above_levels if direction == "above" else self.below_levels
+        ids = self.above_ids if direction == "above" else self.below_ids
+        at = int(np.searchsorted(levels, level))
+        levels = np.insert(levels, at, level)
+        ids = np.insert(ids, at, rule_id)
+        if direction == "above":
+            self.above_levels, self.above_ids = levels, ids
+        else:
+            self.below_levels, self.below_ids = levels, ids
+
+    def insert_trailing(self, high, trail, rule_id):
+        for cohort in self.cohorts:
+            if cohort[0] == high:
+                at = int(np.searchsorted(cohort[1], trail))
+                cohort[1] = np.insert(cohort[1], at, trail)
+                cohort[2] = np.insert(cohort[2], at, rule_id)
+                return
+        self.cohorts.append([high, np.array([trail]), np.array([rule_id], dtype=np.int64)])
+
+    def discard(self, rule_id):
+        if rule_id in self.dynamic:
+            self.dynamic.remove(rule_id)
+            return
+        for direction in ("above", "below"):
+            ids = self.above_ids if direction == "above" else self.below_ids
+            rows = np.flatnonzero(ids == rule_id)
+            if len(rows):
+                if direction == "above":
+                    self.above_levels = np.delete(self.above_levels, rows)
+                    self.above_ids = np.delete(self.above_ids, rows)
+                else:
+                    self.below_levels = np.delete(self.below_levels, rows)
+                    self.below_ids = np.delete(self.below_ids, rows)
+                return
+        for cohort in self.cohorts:
+            rows = np.flatnonzero(cohort[2] == rule_id)
+            if len(rows):
+                cohort[1] = np.delete(cohort[1], rows)
+                cohort[2] = np.delete(cohort[2], rows)
+                self.cohorts = [c for c in self.cohorts if len(c[2])]
+                return
+        self.pending = [rule for rule in self.pending if rule != rule_id]
+
+    def crossed(self, price):
+        fired = []
+        count = int(np.searchsorted(self.above_levels, price, side='right'))
+        if count:
+            fired.extend(self.above_ids[:count].tolist())
+            self.above_levels = self.above_levels[count:]
+            self.above_ids = self.above_ids[count:]
+        keep = int(np.searchsorted(self.below_levels, price, side='left'))
+        if keep < len(self.below_levels):
+            fired.extend(self.below_ids[keep:].tolist())
+            self.below_levels = self.below_levels[:keep]
+            self.below_ids = self.below_ids[:keep]
+        if self.cohorts:
+            self.raise_trailing_highs(price)
+            for cohort in self.cohorts:
+                high, trails, ids = cohort
+                count = int(np.searchsorted(trails, 1.0 - price / high, side='right'))
+                if count:
+                    fired.extend(ids[:count].tolist())
+                    cohort[1] = trails[count:]
+                    cohort[2] = ids[count:]
+            self.cohorts = [cohort for cohort in self.cohorts if len(cohort[2])]
+        self.last_price = price
+        return fired
+
+    def raise_trailing_highs(self, price):
+        below = [cohort for cohort in self.cohorts if cohort[0] < price]
+        if not below:
+            return
+        if len(below) == 1:
+            below[0][0] = price
+            return
+        trails = np.concatenate([cohort[1] for cohort in below])
+        ids = np.concatenate([cohort[2] for cohort in below])
+        order = np.argsort(trails, kind='stable')
+        self.cohorts = [cohort for cohort in self.cohorts if cohort[0] >= price]
+        self.cohorts.append([price, trails[order], ids[order]])
+
+class AlertEngine:
+    def __init__(self, symbols=None, latency_samples=ALERT_LATENCY_SAMPLES):
+        self.books = {symbol: SymbolAlerts() for symbol in (symbols or [c["symbol"] for c in CRYPTOCURRENCIES])}
+        self.rules = {}
+        self.next_id = 1
+        self.lock = threading.Lock()
+        self.fired_count = 0
+        self.exchange_latencies = deque(maxlen=latency_samples)
+        self.evaluation_latencies = deque(maxlen=latency_samples)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def load(self, path=ALERTS_FILE):
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r") as f:
+                rules = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading alerts: {e}")
+            return
+        for rule in rules:
+            kind = rule.get("type", "level")
+            try:
+                if kind == "level":
+                    self.add_level(rule["symbol"], rule["price"], rule.get("direction"), rule.get("tag"))
+                elif kind == "percent":
+                    self.add_percent_move(rule["symbol"], rule["percent"], rule.get("tag"))
+                elif kind == "trailing":
+                    self.add_trailing_stop(rule["symbol"], rule["percent"], rule.get("tag"))
+                elif kind == "indicator":
+                    self.add_indicator(
+                        rule["symbol"], rule["indicator"], rule["timeframe"],
+                        rule.get("direction"), rule.get("threshold"), rule.get("tag")
+                    )
+                elif kind == "atr_stop":
+                    self.add_atr_stop(rule["symbol"], rule["timeframe"], rule["multiple"], rule.get("tag"))
+                else:
+                    print(f"Unknown alert type: {kind}")
+            except (KeyError, ValueError, TypeError) as e:
+                print(f"Invalid {kind} alert: {e}")
+
+    def add_level(self, symbol, level, direction=None, tag=None):
+        return self.add_rule(symbol, {"kind": "level", "level": float(level), "direction": direction, "tag": tag})
+
+    def add_percent_move(self, symbol, percent, tag=None):
+        return self.add_rule(symbol, {"kind": "percent", "percent": abs(float(percent)), "tag": tag})
+
+    def add_trailing_stop(self, symbol, percent, tag=None):
+        return self.add_rule(symbol, {"kind": "trailing", "percent": abs(float(percent)), "tag": tag})
+
+    def add_indicator(self, symbol, indicator, timeframe, direction=None, threshold=None, tag=None):
+        if indicator not in INDICATOR_LABELS:
+            raise ValueError(f"unknown indicator {indicator}")
+        if timeframe not in CANDLE_TIMEFRAMES:
+            raise ValueError(f"unknown timeframe {timeframe}")
+        return self.add_rule(symbol, {
+            "kind": "indicator", "indicator": indicator, "timeframe": timeframe, "direction": direction,
+            "threshold": None if threshold is None else float(threshold), "tag": tag,
+        })
+
+    def add_atr_stop(self, symbol, timeframe, multiple, tag=None):
+        if timeframe not in CANDLE_TIMEFRAMES:
+            raise ValueError(f"unknown timeframe {timeframe}")
+        return self.add_rule(symbol, {"kind": "atr_stop", "timeframe": timeframe, "multiple": abs(float(multiple)), "tag": tag})
+
+    def add_rule(self, symbol, rule):
+        book = self.books.get(symbol)
+        if book is None:
+            raise ValueError(f"unknown symbol {symbol}")
+        with self.lock:
+            rule_id = self.next_id
+            self.next_id += 1
+            rule.update({"id": rule_id, "symbol": symbol})
+            self.rules[rule_id] = rule
+            if book.last_price is None:
+                book.pending.append(rule_id)
+            else:
+                self.arm(book, rule, book.last_price)
+            return rule_id
+
+    def arm(self, book, rule, price):
+        rule_id = rule["id"]
+        if rule["kind"] == "level":
+            if rule["direction"] is None:
+                rule["direction"] = "above" if rule["level"] > price else "below"
+            book.insert_level(rule["direction"], rule["level"], rule_id)
+        elif rule["kind"] == "percent":
+            rule["reference"] = price
+            book.insert_level("above", price * (1 + rule["percent"] / 100), rule_id)
+            book.insert_level("below", price * (1 - rule["percent"] / 100), rule_id)
+        elif rule["kind"] == "trailing":
+            book.insert_trailing(price, rule["percent"] / 100, rule_id)
+        else:
+            rule["high"] = price
+            book.dynamic.append(rule_id)
+
+    def cancel(self, rule_id):
+        with self.lock:
+            rule = self.rules.pop(rule_id, None)
+            if rule is None:
+                return
+            book = self.books[rule["symbol"]]
+            book.discard(rule_id)
+            if rule["kind"] == "percent":
+                book.discard(rule_id)
+
+    def on_tick(self, symbol, price, trade_time, indicators=None):
+        book = self.books.get(symbol)
+        if book is None:
+            return []
+        started = time.perf_counter()
+        with self.lock:
+            if book.pending:
+                pending, book.pending = book.pending, []
+                for rule_id in pending:
+                    self.arm(book, self.rules[rule_id], price)
+            fired_ids = book.crossed(price)
+            if book.dynamic and indicators is not None:
+                fired_ids.extend(self.crossed_indicators(book, price, indicators))
+            if not fired_ids:
+                return []
+            alerts = []
+            for rule_id in fired_ids:
+                rule = self.rules.pop(rule_id, None)
+                if rule is None:
+                    continue
+                if rule["kind"] == "percent":
+                    book.discard(rule_id)
+                alerts.append(dict(rule, price=price, trade_time=trade_time))
+            fired_at = time.perf_counter()
+            exchange_latency_ms = time.time() * 1000 - trade_time
+            evaluation_latency_us = (fired_at - started) * 1e6
+            for alert in alerts:
+                alert["exchange_to_fire_ms"] = exchange_latency_ms
+                alert["evaluation_us"] = evaluation_latency_us
+                self.exchange_latencies.append(exchange_latency_ms)
+                self.evaluation_latencies.append(evaluation_latency_us)
+            self.fired_count += len(alerts)
+            return alerts
+
+    def crossed_indicators(self, book, price, indicators):
+        values = {}
+        fired = []
+        for rule_id in book.dynamic:
+            rule = self.rules[rule_id]
+            timeframe = rule["timeframe"]
+            if timeframe not in values:
+                values[timeframe] = indicators(timeframe)
+            if rule["kind"] == "atr_stop":
+                rule["high"] = max(rule["high"], price)
+                atr = values[timeframe].get("atr")
+                if atr is not None and price <= rule["high"] - rule["multiple"] * atr:
+                    rule["level"] = rule["high"] - rule["multiple"] * atr
+                    fired.append(rule_id)
+                continue
+            value = values[timeframe].get(rule["indicator"])
+            if value is None:
+                continue
+            if rule["threshold"] is None:
+                subject, level = price, value
+            else:
+                subject, level = value, rule["threshold"]
+            if rule["direction"] is None:
+                rule["direction"] = "above" if level > subject else "below"
+                continue
+            if subject >= level if rule["direction"] == "above" else subject <= level:
+                rule["level"] = level
+                fired.append(rule_id)
+        if fired:
+            book.dynamic = [rule_id for rule_id in book.dynamic if rule_id not in fired]
+        return fired
+
+    def stats(self):
+        with self.lock:
+            exchange = np.array(self.exchange_latencies)
+            evaluation = np.array(self.evaluation_latencies)
+            stats = {"rules": len(self.rules), "fired": self.fired_count}
+        if len(exchange):
+            stats["exchange_to_fire_ms"] = dict(zip(("p50", "p99"), np.percentile(exchange, [50, 99]).tolist()))
+            stats["evaluation_us"] = dict(zip(("p50", "p99"), np.percentile(evaluation, [50, 99]).tolist()))
+        return stats
+
+class BookSide:
+    def __init__(self):
+        self.prices = np.empty(0, dtype=np.float64)
+        self.quantities = np.empty(0, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.prices)
+
+    def load(self, levels):
+        levels = np.asarray(levels, dtype=np.float64).reshape(-1, 2)
+        levels = levels[levels[:, 1] > 0]
+        order = np.argsort(levels[:, 0], kind='stable')
+        self.prices = levels[order, 0].copy()
+        self.quantities = levels[order, 1].copy()
+
+    def apply(self, levels):
+        levels = np.asarray(levels, dtype=np.float64).reshape(-1, 2)
+        if not len(levels):
+            return None
+        levels = levels[np.argsort(levels[:, 0], kind='stable')]
+        prices, quantities = levels[:, 0], levels[:, 1]
+        at = np.searchsorted(self.prices, prices)
+        found = at < len(self.prices)
+        found[found] = self.prices[at[found]] == prices[found]
+        self.quantities[at[found]] = quantities[found]
+        new = ~found & (quantities > 0)
+        if new.any():
+            self.prices = np.insert(self.prices, at[new], prices[new])
+            self.quantities = np.insert(self.quantities, at[new], quantities[new])
+        if not quantities.all():
+            keep = self.quantities > 0
+            self.prices = self.prices[keep]
+            self.quantities = self.quantities[keep]
+        return float(prices[0]), float(prices[-1])
+
+class OrderBook:
+    def __init__(self, symbol, max_buffered=DEPTH_MAX_BUFFERED_EVENTS):
+        self.symbol = symbol
+        self.max_buffered = max_buffered
+        self.bids = BookSide()
+        self.asks = BookSide()
+        self.lock = threading.Lock()
+        self.last_update_id = None
+        self.synced = False
+        self.snapshot_pending = False
+        self.buffer = []
+        self.changes = {}
+        self.updates = 0
+        self.resyncs = 0
+
+    def reset(self):
+        with self.lock:
+            self.synced = False
+            self.snapshot_pending = False
+            self.last_update_id = None
+            self.buffer = []
+
+    def load_snapshot(self, snapshot):
+        with self.lock:
+            self.bids.load(snapshot["bids"])
+            self.asks.load(snapshot["asks"])
+            self.last_update_id = snapshot["lastUpdateId"]
+            self.synced = True
+            self.snapshot_pending = False
+            self.changes = {"bids": (-np.inf, np.inf), "asks": (-np.inf, np.inf)}
+            buffered, self.buffer = self.buffer, []
+            for event in buffered:
+                if not self.apply_locked(event):
+                    return False
+            return True
+
+    def on_diff(self, event):
+        with self.lock:
+            if not self.synced:
+                if len(self.buffer) >= self.max_buffered:
+                    self.buffer.pop(0)
+                self.buffer.append(event)
+                return False
+            return self.apply_locked(event)
+
+    def apply_locked(self, event):
+        if event["u"] <= self.last_update_id:
+            return True
+        if event["U"] > self.last_update_id + 1:
+            self.synced = False
+            self.buffer = [event]
+            self.resyncs += 1
+            return False
+        for name, side, levels in (("bids", self.bids, event["b"]), ("asks", self.asks, event["a"])):
+            changed = side.apply(levels)
+            if changed is not None:
+                low, high = self.changes.get(name, changed)
+                self.changes[name] = (min(low, changed[0]), max(high, changed[1]))
+        self.last_update_id = event["u"]
+        self.updates += 1
+        return True
+
+    def window(self, name, levels):
+        side = self.bids if name == "bids" else self.asks
+        if not len(side):
+            return None
+        if name == "bids":
+            return side.prices[max(len(side) - levels, 0)], side.prices[-1]
+        return side.prices[0], side.prices[min(levels, len(side)) - 1]
+
+    def take_changes(self, levels):
+        with self.lock:
+            changes, self.changes = self.changes, {}
+            sides = set()
+            for name, (low, high) in changes.items():
+                window = self.window(name, levels)
+                if window is None or (high >= window[0] and low <= window[1]):
+                    sides.add(name)
+            return sides
+
+    def top(self, levels):
+        with self.lock:
+            return (
+                self.bids.prices[::-1][:levels].copy(), self.bids.quantities[::-1][:levels].copy(),
+                self.asks.prices[:levels].copy(), self.asks.quantities[:levels].copy(),
+            )
+
+    def cumulative_depth(self, levels):
+        bid_prices, bid_quantities, ask_prices, ask_quantities = self.top(levels)
+        return bid_prices, np.cumsum(bid_quantities), ask_prices, np.cumsum(ask_quantities)
+
+    def spread(self):
+        with self.lock:
+            if not len(self.bids) or not len(self.asks):
+                return None
+            best_bid = self.bids.prices[-1]
+            best_ask = self.asks.prices[0]
+        mid = (best_bid + best_ask) / 2
+        return {"bid": float(best_bid), "ask": float(best_ask), "spread": float(best_ask - best_bid),
+                "spread_bps": float((best_ask - best_bid) / mid * 10000)}
+
+    def snapshot(self, levels):
+        with self.lock:
+            if not self.synced:
+                return None
+            return {
+                "lastUpdateId": self.last_update_id,
+                "bids": np.column_stack((self.bids.prices[::-1][:levels], self.bids.quantities[::-1][:levels])).tolist(),
+                "asks": np.column_stack((self.asks.prices[:levels], self.asks.quantities[:levels])).tolist(),
+            }
+
+    def stats(self):
+        with self.lock:
+            return {"synced": self.synced, "bids": len(self.bids), "asks": len(self.asks),
+                    "updates": self.updates, "resyncs": self.resyncs, "last_update_id": self.last_update_id}
+
+class PriceChart:
+    def __init__(self, master):
+        load_chart_modules()
+        self.figure, self.ax = plt.subplots(figsize=(8, 4))
+        self.figure.patch.set_facecolor('#2B2B2B')
+        self.figure.subplots_adjust(bottom=0.2)
+        self.style_axes(self.ax)
+        self.ax.xaxis_date()
+        self.price_line = self.ax.plot([], [], label='Price', color='cyan', animated=True)[0]
+        self.ema_line = self.ax.plot([], [], label=INDICATOR_LABELS["ema"], color='orange', linewidth=1, animated=True)[0]
+        self.upper_band = self.ax.plot(
+            [], [], label=f"BB {BOLLINGER_PERIOD}", color='violet', linewidth=0.8, linestyle='--', animated=True
+        )[0]
+        self.lower_band = self.ax.plot([], [], color='violet', linewidth=0.8, linestyle='--', animated=True)[0]
+        self.indicator_text = self.ax.text(
+            0.01, 0.97, "", transform=self.ax.transAxes, ha='left', va='top', color='white', animated=True
+        )
+        self.overlay_artists = (self.ema_line, self.upper_band, self.lower_band, self.indicator_text)
+        self.legend = self.ax.legend()
+        self.depth_ax = self.figure.add_axes(self.ax.get_position(), label="depth")
+        self.style_axes(self.depth_ax)
+        self.depth_ax.set_visible(False)
+        self.bid_line = self.depth_ax.plot([], [], color='green', drawstyle='steps-post', animated=True)[0]
+        self.ask_line = self.depth_ax.plot([], [], color='red', drawstyle='steps-post', animated=True)[0]
+        self.spread_text = self.depth_ax.text(
+            0.5, 0.95, "", transform=self.depth_ax.transAxes, ha='center', va='top', color='white', animated=True
+        )
+        self.depth_visible = False
+        self.depth_labels = (None, None, None)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.labels = (None, None, None)
+        self.candle_artists = OrderedDict()
+        self.candle_seconds = None
+        self.background = None
+        self.full_draws = 0
+        self.blits = 0
+
+    def style_axes(self, ax):
+        ax.set_facecolor('#2B2B2B')
+        ax.tick_params(axis='x', colors='white', labelrotation=30)
+        ax.tick_params(axis='y', colors='white')
+        ax.spines['bottom'].set_color('white')
+        ax.spines['top'].set_color('white')
+        ax.spines['left'].set_color('white')
+        ax.spines['right'].set_color('white')
+        ax.grid(True, linestyle='--', alpha=0.5)
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.full_draws += 1
+        self.draw_animated()
+
+    def animated_artists(self):
+        if self.depth_visible:
+            return (self.bid_line, self.ask_line, self.spread_text)
+        if self.candle_artists:
+            return next(reversed(self.candle_artists.values())) + self.overlay_artists
+        return (self.price_line,) + self.overlay_artists
+
+    def draw_animated(self):
+        for artist in self.animated_artists():
+            self.ax.draw_artist(artist)
+
+    def request_draw(self):
+        self.background = None
+        self.canvas.draw_idle()
+
+    def blit(self):
+        if self.background is None:
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_animated()
+        self.canvas.blit(self.ax.bbox)
+        self.blits += 1
+
+    def set_labels(self, title, xlabel, ylabel):
+        if (title, xlabel, ylabel) == self.labels:
+            return
+        self.labels = (title, xlabel, ylabel)
+        self.ax.set_title(title, color='white')
+        self.ax.set_xlabel(xlabel, color='white')
+        self.ax.set_ylabel(ylabel, color='white')
+        self.request_draw()
+
+    def set_limits(self, xmin, xmax, ymin, ymax):
+        if (xmin, xmax) == tuple(self.ax.get_xlim()) and (ymin, ymax) == tuple(self.ax.get_ylim()):
+            return False
+        self.ax.set_xlim(xmin, xmax)
+        self.ax.set_ylim(ymin, ymax)
+        return True
+
+    def set_overlay(self, x, ema, upper, lower, text=""):
+        self.ema_line.set_data(x, ema)
+        self.upper_band.set_data(x, upper)
+        self.lower_band.set_data(x, lower)
+        self.indicator_text.set_text(text)
+
+    def overlay_range(self, overlay, low, high):
+        if overlay is None:
+            return low, high
+        bands = np.concatenate(overlay[1:4])
+        bands = bands[np.isfinite(bands)]
+        if not len(bands):
+            return low, high
+        return min(low, float(bands.min())), max(high, float(bands.max()))
+
+    def set_history(self, x, y, overlay=None):
+        self.hide_depth()
+        self.clear_candles()
+        self.price_line.set_visible(True)
+        self.legend.set_visible(True)
+        self.price_line.set_data(x, y)
+        if overlay is not None:
+            self.set_overlay(*overlay)
+        ymin, ymax = self.overlay_range(overlay, float(np.min(y)), float(np.max(y)))
+        padding = (ymax - ymin) * 0.05 or ymax * 0.001
+        if self.set_limits(float(x[0]), float(x[-1]), ymin - padding, ymax + padding) or self.background is None:
+            self.request_draw()
+        else:
+            self.blit()
+
+    def clear_candles(self):
+        for wick, body in self.candle_artists.values():
+            wick.remove()
+            body.remove()
+        self.candle_artists = OrderedDict()
+        self.candle_seconds = None
+        self.set_overlay([], [], [], [])
+
+    def update_candles(self, candles, seconds, overlay=None, indicator_text=""):
+        self.hide_depth()
+        if self.candle_seconds != seconds:
+            self.clear_candles()
+            self.candle_seconds = seconds
+            self.price_line.set_visible(False)
+            self.legend.set_visible(False)
+            self.request_draw()
+        if not candles:
+            return
+        if overlay is not None:
+            self.set_overlay(*overlay, indicator_text)
+
+        full_draw = False
+        last_drawn = next(reversed(self.candle_artists)) if self.candle_artists else None
+        width = seconds / 86400 * 0.7
+        for start, open_price, high, low, close, volume in candles:
+            if last_drawn is not None and start < last_drawn:
+                continue
+            color = 'green' if close >= open_price else 'red'
+            body_low = min(open_price, close)
+            body_height = max(abs(close - open_price), high * 1e-6)
+            artists = self.candle_artists.get(start)
+            if artists is None:
+                if self.candle_artists:
+                    for artist in next(reversed(self.candle_artists.values())):
+                        artist.set_animated(False)
+                x = mdates.date2num(datetime.datetime.fromtimestamp(start))
+                wick = self.ax.plot([x, x], [low, high], color=color, linewidth=1, animated=True)[0]
+                body = Rectangle((x - width / 2, body_low), width, body_height, color=color, animated=True)
+                self.ax.add_patch(body)
+                self.candle_artists[start] = (wick, body)
+                full_draw = True
+            else:
+                wick, body = artists
+                wick.set_ydata([low, high])
+                wick.set_color(color)
+                body.set_y(body_low)
+                body.set_height(body_height)
+                body.set_color(color)
+
+        first_start = candles[0][0]
+        while self.candle_artists and next(iter(self.candle_artists)) < first_start:
+            _, (wick, body) = self.candle_artists.popitem(last=False)
+            wick.remove()
+            body.remove()
+            full_draw = True
+
+        low, high = self.overlay_range(overlay, min(c[3] for c in candles), max(c[2] for c in candles))
+        ymin, ymax = self.ax.get_ylim()
+        if full_draw or low < ymin or high > ymax:
+            padding = (high - low) * 0.05 or high * 0.001
+            self.set_limits(
+                mdates.date2num(datetime.datetime.fromtimestamp(first_start - seconds)),
+                mdates.date2num(datetime.datetime.fromtimestamp(candles[-1][0] + seconds)),
+                low - padding,
+                high + padding,
+            )
+            self.request_draw()
+        else:
+            self.blit()
+
+    def show_depth(self):
+        if self.depth_visible:
+            return
+        self.clear_candles()
+        self.ax.set_visible(False)
+        self.depth_ax.set_visible(True)
+        self.depth_visible = True
+        self.request_draw()
+
+    def hide_depth(self):
+        if not self.depth_visible:
+            return
+        self.depth_ax.set_visible(False)
+        self.ax.set_visible(True)
+        self.depth_visible = False
+        self.request_draw()
+
+    def set_depth_labels(self, title, xlabel, ylabel):
+        if (title, xlabel, ylabel) == self.depth_labels:
+            return
+        self.depth_labels = (title, xlabel, ylabel)
+        self.depth_ax.set_title(title, color='white')
+        self.depth_ax.set_xlabel(xlabel, color='white')
+        self.depth_ax.set_ylabel(ylabel, color='white')
+        self.request_draw()
+
+    def update_depth(self, bid_prices, bid_depth, ask_prices, ask_depth, sides, spread_text):
+        self.show_depth()
+        if "bids" in sides:
+            self.bid_line.set_data(bid_prices, bid_depth)
+        if "asks" in sides:
+            self.ask_line.set_data(ask_prices, ask_depth)
+        self.spread_text.set_text(spread_text)
+        if not len(bid_prices) or not len(ask_prices):
+            self.blit()
+            return
+        xmin, xmax = float(bid_prices[-1]), float(ask_prices[-1])
+        ymax = max(float(bid_depth[-1]), float(ask_depth[-1]))
+        (x0, x1), (_, y1) = self.depth_ax.get_xlim(), self.depth_ax.get_ylim()
+        if (self.background is None or xmin < x0 or xmax > x1 or ymax > y1
+                or ymax < y1 * 0.5 or xmax - xmin < (x1 - x0) * 0.5):
+            padding = (xmax - xmin) * 0.02 or xmax * 0.001
+            self.depth_ax.set_xlim(xmin - padding, xmax + padding)
+            self.depth_ax.set_ylim(0, ymax * 1.1 or 1)
+            self.request_draw()
+        else:
+            self.blit()
+
+class TokenBucket:
+    def __init__(self, per_minute=None, per_day=None, burst=1, used_header=None):
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.rate = per_minute / 60 if per_minute else per_day / 86400
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.used_header = used_header
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.day = None
+        self.used_today = 0
+        self.granted = 0
+        self.throttled = 0
+        self.denied = 0
+        self.rate_limited = 0
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        day = int(time.time() // 86400)
+        if day != self.day:
+            self.day = day
+            self.used_today = 0
+
+    def remaining_today(self):
+        if self.per_day is None:
+            return None
+        return max(self.per_day - self.used_today, 0)
+
+    def allows(self, cost, background):
+        remaining = self.remaining_today()
+        if remaining is None:
+            return True
+        reserve = self.per_day * RATE_LIMIT_DAILY_RESERVE if background else 0
+        return remaining - cost >= reserve
+
+    def wait_time(self, now, cost):
+        refill_wait = (cost - self.tokens) / self.rate if self.tokens < cost else 0.0
+        return max(self.blocked_until - now, refill_wait, 0.0)
+
+    def take(self, cost):
+        self.tokens -= cost
+        self.used_today += cost
+        self.granted += 1
+
+    def back_off(self, now, delay):
+        self.blocked_until = max(self.blocked_until, now + delay)
+        self.tokens = min(self.tokens, 0.0)
+        self.rate_limited += 1
+
+    def sync(self, used):
+        if self.per_minute:
+            self.tokens = min(self.tokens, float(self.per_minute - used))
+
+    def stats(self):
+        return {
+            "tokens": round(self.tokens, 2),
+            "capacity": self.capacity,
+            "per_minute": self.per_minute,
+            "per_day": self.per_day,
+            "remaining_today": self.remaining_today(),
+            "granted": self.granted,
+            "throttled": self.throttled,
+            "denied": self.denied,
+            "rate_limited": self.rate_limited,
+        }
+
+class RateLimiter:
+    def __init__(self, limits=None, max_wait=RATE_LIMIT_MAX_WAIT_S):
+        limits = RATE_LIMITS if limits is None else limits
+        self.buckets = {name: TokenBucket(**config) for name, config in limits.items()}
+        self.queues = {name: [] for name in self.buckets}
+        self.condition = threading.Condition()
+        self.sequence = 0
+        self.max_wait = max_wait
+        self.closed = False
+
+    def acquire(self, provider, priority=0, cost=1):
+        bucket = self.buckets.get(provider)
+        if bucket is None:
+            return True
+        cost = min(cost, bucket.capacity)
+        background = priority >= BACKGROUND_PRIORITY
+        with self.condition:
+            self.sequence += 1
+            entry = (priority, self.sequence)
+            queue = self.queues[provider]
+            heapq.heappush(queue, entry)
+            deadline = time.monotonic() + self.max_wait
+            waited = False
+            try:
+                while not self.closed:
+                    now = time.monotonic()
+                    bucket.refill(now)
+                    if not bucket.allows(cost, background):
+                        bucket.denied += 1
+                        return False
+                    if queue[0] == entry:
+                        wait = bucket.wait_time(now, cost)
+                        if wait <= 0:
+                            bucket.take(cost)
+                            bucket.throttled += waited
+                            return True
+                        if now + wait > deadline:
+                            bucket.denied += 1
+                            return False
+                    else:
+                        wait = deadline - now
+                        if wait <= 0:
+                            bucket.denied += 1
+                            return False
+                    waited = True
+                    self.condition.wait(wait)
+                return False
+            finally:
+                queue.remove(entry)
+                heapq.heapify(queue)
+                self.condition.notify_all()
+
+    def back_off(self, provider, delay):
+        bucket = self.buckets.get(provider)
+        if bucket is None:
+            return
+        with self.condition:
+            bucket.back_off(time.monotonic(), delay)
+
+    def record(self, provider, headers):
+        bucket = self.buckets.get(provider)
+        if bucket is None or bucket.used_header is None:
+            return
+        used = headers.get(bucket.used_header, "")
+        if used.isdigit():
+            with self.condition:
+                bucket.sync(int(used))
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def stats(self):
+        with self.condition:
+            now = time.monotonic()
+            stats = {}
+            for name, bucket in self.buckets.items():
+                bucket.refill(now)
+                stats[name] = dict(bucket.stats(), waiting=len(self.queues[name]))
+            return stats
+
+class HttpClient:
+    def __init__(self, connect_timeout=HTTP_CONNECT_TIMEOUT, read_timeout=HTTP_READ_TIMEOUT,
+                 pool_size=HTTP_POOL_SIZE, max_workers=HTTP_MAX_WORKERS, limiter=None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        self.session = None
+        self.session_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http")
+        self.limiter = limiter or RateLimiter()
+
+    def get_session(self):
+        with self.session_lock:
+            if self.session is None:
+                load_http_modules()
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Accept": "application/json", "Connection": "keep-alive"})
+                self.session = session
+            return self.session
+
+    def get_json(self, url, params, data_type, background=False):
+        max_retries = 3
+        wait_time = 5
+        provider = REQUEST_PROVIDERS.get(data_type)
+        priority = REQUEST_PRIORITIES.get(data_type, 1) + (BACKGROUND_PRIORITY if background else 0)
+        cost = REQUEST_COSTS.get(data_type, 1)
+        session = self.get_session()
+        for attempt in range(max_retries):
+            if not self.limiter.acquire(provider, priority, cost):
+                print(f"Request budget for {provider} exhausted, skipping {data_type}.")
+                return None
+            try:
+                response = session.get(url, params=params, timeout=self.timeout)
+                self.limiter.record(provider, response.headers)
+                if response.status_code in (418, 429):
+                    retry_after = response.headers.get("Retry-After", "")
+                    delay = float(retry_after) if retry_after.isdigit() else wait_time
+                    print(f"Rate limit reached for {data_type}. Pausing {provider} for {delay:.0f}s.")
+                    self.limiter.back_off(provider, delay)
+                    wait_time *= 2
+                    continue
+                response.raise_for_status()
+                return response.json()
+            except requests.exceptions.Timeout:
+                print(f"Timed out fetching {data_type}.")
+                return None
+            except requests.exceptions.HTTPError as e:
+                print(f"Error fetching {data_type}: {e}")
+                return None
+            except Exception as e:
+                print(f"Error fetching {data_type}: {e}")
+                return None
+        print(f"Failed to fetch {data_type}. Please try again later.")
+        return None
+
+    def submit(self, fn, *args):
+        return self.executor.submit(fn, *args)
+
+    def close(self):
+        self.limiter.close()
+        self.executor.shutdown(wait=False)
+        if self.session is not None:
+            self.session.close()
+
+class ResponseCache:
+    def __init__(self, path=RESPONSE_CACHE_FILE, max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttls=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttls = dict(RESPONSE_CACHE_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.stale_serves = 0
+        self.evictions = 0
+        self.load()
+
+    def make_key(self, url, params):
+        params = {k: v for k, v in (params or {}).items() if k not in RESPONSE_CACHE_SECRET_PARAMS}
+        return f"{url}?{urlencode(sorted(params.items()))}"
+
+    def get(self, key, data_type):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            self.entries.move_to_end(key)
+            fresh = time.time() - entry["stored_at"] < self.ttls.get(data_type, 0)
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_serves += 1
+            return entry["data"], fresh
+
+    def put(self, key, data):
+        with self.lock:
+            self.entries[key] = {"stored_at": time.time(), "data": data}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            self.dirty = True
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading response cache: {e}")
+            return
+        for key, entry in entries[-self.max_entries:]:
+            self.entries[key] = entry
+
+    def save(self, cancel_event=None):
+        if not self.path:
+            return
+        with self.save_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                entries = list(self.entries.items())
+                self.dirty = False
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Error saving response cache: {e}")
+                with self.lock:
+                    self.dirty = True
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_serves": self.stale_serves,
+                "evictions": self.evictions,
+            }
+
+class RefreshScheduler:
+    def __init__(self, root, max_workers=SCHEDULER_MAX_WORKERS):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="refresh")
+        self.lock = threading.Lock()
+        self.timers = {}
+        self.inflight = {}
+        self.coalesced = 0
+        self.cancelled = 0
+
+    def every(self, name, interval_ms, callback, run_now=False):
+        self.cancel_timer(name)
+
+        def tick():
+            self.timers[name] = self.root.after(interval_ms, tick)
+            callback()
+
+        self.timers[name] = self.root.after(0 if run_now else interval_ms, tick)
+
+    def cancel_timer(self, name):
+        timer = self.timers.pop(name, None)
+        if timer is not None:
+            self.root.after_cancel(timer)
+
+    def submit(self, key, fn, *args, replace=False):
+        with self.lock:
+            current = self.inflight.get(key)
+            if current is not None:
+                future, cancel_event = current
+                if not replace:
+                    self.coalesced += 1
+                    return future
+                cancel_event.set()
+                future.cancel()
+                self.cancelled += 1
+            cancel_event = threading.Event()
+            future = self.executor.submit(fn, *args, cancel_event=cancel_event)
+            self.inflight[key] = (future, cancel_event)
+        future.add_done_callback(lambda f: self.finish(key, f))
+        return future
+
+    def finish(self, key, future):
+        with self.lock:
+            current = self.inflight.get(key)
+            if current is not None and current[0] is future:
+                del self.inflight[key]
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Error running {key}: {future.exception()}")
+
+    def cancel(self, key):
+        with self.lock:
+            current = self.inflight.pop(key, None)
+        if current is not None:
+            future, cancel_event = current
+            cancel_event.set()
+            future.cancel()
+
+    def shutdown(self):
+        for name in list(self.timers):
+            self.cancel_timer(name)
+        with self.lock:
+            inflight = list(self.inflight.values())
+            self.inflight.clear()
+        for future, cancel_event in inflight:
+            cancel_event.set()
+            future.cancel()
+        self.executor.shutdown(wait=False)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "timers": len(self.timers),
+                "inflight": len(self.inflight),
+                "coalesced": self.coalesced,
+                "cancelled": self.cancelled,
+            }
+
+SYSTEM_METRICS_INTERVALS = {
+    "cpu": 1.0,
+    "ram": 2.0,
+    "network": 2.0,
+    "cpu_freq": 5.0,
+    "temperature": 15.0,
+    "battery": 30.0,
+    "disk": 30.0,
+}
+
+SystemSnapshot = namedtuple("SystemSnapshot", [
+    "timestamp",
+    "cpu_percent",
+    "ram_percent",
+    "disk_percent",
+    "cpu_freq_current",
+    "cpu_freq_max",
+    "net_sent_mb",
+    "net_recv_mb",
+    "net_sent_rate",
+    "net_recv_rate",
+    "battery_percent",
+    "battery_plugged",
+    "cpu_temp",
+])
+
+EMPTY_SYSTEM_SNAPSHOT = SystemSnapshot(
+    timestamp=0.0,
+    cpu_percent=0.0,
+    ram_percent=0.0,
+    disk_percent=0.0,
+    cpu_freq_current=None,
+    cpu_freq_max=None,
+    net_sent_mb=0.0,
+    net_recv_mb=0.0,
+    net_sent_rate=0.0,
+    net_recv_rate=0.0,
+    battery_percent=None,
+    battery_plugged=None,
+    cpu_temp=None,
+)
+
+class SystemMetricsCollector:
+    def __init__(self, intervals=None, on_snapshot=None):
+        self.intervals = dict(SYSTEM_METRICS_INTERVALS)
+        self.on_snapshot = on_snapshot
+        if intervals:
+            self.intervals.update(intervals)
+        self.snapshot = EMPTY_SYSTEM_SNAPSHOT
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.last_net_io = None
+        self.last_net_time = None
+        self.probes = {
+            "cpu": self.sample_cpu,
+            "ram": self.sample_ram,
+            "disk": self.sample_disk,
+            "cpu_freq": self.sample_cpu_freq,
+            "network": self.sample_network,
+            "battery": self.sample_battery,
+            "temperature": self.sample_temperature,
+        }
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        load_psutil()
+        psutil.cpu_percent(interval=None)
+        next_due = {name: 0.0 for name in self.probes}
+        while not self.stop_event.is_set():
+            now = time.monotonic()
+            updates = {}
+            for name, probe in self.probes.items():
+                if next_due[name] > now:
+                    continue
+                try:
+                    updates.update(probe())
+                except Exception as e:
+                    print(f"Error sampling {name}: {e}")
+                next_due[name] = now + self.intervals[name]
+            if updates:
+                self.snapshot = self.snapshot._replace(timestamp=time.time(), **updates)
+                if self.on_snapshot is not None:
+                    self.on_snapshot(self.snapshot)
+            self.stop_event.wait(max(0.05, min(next_due.values()) - time.monotonic()))
+
+    def sample_cpu(self):
+        return {"cpu_percent": psutil.cpu_percent(interval=None)}
+
+    def sample_ram(self):
+        return {"ram_percent": psutil.virtual_memory().percent}
+
+    def sample_disk(self):
+        return {"disk_percent": psutil.disk_usage('/').percent}
+
+    def sample_cpu_freq(self):
+        cpu_freq = psutil.cpu_freq()
+        if not cpu_freq:
+            return {"cpu_freq_current": None, "cpu_freq_max": None}
+        return {"cpu_freq_current": cpu_freq.current, "cpu_freq_max": cpu_freq.max}
+
+    def sample_network(self):
+        net_io = psutil.net_io_counters()
+        now = time.monotonic()
+        sent_rate = recv_rate = 0.0
+        if self.last_net_io is not None and now > self.last_net_time:
+            elapsed = now - self.last_net_time
+            sent_rate = (net_io.bytes_sent - self.last_net_io.bytes_sent) / elapsed / 1024
+            recv_rate = (net_io.bytes_recv - self.last_net_io.bytes_recv) / elapsed / 1024
+        self.last_net_io = net_io
+        self.last_net_time = now
+        return {
+            "net_sent_mb": net_io.bytes_sent / (1024 * 1024),
+            "net_recv_mb": net_io.bytes_recv / (1024 * 1024),
+            "net_sent_rate": sent_rate,
+            "net_recv_rate": recv_rate,
+        }
+
+    def sample_battery(self):
+        battery = psutil.sensors_battery() if hasattr(psutil, "sensors_battery") else None
+        if not battery:
+            return {"battery_percent": None, "battery_plugged": None}
+        return {"battery_percent": battery.percent, "battery_plugged": battery.power_plugged}
+
+    def sample_temperature(self):
+        try:
+            temps = psutil.sensors_temperatures()
+        except AttributeError:
+            temps = {}
+        cpu_temps = (temps or {}).get('coretemp') or (temps or {}).get('cpu-thermal') or []
+        temp_values = [t.current for t in cpu_temps if t.current is not None]
+        if not temp_values:
+            return {"cpu_temp": None}
+        return {"cpu_temp": sum(temp_values) / len(temp_values)}
+
+class TickRecorder:
+    def __init__(self, directory=TICK_RECORD_DIR, max_records=TICK_SEGMENT_MAX_RECORDS, index_stride=TICK_INDEX_STRIDE):
+        self.directory = directory
+        self.max_records = max_records
+        self.index_stride = index_stride
+        self.lock = threading.Lock()
+        self.record = np.zeros(1, dtype=TICK_RECORD_DTYPE)
+        self.index_entry = np.zeros(1, dtype=TICK_INDEX_DTYPE)
+        self.data_file = None
+        self.index_file = None
+        self.segment_records = 0
+        self.records_written = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def open_segment(self, timestamp):
+        self.close_segment()
+        base = os.path.join(self.directory, f"ticks-{int(timestamp):013d}-{self.records_written}")
+        self.data_file = open(base + ".bin", "ab")
+        self.index_file = open(base + ".idx", "ab")
+        self.segment_records = 0
+
+    def close_segment(self):
+        if self.data_file is not None:
+            self.data_file.close()
+            self.index_file.close()
+            self.data_file = None
+            self.index_file = None
+
+    def record_tick(self, symbol, price, quantity, trade_time):
+        with self.lock:
+            if self.data_file is None or self.segment_records >= self.max_records:
+                self.open_segment(trade_time)
+            record = self.record[0]
+            record["symbol"] = symbol.encode("ascii")
+            record["timestamp"] = trade_time
+            record["price"] = price
+            record["quantity"] = quantity
+            if self.segment_records % self.index_stride == 0:
+                self.index_entry[0] = (trade_time, self.segment_records)
+                self.index_file.write(self.index_entry.tobytes())
+            self.data_file.write(self.record.tobytes())
+            self.segment_records += 1
+            self.records_written += 1
+
+    def flush(self):
+        with self.lock:
+            if self.data_file is not None:
+                self.data_file.flush()
+                self.index_file.flush()
+
+    def close(self):
+        with self.lock:
+            self.close_segment()
+
+class TickRecording:
+    def __init__(self, directory=TICK_RECORD_DIR):
+        self.directory = directory
+        self.segments = []
+        for filename in sorted(os.listdir(directory)):
+            if not filename.startswith("ticks-") or not filename.endswith(".bin"):
+                continue
+            path = os.path.join(directory, filename)
+            count = os.path.getsize(path) // TICK_RECORD_DTYPE.itemsize
+            if not count:
+                continue
+            records = np.memmap(path, dtype=TICK_RECORD_DTYPE, mode="r", shape=(count,))
+            index_path = path[:-len(".bin")] + ".idx"
+            if os.path.exists(index_path) and os.path.getsize(index_path) >= TICK_INDEX_DTYPE.itemsize:
+                index = np.fromfile(index_path, dtype=TICK_INDEX_DTYPE)
+            else:
+                index = np.zeros(1, dtype=TICK_INDEX_DTYPE)
+                index[0] = (records[0]["timestamp"], 0)
+            self.segments.append((records, index))
+        self.segments.sort(key=lambda segment: segment[1]["timestamp"][0])
+
+    def __len__(self):
+        return sum(len(records) for records, _ in self.segments)
+
+    def seek(self, records, index, start_ms):
+        block = max(int(np.searchsorted(index["timestamp"], start_ms, side="right")) - 1, 0)
+        position = int(index["record"][block])
+        timestamps = records["timestamp"][position:position + TICK_INDEX_STRIDE * 2]
+        later = np.flatnonzero(timestamps >= start_ms)
+        return position + (int(later[0]) if len(later) else len(timestamps))
+
+    def chunks(self, start_ms=None, end_ms=None, chunk_size=TICK_REPLAY_CHUNK):
+        for records, index in self.segments:
+            if end_ms is not None and index["timestamp"][0] > end_ms:
+                break
+            position = 0 if start_ms is None else self.seek(records, index, start_ms)
+            while position < len(records):
+                chunk = records[position:position + chunk_size]
+                position += len(chunk)
+                if end_ms is not None and chunk["timestamp"][-1] > end_ms:
+                    yield chunk[chunk["timestamp"] <= end_ms]
+                    return
+                yield chunk
+
+class TickReplayer:
+    def __init__(self, directory=TICK_RECORD_DIR, speed=1.0, start_ms=None, end_ms=None):
+        self.recording = TickRecording(directory)
+        self.speed = speed
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.ticks_replayed = 0
+
+    def start(self, on_tick, on_done=None):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, args=(on_tick, on_done), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self, on_tick, on_done=None):
+        symbols = {}
+        first_tick = None
+        started = time.perf_counter()
+        for chunk in self.recording.chunks(self.start_ms, self.end_ms):
+            if self.stop_event.is_set():
+                break
+            for raw_symbol, trade_time, price, quantity in chunk.tolist():
+                if self.speed:
+                    if first_tick is None:
+                        first_tick = trade_time
+                    delay = (trade_time - first_tick) / 1000 / self.speed - (time.perf_counter() - started)
+                    if delay > 0.001:
+                        if self.stop_event.wait(delay):
+                            break
+                symbol = symbols.get(raw_symbol)
+                if symbol is None:
+                    symbol = symbols[raw_symbol] = raw_symbol.decode("ascii")
+                on_tick(symbol, price, quantity, trade_time)
+                self.ticks_replayed += 1
+        if on_done is not None:
+            on_done()
+
+class ThreadTimer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timers = {}
+        self.next_id = 0
+
+    def after(self, ms, callback, *args):
+        with self.lock:
+            self.next_id += 1
+            timer_id = self.next_id
+            timer = threading.Timer(ms / 1000, self.fire, args=(timer_id, callback, args))
+            timer.daemon = True
+            self.timers[timer_id] = timer
+        timer.start()
+        return timer_id
+
+    def fire(self, timer_id, callback, args):
+        with self.lock:
+            self.timers.pop(timer_id, None)
+        callback(*args)
+
+    def after_cancel(self, timer_id):
+        with self.lock:
+            timer = self.timers.pop(timer_id, None)
+        if timer is not None:
+            timer.cancel()
+
+def load_api_keys(required=True):
+    if os.path.exists(API_KEYS_FILE):
+        with open(API_KEYS_FILE, "r") as f:
+            api_keys = json.load(f)
+        if required and (not api_keys.get('newsapi') or not api_keys.get('cryptocompare')):
+            print("API keys are missing. Please run 'baslat.bat' and enter your API keys.")
+            exit()
+        return api_keys
+    if not required:
+        return {}
+    print("API keys not found. Please run 'baslat.bat' and enter your API keys.")
+    exit()
+
+def use_hub(url):
+    global BINANCE_STREAM_URL, BINANCE_REST_URL, COINGECKO_API_URL, NEWSAPI_URL, CRYPTOCOMPARE_NEWS_URL, RATE_LIMITS
+    global HISTORY_ARCHIVE_DIR, HUB_URL
+    url = url.rstrip("/")
+    if "://" not in url:
+        url = f"http://{url}"
+    HUB_URL = url
+    HISTORY_ARCHIVE_DIR = os.path.join(HISTORY_ARCHIVE_DIR, re.sub(r"[^\w.-]", "_", urlparse(url).netloc))
+    BINANCE_STREAM_URL = f"ws{url[4:]}/stream"
+    BINANCE_REST_URL = f"{url}/api/v3"
+    COINGECKO_API_URL = f"{url}/coingecko"
+    NEWSAPI_URL = f"{url}/newsapi"
+    CRYPTOCOMPARE_NEWS_URL = f"{url}/cryptocompare"
+    RATE_LIMITS = {}
+
+def websocket_frame(payload, opcode=0x1):
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 65536:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+class HubSubscriber:
+    def __init__(self, conn, streams=None, queue_limit=HUB_QUEUE_LIMIT):
+        self.conn = conn
+        self.streams = streams
+        self.queue_limit = queue_limit
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.send_lock = threading.Lock()
+        self.closed = False
+        self.sent = 0
+        self.conflated = 0
+
+    def wants(self, stream):
+        return self.streams is None or stream in self.streams
+
+    def push(self, stream, frame):
+        with self.condition:
+            if self.closed:
+                return False
+            self.queue.append((stream, frame))
+            if len(self.queue) > self.queue_limit:
+                latest = {}
+                for key, item in self.queue:
+                    latest.pop(key, None)
+                    latest[key] = item
+                self.conflated += len(self.queue) - len(latest)
+                if len(latest) > self.queue_limit:
+                    self.closed = True
+                    self.condition.notify()
+                    return False
+                self.queue = deque(latest.items())
+            self.condition.notify()
+            return True
+
+    def run_sender(self):
+        while True:
+            with self.condition:
+                while not self.queue and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    break
+                count = len(self.queue)
+                batch = b"".join(frame for _, frame in self.queue)
+                self.queue.clear()
+            try:
+                with self.send_lock:
+                    self.conn.sendall(batch)
+            except OSError:
+                break
+            self.sent += count
+        self.close()
+
+    def read_exact(self, size):
+        data = b""
+        while len(data) < size:
+            try:
+                chunk = self.conn.recv(size - len(data))
+            except socket.timeout:
+                if self.closed:
+                    raise ConnectionError("subscriber closed")
+                continue
+            if not chunk:
+                raise ConnectionError("subscriber disconnected")
+            data += chunk
+        return data
+
+    def read_loop(self):
+        while not self.closed:
+            first, second = self.read_exact(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", self.read_exact(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", self.read_exact(8))[0]
+            mask = self.read_exact(4) if second & 0x80 else None
+            payload = self.read_exact(length)
+            if mask is not None:
+                payload = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+            if opcode == 0x8:
+                self.send_control(0x8, payload[:2])
+                return
+            if opcode == 0x9:
+                self.send_control(0xA, payload)
+
+    def send_control(self, opcode, payload):
+        with self.send_lock:
+            self.conn.sendall(websocket_frame(payload, opcode))
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+
+class FanoutServer:
+    def __init__(self, engine, host=HUB_HOST, port=HUB_PORT, queue_limit=HUB_QUEUE_LIMIT):
+        self.engine = engine
+        self.host = host
+        self.port = port
+        self.queue_limit = queue_limit
+        self.sock = None
+        self.running = False
+        self.lock = threading.Lock()
+        self.subscribers = []
+        self.kline_streams = {}
+        self.trade_streams = {symbol: stream for stream, symbol in engine.stream_symbols.items()}
+        self.depth_streams = {symbol: stream for stream, symbol in engine.depth_streams.items()}
+        self.connections = 0
+        self.dropped = 0
+        self.requests = 0
+
+    def start(self):
+        load_hub_modules()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen(64)
+        self.port = self.sock.getsockname()[1]
+        self.running = True
+        self.engine.subscribe("tick", self.on_tick)
+        self.engine.subscribe("depth_diff", self.on_depth_diff)
+        threading.Thread(target=self.accept_loop, daemon=True, name="hub").start()
+        print(f"Serving ticks on ws://{self.host}:{self.port}/stream and data on http://{self.host}:{self.port}")
+        return self
+
+    def close(self):
+        self.running = False
+        self.engine.unsubscribe("tick", self.on_tick)
+        self.engine.unsubscribe("depth_diff", self.on_depth_diff)
+        if self.sock is not None:
+            self.sock.close()
+        with self.lock:
+            subscribers, self.subscribers = self.subscribers, []
+        for subscriber in subscribers:
+            subscriber.close()
+
+    def accept_loop(self):
+        while self.running:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.serve, args=(conn,), daemon=True).start()
+
+    def serve(self, conn):
+        try:
+            conn.settimeout(HUB_SEND_TIMEOUT_S)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            request = b""
+            while b"\r\n\r\n" not in request:
+                chunk = conn.recv(4096)
+                if not chunk or len(request) > HUB_REQUEST_MAX_BYTES:
+                    return
+                request += chunk
+            lines = request.split(b"\r\n\r\n", 1)[0].decode("latin-1").split("\r\n")
+            method, target, _ = lines[0].split(" ", 2)
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            url = urlparse(target)
+            query = parse_qs(url.query)
+            if method != "GET":
+                self.respond(conn, 405, {"error": "only GET is supported"})
+            elif url.path == "/stream" and headers.get("upgrade", "").lower() == "websocket":
+                self.serve_stream(conn, headers, query)
+            else:
+                self.requests += 1
+                status, payload = self.handle_get(url.path, {name: values[-1] for name, values in query.items()})
+                self.respond(conn, status, payload)
+        except (OSError, ValueError) as e:
+            print(f"Hub connection error: {e}")
+        finally:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def respond(self, conn, status, payload):
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        conn.sendall((
+            f"HTTP/1.1 {HUB_STATUS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode() + body)
+
+    def handle_get(self, path, params):
+        try:
+            limit = int(params["limit"]) if "limit" in params else None
+        except ValueError:
+            return 400, {"error": "bad limit"}
+        if path == "/snapshot":
+            return 200, self.engine.market_snapshot.to_dict()
+        if path == "/candles":
+            aggregator = self.engine.candle_aggregators.get(params.get("symbol", "").upper())
+            timeframe = params.get("timeframe")
+            if aggregator is None or timeframe not in aggregator.timeframes:
+                return 404, {"error": "unknown symbol or timeframe"}
+            return 200, {"candles": aggregator.get_candles(timeframe, limit), "indicators": aggregator.indicator_values(timeframe)}
+        if path == "/stats":
+            return 200, self.stats()
+        if path == "/api/v3/depth":
+            book = self.engine.order_books.get(params.get("symbol", "")[:-4])
+            snapshot = book.snapshot(limit or DEPTH_SNAPSHOT_LIMIT) if book is not None else None
+            if snapshot is not None:
+                return 200, snapshot
+        if path == "/api/v3/klines":
+            klines = self.klines(params, limit or KLINE_LIMIT)
+            if klines is not None:
+                return 200, klines
+        return self.proxy(path, params)
+
+    def klines(self, params, limit):
+        symbol = params.get("symbol", "")[:-4]
+        aggregator = self.engine.candle_aggregators.get(symbol)
+        timeframe = params.get("interval")
+        if aggregator is None or timeframe not in aggregator.timeframes:
+            return None
+        if symbol not in self.engine.candle_history_requested:
+            self.engine.request_candle_history(symbol)
+            return None
+        seconds = aggregator.timeframes[timeframe]
+        candles = aggregator.get_candles(timeframe, limit)
+        return [
+            [start * 1000, open_price, high, low, close, volume, (start + seconds) * 1000 - 1]
+            for start, open_price, high, low, close, volume in candles
+        ]
+
+    def proxy(self, path, params):
+        if path.startswith("/coingecko/coins/") and path.endswith("/market_chart"):
+            data_type = "price history"
+        else:
+            data_type = HUB_ROUTES.get(path)
+        if data_type is None:
+            return 404, {"error": f"unknown path {path}"}
+        if path.startswith("/api/v3/"):
+            url = BINANCE_REST_URL + path[len("/api/v3"):]
+        elif path.startswith("/coingecko/"):
+            url = COINGECKO_API_URL + path[len("/coingecko"):]
+        elif path == "/newsapi":
+            url = NEWSAPI_URL
+            params = dict(params, apiKey=self.engine.api_keys.get("newsapi") or params.get("apiKey"))
+        else:
+            url = CRYPTOCOMPARE_NEWS_URL
+            params = dict(params, api_key=self.engine.api_keys.get("cryptocompare") or params.get("api_key"))
+        if REQUEST_PROVIDERS.get(data_type) == "binance":
+            data = self.engine.http_client.get_json(url, params, data_type)
+        else:
+            data = self.engine.make_request(url, params, data_type)
+        if data is None:
+            return 502, {"error": f"upstream {data_type} request failed"}
+        return 200, data
+
+    def serve_stream(self, conn, headers, query):
+        accept = base64.b64encode(hashlib.sha1((headers.get("sec-websocket-key", "") + WEBSOCKET_GUID).encode()).digest())
+        conn.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept.decode()}\r\n\r\n"
+        ).encode())
+        streams = set(query["streams"][-1].split("/")) if "streams" in query else None
+        subscriber = HubSubscriber(conn, streams, self.queue_limit)
+        with self.lock:
+            self.subscribers = self.subscribers + [subscriber]
+            self.connections += 1
+            self.update_kline_streams()
+        threading.Thread(target=subscriber.run_sender, daemon=True, name="hub-sender").start()
+        try:
+            subscriber.read_loop()
+        except (OSError, ConnectionError):
+            pass
+        finally:
+            self.remove(subscriber)
+
+    def update_kline_streams(self):
+        kline_streams = {}
+        for subscriber in self.subscribers:
+            for stream in subscriber.streams or ():
+                pair, _, timeframe = stream.partition("@kline_")
+                symbol = pair[:-4].upper()
+                if timeframe in CANDLE_TIMEFRAMES and symbol in self.trade_streams:
+                    kline_streams.setdefault(symbol, set()).add((stream, timeframe))
+        self.kline_streams = kline_streams
+
+    def remove(self, subscriber, dropped=False):
+        subscriber.close()
+        with self.lock:
+            if subscriber not in self.subscribers:
+                return
+            self.subscribers = [s for s in self.subscribers if s is not subscriber]
+            self.update_kline_streams()
+            if dropped:
+                self.dropped += 1
+
+    def broadcast(self, subscribers, stream, encode):
+        frame = None
+        for subscriber in subscribers:
+            if not subscriber.wants(stream):
+                continue
+            if frame is None:
+                frame = websocket_frame(encode().encode())
+            if not subscriber.push(stream, frame):
+                self.remove(subscriber, dropped=True)
+
+    def on_tick(self, symbol, price, quantity, trade_time):
+        subscribers = self.subscribers
+        if not subscribers:
+            return
+        stream = self.trade_streams[symbol]
+        trade_id = self.engine.last_trade_ids.get(symbol, 0)
+        self.broadcast(subscribers, stream, lambda: (
+            f'{{"stream":"{stream}","data":{{"e":"trade","E":{trade_time},"s":"{symbol}USDT","t":{trade_id},'
+            f'"p":"{price:.8f}","q":"{quantity:.8f}","T":{trade_time},"m":false,"M":true}}}}'
+        ))
+        for kline_stream, timeframe in self.kline_streams.get(symbol, ()):
+            self.broadcast(subscribers, kline_stream, lambda: self.encode_kline(kline_stream, symbol, timeframe, trade_time))
+
+    def encode_kline(self, stream, symbol, timeframe, event_time):
+        start, open_price, high, low, close, volume = self.engine.candle_aggregators[symbol].get_candles(timeframe, 1)[-1]
+        seconds = CANDLE_TIMEFRAMES[timeframe]
+        return json.dumps({"stream": stream, "data": {"e": "kline", "E": event_time, "s": f"{symbol}USDT", "k": {
+            "t": start * 1000, "T": (start + seconds) * 1000 - 1, "i": timeframe,
+            "o": open_price, "h": high, "l": low, "c": close, "v": volume,
+        }}}, separators=(",", ":"))
+
+    def on_depth_diff(self, symbol, event):
+        subscribers = self.subscribers
+        if subscribers:
+            stream = self.depth_streams[symbol]
+            self.broadcast(subscribers, stream, lambda: json.dumps({"stream": stream, "data": event}, separators=(",", ":")))
+
+    def stats(self):
+        subscribers = self.subscribers
+        return {
+            "subscribers": len(subscribers),
+            "connections": self.connections,
+            "dropped": self.dropped,
+            "requests": self.requests,
+            "conflated": sum(subscriber.conflated for subscriber in subscribers),
+            "sent": sum(subscriber.sent for subscriber in subscribers),
+            "response_cache": self.engine.response_cache.stats(),
+        }
+
+class CryptoEngine:
+    def __init__(self, api_keys, timer=None):
+        self.api_keys = api_keys
+        self.timer = timer or ThreadTimer()
+        self.replayer = None
+        self.recorder = None
+        self.hub = None
+        self.ws = None
+        self.crypto_id = CRYPTOCURRENCIES[0]["id"]
+        self.crypto_symbol = CRYPTOCURRENCIES[0]["symbol"]
+        self.currency = "USD"
+        self.language_code = DEFAULT_LANGUAGE_CODE
+        self.investment = 0.0
+        self.purchase_price = 0.0
+        self.stop_price = 0.0
+        self.pending_position = None
+        self.portfolio = Portfolio()
+        self.portfolio.load()
+        self.entry_position_id = None
+        self.alert_engine = AlertEngine()
+        self.alert_engine.load()
+        self.entry_stop_alert_id = None
+        self.stop_triggered = False
+        self.crypto_data = {}
+        self.market_snapshot = MarketSnapshot()
+        self.fx = FxRates()
+        self.fx_rate = self.fx.rate(self.currency)
+        self.news_items = []
+        self.comments_items = []
+        self.news_source = ""
+        self.comments_source = ""
+        self.prices = {}
+        self.last_trade_ids = {}
+        self.last_trade_times = {}
+        self.ws_stop_event = threading.Event()
+        self.ws_attempt = 0
+        self.ws_connected_once = False
+        self.ws_reconnects = 0
+        self.last_message_at = None
+        self.backfilling = False
+        self.backfill_buffer = []
+        self.backfill_lock = threading.Lock()
+        self.backfilled_trades = 0
+        self.trade_decoder = TradeDecoder()
+        self.price_history_store = PriceHistoryStore()
+        self.history_archive = HistoryArchiveStore(HISTORY_ARCHIVE_DIR)
+        self.stream_symbols = {f"{c['symbol'].lower()}usdt@trade": c["symbol"] for c in CRYPTOCURRENCIES}
+        self.depth_streams = {f"{c['symbol'].lower()}usdt{DEPTH_STREAM_SUFFIX}": c["symbol"] for c in CRYPTOCURRENCIES}
+        self.order_books = {c["symbol"]: OrderBook(c["symbol"]) for c in CRYPTOCURRENCIES}
+        self.candle_aggregators = {c["symbol"]: CandleAggregator() for c in CRYPTOCURRENCIES}
+        self.candle_history_requested = set()
+        self.history_overlays = {}
+        self.subscribers = {topic: [] for topic in ENGINE_TOPICS}
+        self.subscribers_lock = threading.Lock()
+        self.metrics_collector = SystemMetricsCollector(on_snapshot=lambda snapshot: self.publish("metrics", snapshot))
+        self.http_client = HttpClient()
+        self.response_cache = ResponseCache()
+        self.revalidating = set()
+        self.revalidating_lock = threading.Lock()
+        self.scheduler = RefreshScheduler(self.timer)
+
+    def subscribe(self, topic, callback):
+        with self.subscribers_lock:
+            self.subscribers[topic] = self.subscribers[topic] + [callback]
+        return callback
+
+    def unsubscribe(self, topic, callback):
+        with self.subscribers_lock:
+            self.subscribers[topic] = [cb for cb in self.subscribers[topic] if cb is not callback]
+
+    def publish(self, topic, *args):
+        for callback in self.subscribers[topic]:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error in {topic} subscriber: {e}")
+
+    def start(self):
+        if self.replayer is not None:
+            self.replayer.start(self.ingest_tick)
+        else:
+            self.start_websocket()
+            self.scheduler.every("stream_watchdog", WS_WATCHDOG_INTERVAL_MS, self.check_stream_staleness)
+            self.request_candle_history(self.crypto_symbol)
+        self.refresh_static_data()
+        self.scheduler.every("fx_rates", FX_REFRESH_MS, self.refresh_fx_rates)
+        self.scheduler.every("response_cache", RESPONSE_CACHE_SAVE_MS, self.save_response_cache)
+
+    def stop(self):
+        if self.replayer is not None:
+            self.replayer.stop()
+        if self.hub is not None:
+            self.hub.close()
+        self.stop_websocket()
+        self.metrics_collector.stop()
+        self.scheduler.shutdown()
+        self.http_client.close()
+        self.response_cache.save()
+
+    def select(self, crypto_id=None, crypto_symbol=None, currency=None, language_code=None):
+        if crypto_id is not None and crypto_id != self.crypto_id:
+            self.crypto_id = crypto_id
+            self.crypto_symbol = crypto_symbol
+            if self.entry_position_id is not None:
+                self.portfolio.update(self.entry_position_id, symbol=crypto_symbol)
+            self.arm_entry_stop()
+            self.request_candle_history(crypto_symbol)
+            self.crypto_data = {}
+            self.news_items = []
+            self.comments_items = []
+        if currency is not None and currency != self.currency:
+            self.currency = currency
+            self.fx_rate = self.fx.rate(currency)
+        if language_code is not None:
+            self.language_code = language_code
+        if not len(self.price_series()):
+            self.merge_price_history(self.crypto_id, *self.read_price_history(self.crypto_id))
+        crypto_data = self.market_snapshot.get(self.crypto_id, self.currency)
+        if crypto_data:
+            self.crypto_data = crypto_data
+            self.publish("market", self.crypto_id, self.currency, crypto_data)
+        self.refresh_static_data()
+
+    def set_position(self, investment, purchase_price, stop_price, currency=None):
+        currency = currency or self.currency
+        rate = self.fx.rate(currency)
+        if rate is None:
+            self.pending_position = (investment, purchase_price, stop_price, currency)
+            return
+        self.pending_position = None
+        self.investment = investment / rate
+        self.purchase_price = purchase_price / rate
+        self.stop_price = stop_price / rate
+        quantity = self.investment / self.purchase_price if self.purchase_price else 0.0
+        if self.entry_position_id is None:
+            self.entry_position_id = self.portfolio.add(self.crypto_symbol, quantity, self.purchase_price, self.stop_price)
+        else:
+            self.portfolio.update(
+                self.entry_position_id, quantity=quantity, cost_basis=self.purchase_price, stop=self.stop_price
+            )
+        self.arm_entry_stop()
+
+    def arm_entry_stop(self):
+        if self.entry_stop_alert_id is not None:
+            self.alert_engine.cancel(self.entry_stop_alert_id)
+            self.entry_stop_alert_id = None
+        self.stop_triggered = False
+        if self.stop_price > 0:
+            self.entry_stop_alert_id = self.alert_engine.add_level(
+                self.crypto_symbol, self.stop_price, direction="below", tag="stop_loss"
+            )
+
+    def price_series(self):
+        return self.price_history_store.get(self.crypto_id, QUOTE_CURRENCY)
+
+    def start_websocket(self):
+        self.ws_stop_event.clear()
+        self.ws_thread = threading.Thread(target=self.run_websocket)
+        self.ws_thread.daemon = True
+        self.ws_thread.start()
+
+    def run_websocket(self):
+        load_websocket()
+        while not self.ws_stop_event.is_set():
+            streams = list(self.stream_symbols) + list(self.depth_streams)
+            websocket_url = f"{BINANCE_STREAM_URL}?streams={'/'.join(streams)}"
+            self.ws = websocket.WebSocketApp(websocket_url,
+                                             on_open=self.on_open,
+                                             on_message=self.on_message,
+                                             on_error=self.on_error,
+                                             on_close=self.on_close)
+            self.ws.run_forever(ping_interval=WS_PING_INTERVAL_S, ping_timeout=WS_PING_TIMEOUT_S)
+            if self.ws_stop_event.is_set():
+                break
+            delay = self.reconnect_delay()
+            print(f"WebSocket reconnecting in {delay:.1f}s")
+            self.ws_stop_event.wait(delay)
+
+    def reconnect_delay(self):
+        ceiling = min(WS_BACKOFF_MAX_S, WS_BACKOFF_BASE_S * 2 ** self.ws_attempt)
+        self.ws_attempt += 1
+        return random.uniform(ceiling / 2, ceiling)
+
+    def stop_websocket(self):
+        self.ws_stop_event.set()
+        if self.ws is not None:
+            self.ws.close()
+
+    def check_stream_staleness(self):
+        last_message_at = self.last_message_at
+        if self.ws is None or last_message_at is None or self.ws_stop_event.is_set():
+            return
+        silence = time.monotonic() - last_message_at
+        if silence > WS_STALE_AFTER_S:
+            print(f"WebSocket silent for {silence:.0f}s, reconnecting")
+            self.last_message_at = None
+            self.ws.close()
+
+    def connection_stats(self):
+        last_message_at = self.last_message_at
+        return {
+            "reconnects": self.ws_reconnects,
+            "backfilled_trades": self.backfilled_trades,
+            "backfilling": self.backfilling,
+            "last_message_age_s": None if last_message_at is None else time.monotonic() - last_message_at,
+        }
+
+    def on_open(self, ws):
+        self.last_message_at = time.monotonic()
+        if not self.ws_connected_once:
+            self.ws_connected_once = True
+            return
+        self.ws_reconnects += 1
+        for book in self.order_books.values():
+            book.reset()
+        self.start_backfill()
+
+    def on_message(self, ws, message):
+        self.last_message_at = time.monotonic()
+        if self.ws_attempt:
+            self.ws_attempt = 0
+        if self.backfilling:
+            with self.backfill_lock:
+                if self.backfilling:
+                    self.backfill_buffer.append(message)
+                    return
+        self.handle_message(message)
+
+    def is_depth_message(self, message):
+        stream_at = message.find('@', 11, 48)
+        return stream_at > 0 and message.startswith('@depth', stream_at)
+
+    def handle_message(self, message):
+        if self.is_depth_message(message):
+            self.handle_depth_message(message)
+            return
+        trade = self.trade_decoder.decode(message)
+        if trade is None:
+            return
+        symbol = self.stream_symbols.get(trade.stream)
+        if symbol is None:
+            return
+        self.last_trade_ids[symbol] = trade.trade_id
+        self.last_trade_times[symbol] = trade.trade_time
+        self.ingest_tick(symbol, trade.price, trade.quantity, trade.trade_time)
+
+    def handle_depth_message(self, message):
+        try:
+            envelope = json.loads(message)
+            symbol = self.depth_streams.get(envelope.get("stream"))
+            event = envelope["data"]
+        except (ValueError, KeyError, TypeError):
+            return
+        if symbol is None:
+            return
+        self.publish("depth_diff", symbol, event)
+        book = self.order_books[symbol]
+        if book.on_diff(event):
+            self.publish("depth", symbol)
+        else:
+            self.request_depth_snapshot(book)
+
+    def request_depth_snapshot(self, book):
+        with book.lock:
+            if book.snapshot_pending:
+                return
+            book.snapshot_pending = True
+        self.http_client.submit(self.fetch_depth_snapshot, book)
+
+    def fetch_depth_snapshot(self, book):
+        params = {"symbol": f"{book.symbol}USDT", "limit": DEPTH_SNAPSHOT_LIMIT}
+        snapshot = self.http_client.get_json(f"{BINANCE_REST_URL}/depth", params, "depth snapshot")
+        if not snapshot or not book.load_snapshot(snapshot):
+            with book.lock:
+                book.snapshot_pending = False
+            return
+        self.publish("depth", book.symbol)
+
+    def start_backfill(self):
+        gaps = {
+            symbol: (trade_time, self.last_trade_ids.get(symbol, -1))
+            for symbol, trade_time in self.last_trade_times.items()
+        }
+        if not gaps:
+            return
+        with self.backfill_lock:
+            self.backfilling = True
+        self.http_client.submit(self.backfill_trades, gaps, int(time.time() * 1000))
+
+    def backfill_trades(self, gaps, end_ms):
+        try:
+            for symbol, (start_ms, last_trade_id) in gaps.items():
+                self.backfill_symbol(symbol, start_ms, last_trade_id, end_ms)
+        except Exception as e:
+            print(f"Error backfilling trades: {e}")
+        finally:
+            self.drain_backfill_buffer()
+
+    def backfill_symbol(self, symbol, start_ms, last_trade_id, end_ms):
+        url = f"{BINANCE_REST_URL}/aggTrades"
+        filled = 0
+        for _ in range(BACKFILL_MAX_PAGES):
+            if start_ms > end_ms:
+                break
+            window_end = min(end_ms, start_ms + BACKFILL_WINDOW_MS - 1)
+            params = {"symbol": f"{symbol}USDT", "startTime": start_ms, "endTime": window_end, "limit": BACKFILL_LIMIT}
+            trades = self.http_client.get_json(url, params, "trade backfill")
+            if trades is None:
+                break
+            for trade in trades:
+                if trade["l"] <= last_trade_id:
+                    continue
+                last_trade_id = trade["l"]
+                self.last_trade_ids[symbol] = last_trade_id
+                self.last_trade_times[symbol] = trade["T"]
+                self.ingest_tick(symbol, float(trade["p"]), float(trade["q"]), trade["T"])
+                filled += 1
+            if len(trades) < BACKFILL_LIMIT:
+                start_ms = window_end + 1
+            else:
+                start_ms = max(trades[-1]["T"], start_ms + 1)
+        self.backfilled_trades += filled
 
-COINGECKO_API_URL = "https://api.coingecko.com/api/v3"
+    def drain_backfill_buffer(self):
+        while True:
+            with self.backfill_lock:
+                messages, self.backfill_buffer = self.backfill_buffer, []
+                if not messages:
+                    self.backfilling = False
+                    return
+            trades = []
+            for message in messages:
+                if self.is_depth_message(message):
+                    self.handle_depth_message(message)
+                else:
+                    trades.append(message)
+            self.ingest_trade_batch(trades)
 
-CRYPTOCURRENCIES = [
-    {"id": "bitcoin", "symbol": "BTC"},
-    {"id": "ethereum", "symbol": "ETH"},
-    {"id": "solana", "symbol": "SOL"},
-    {"id": "cardano", "symbol": "ADA"},
-    {"id": "ripple", "symbol": "XRP"},
-]
+    def ingest_trade_batch(self, messages):
+        decoder = self.trade_decoder
+        count = decoder.decode_batch(messages)
+        for i in range(count):
+            symbol = self.stream_symbols.get(decoder.batch_streams[i])
+            if symbol is None:
+                continue
+            trade_id = int(decoder.batch_trade_ids[i])
+            if trade_id <= self.last_trade_ids.get(symbol, -1):
+                continue
+            trade_time = int(decoder.batch_trade_times[i])
+            self.last_trade_ids[symbol] = trade_id
+            self.last_trade_times[symbol] = trade_time
+            self.ingest_tick(symbol, float(decoder.batch_prices[i]), float(decoder.batch_quantities[i]), trade_time)
 
-LANGUAGES = {
-    "🇬🇧 English": "en",
-    "🇹🇷 Türkçe": "tr",
-    "🇫🇷 Français": "fr",
-    "🇩🇪 Deutsch": "de",
-    "🇪🇸 Español": "es",
-    "🇷🇺 Русский": "ru",
-}
+    def ingest_tick(self, symbol, price, quantity, trade_time):
+        self.prices[symbol] = price
+        aggregator = self.candle_aggregators[symbol]
+        aggregator.add_tick(price, quantity, trade_time / 1000)
+        for alert in self.alert_engine.on_tick(symbol, price, trade_time, aggregator.indicator_values):
+            if alert["id"] == self.entry_stop_alert_id:
+                self.stop_triggered = True
+            self.publish("alert", alert)
+        self.portfolio.revalue(symbol, price)
+        self.publish("tick", symbol, price, quantity, trade_time)
 
-CURRENCIES = {
-    "USD": ["en", "es"],
-    "TRY": ["tr"],
-    "EUR": ["fr", "de"],
-    "RUB": ["ru"],
-}
+    def request_candle_history(self, symbol):
+        if self.replayer is not None or symbol in self.candle_history_requested:
+            return
+        self.candle_history_requested.add(symbol)
+        self.http_client.submit(self.fetch_candle_history, symbol)
 
-API_KEYS_FILE = "api_keys.json"
+    def fetch_candle_history(self, symbol):
+        aggregator = self.candle_aggregators[symbol]
+        for timeframe in CANDLE_TIMEFRAMES:
+            params = {"symbol": f"{symbol}USDT", "interval": timeframe, "limit": KLINE_LIMIT}
+            klines = self.http_client.get_json(f"{BINANCE_REST_URL}/klines", params, "candle history")
+            if not klines:
+                self.candle_history_requested.discard(symbol)
+                return
+            rows = np.array([kline[:6] for kline in klines], dtype=np.float64)
+            rows[:, 0] /= 1000
+            aggregator.load_history(timeframe, rows)
+
+    def on_error(self, ws, error):
+        print(f"WebSocket Error: {error}")
+
+    def on_close(self, ws, close_status_code, close_msg):
+        print("WebSocket Connection Closed")
+
+    def refresh_static_data(self):
+        self.submit_static_data(replace=True)
+        self.scheduler.every("static_data", STATIC_DATA_REFRESH_MS, self.submit_static_data)
+
+    def submit_static_data(self, replace=False):
+        self.scheduler.submit(
+            "static_data", self.fetch_static_data_threaded,
+            self.crypto_id, self.crypto_symbol, self.currency, self.language_code, not replace, replace=replace
+        )
+
+    def request_budget(self):
+        return self.http_client.limiter.stats()
+
+    def fetch_price_history(self, crypto_id, background=False):
+        archive = self.history_archive.get(crypto_id)
+        last = archive.last_timestamp()
+        now_ms = int(time.time() * 1000)
+        if last is None or now_ms - last > HISTORY_TAIL_MAX_AGE_S * 1000:
+            days = HISTORY_INITIAL_DAYS if last is None else min(-(-(now_ms - last) // DAY_MS) + 1, HISTORY_INITIAL_DAYS)
+            url = f"{COINGECKO_API_URL}/coins/{crypto_id}/market_chart"
+            params = {
+                "vs_currency": QUOTE_CURRENCY.lower(),
+                "days": str(days),
+                "interval": "daily",
+            }
+            data = self.make_request(url, params, "price history", background)
+            price_history = np.asarray(data.get("prices", []) if data else [], dtype=np.float64).reshape(-1, 2)
+            archive.append(price_history[:, 0].astype(np.int64), price_history[:, 1])
+        return self.read_price_history(crypto_id)
+
+    def read_price_history(self, crypto_id):
+        start_ms = int(time.time() * 1000) - max(HISTORY_RANGES.values()) * DAY_MS
+        return self.history_archive.get(crypto_id).read(start_ms)
+
+    def merge_price_history(self, crypto_id, timestamps, prices):
+        if not len(timestamps):
+            return
+        series = self.price_history_store.merge(crypto_id, QUOTE_CURRENCY, timestamps, prices)
+        with self.price_history_store.lock:
+            timestamps, prices = (column.copy() for column in series.view())
+        self.history_overlays[crypto_id] = indicator_overlay(timestamps, prices)
+
+    def fetch_static_data_threaded(self, crypto_id, crypto_symbol, currency, language_code, background=False,
+                                   cancel_event=None):
+        snapshot_future = None
+        if self.market_snapshot.age() > MARKET_SNAPSHOT_MAX_AGE_S:
+            snapshot_future = self.http_client.submit(self.fetch_market_snapshot, background)
+        price_history_future = self.http_client.submit(self.fetch_price_history, crypto_id, background)
+        news_future = self.http_client.submit(self.fetch_news, crypto_id, language_code, background)
+        comments_future = self.http_client.submit(self.fetch_professional_comments, crypto_symbol, language_code, background)
+        if snapshot_future is not None:
+            snapshot_future.result()
+        crypto_data = self.market_snapshot.get(crypto_id, currency)
+        timestamps, prices = price_history_future.result()
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        if crypto_data and len(timestamps):
+            self.merge_price_history(crypto_id, timestamps, prices)
+            self.crypto_data = crypto_data
+            self.publish("market", crypto_id, currency, crypto_data)
+        news_items = news_future.result()
+        comments_items = comments_future.result()
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        self.news_items = news_items
+        self.comments_items = comments_items
+        self.publish("news", news_items, comments_items)
+
+    def fetch_market_snapshot(self, background=False, cancel_event=None):
+        crypto_ids = ",".join(self.market_snapshot.crypto_ids)
+        markets = self.make_request(f"{COINGECKO_API_URL}/coins/markets", {
+            "vs_currency": "usd",
+            "ids": crypto_ids,
+            "order": "market_cap_desc",
+            "sparkline": False,
+            "price_change_percentage": "1h,24h,7d",
+        }, "crypto data", background)
+        price_table = self.make_request(f"{COINGECKO_API_URL}/simple/price", {
+            "ids": crypto_ids,
+            "vs_currencies": ",".join(self.market_snapshot.currencies),
+            "include_market_cap": "true",
+            "include_24hr_vol": "true",
+            "include_24hr_change": "true",
+        }, "price table", background)
+        if isinstance(markets, list) and isinstance(price_table, dict):
+            self.market_snapshot.update(markets, price_table)
+            self.fx.update_from_snapshot(self.market_snapshot)
+            self.fx_rate = self.fx.rate(self.currency)
+            if self.pending_position is not None:
+                self.set_position(*self.pending_position)
+
+    def refresh_fx_rates(self):
+        self.scheduler.submit("fx_rates", self.fetch_market_snapshot, True)
+
+    def save_response_cache(self):
+        self.scheduler.submit("response_cache", self.response_cache.save)
+
+    def fetch_news(self, crypto_id, language_code, background=False):
+        news_api_key = self.api_keys.get('newsapi')
+        if not news_api_key and HUB_URL is None:
+            print("NewsAPI.org API key not found.")
+            return []
+
+        url = NEWSAPI_URL
+        params = {
+            "q": crypto_id,
+            "language": language_code,
+            "apiKey": news_api_key,
+        }
+        data = self.make_request(url, params, "news", background)
+        if data and "articles" in data:
+            self.news_source = "NewsAPI.org"
+            return [article["title"] for article in data["articles"]]
+        else:
+            return []
+
+    def fetch_professional_comments(self, crypto_symbol, language_code, background=False):
+        api_key = self.api_keys.get('cryptocompare')
+        if not api_key and HUB_URL is None:
+            print("CryptoCompare API key not found.")
+            return []
+
+        url = CRYPTOCOMPARE_NEWS_URL
+        params = {
+            "categories": crypto_symbol,
+            "lang": language_code,
+            "api_key": api_key,
+        }
+        data = self.make_request(url, params, "professional comments", background)
+        if data and "Data" in data:
+            self.comments_source = "CryptoCompare"
+            return [article["title"] for article in data.get("Data", [])]
+        else:
+            return []
+
+    def make_request(self, url, params, data_type, background=False):
+        key = self.response_cache.make_key(url, params)
+        data, fresh = self.response_cache.get(key, data_type)
+        if data is not None:
+            if not fresh:
+                self.revalidate(key, url, params, data_type)
+            return data
+        data = self.http_client.get_json(url, params, data_type, background)
+        if data is not None:
+            self.response_cache.put(key, data)
+        return data
+
+    def revalidate(self, key, url, params, data_type):
+        with self.revalidating_lock:
+            if key in self.revalidating:
+                return
+            self.revalidating.add(key)
+        self.http_client.submit(self.revalidate_threaded, key, url, params, data_type)
+
+    def revalidate_threaded(self, key, url, params, data_type):
+        data = self.http_client.get_json(url, params, data_type, background=True)
+        if data is not None:
+            self.response_cache.put(key, data)
+        with self.revalidating_lock:
+            self.revalidating.discard(key)
+            done = not self.revalidating
+        if done and data is not None:
+            self.timer.after(0, self.submit_static_data)
 
 class CryptoApp:
-    def __init__(self, root):
+    def __init__(self, root, engine=None, startup=None):
         self.root = root
+        self.startup = startup or StartupTimer()
         self.root.title("Crypto Trading Dashboard")
         self.root.geometry("1600x900")  
         ctk.set_appearance_mode("dark")
@@ -53,33 +3642,32 @@ class CryptoApp:
         self.investment_amount = tk.StringVar(value="1000.0")
         self.purchase_price = tk.StringVar(value="0.0")  
         self.stop_price = tk.StringVar(value="0.0")      
-        self.crypto_data = {}
-        self.price_history = []
-        self.news_items = []
-        self.comments_items = []
-        self.news_source = ""
-        self.comments_source = ""
-        self.selected_language = tk.StringVar(value="🇬🇧 English")
+        self.selected_language = tk.StringVar(value=TRANSLATIONS.get(DEFAULT_LANGUAGE_CODE).name)
         self.selected_currency = tk.StringVar(value="USD")  
         self.price = tk.DoubleVar(value=0.0)
         self.profit_status = tk.StringVar(value="")  
-        self.api_keys = {}
-        self.load_api_keys()
+        self.strings = TRANSLATIONS.get(LANGUAGES[self.selected_language.get()])
+        self.tick_coalescers = {c["symbol"]: TickCoalescer() for c in CRYPTOCURRENCIES}
+        self.chart_mode = tk.StringVar(value=CHART_MODES[0])
+        self.chart = None
+        self.system_panel_built = False
+        self.news_panels_built = False
+        self.engine = engine or CryptoEngine(load_api_keys(), timer=self.root)
+        self.engine.subscribe("tick", self.on_tick)
+        self.engine.subscribe("alert", lambda alert: self.root.after(0, self.show_alert, alert))
+        self.engine.subscribe("market", lambda *args: self.root.after(0, self.update_crypto_data, *args))
+        self.engine.subscribe("news", lambda *args: self.root.after(0, self.update_news_comments, *args))
+        self.scheduler = self.engine.scheduler
+        self.updating_position = False
+        for var in (self.investment_amount, self.purchase_price, self.stop_price):
+            var.trace_add("write", self.on_position_change)
+        self.on_position_change()
         self.build_gui()
-        self.start_websocket()
-        self.update_static_data()
-        self.update_system_resources()
-
-    def load_api_keys(self):
-        if os.path.exists(API_KEYS_FILE):
-            with open(API_KEYS_FILE, "r") as f:
-                self.api_keys = json.load(f)
-            if not self.api_keys.get('newsapi') or not self.api_keys.get('cryptocompare'):
-                print("API keys are missing. Please run 'baslat.bat' and enter your API keys.")
-                exit()
-        else:
-            print("API keys not found. Please run 'baslat.bat' and enter your API keys.")
-            exit()
+        self.startup.mark("controls")
+        self.engine.start()
+        self.startup.mark("engine_started")
+        self.scheduler.every("tick_frame", TICK_FRAME_INTERVAL_MS, self.render_tick_frame)
+        self.root.after_idle(self.build_deferred_panels)
 
     def build_gui(self):
         top_frame = ctk.CTkFrame(self.root)
@@ -99,7 +3687,7 @@ class CryptoApp:
         self.currency_label.grid(row=0, column=2, padx=5, pady=5)
         self.currency_menu = ctk.CTkOptionMenu(
             controls_frame,
-            values=list(CURRENCIES.keys()),
+            values=CURRENCIES,
             command=self.on_currency_change,
             variable=self.selected_currency
         )
@@ -129,8 +3717,56 @@ class CryptoApp:
         self.profit_status_label.grid(row=2, column=0, columnspan=6, padx=5, pady=5)
         for i in range(6):
             controls_frame.grid_columnconfigure(i, weight=1)
-        system_frame = ctk.CTkFrame(self.root, fg_color="#1F1F1F")
-        system_frame.pack(side="left", padx=10, pady=10, fill="y")
+        self.system_frame = ctk.CTkFrame(self.root, fg_color="#1F1F1F")
+        self.system_frame.pack(side="left", padx=10, pady=10, fill="y")
+        self.market_data_frame = ctk.CTkFrame(self.root)
+        self.market_data_frame.pack(pady=10, fill="x", expand=True)
+        self.price_label = ctk.CTkLabel(self.market_data_frame, text="", font=("Arial", 20))
+        self.price_label.pack(pady=5)
+        self.change_label = ctk.CTkLabel(self.market_data_frame, text="", font=("Arial", 16))
+        self.change_label.pack(pady=5)
+        self.market_cap_label = ctk.CTkLabel(self.market_data_frame, text="", font=("Arial", 16))
+        self.market_cap_label.pack(pady=5)
+        self.volume_label = ctk.CTkLabel(self.market_data_frame, text="", font=("Arial", 16))
+        self.volume_label.pack(pady=5)
+        self.profit_label = ctk.CTkLabel(self.market_data_frame, text="", font=("Arial", 20))
+        self.profit_label.pack(pady=5)
+        self.portfolio_label = ctk.CTkLabel(self.market_data_frame, text="", font=("Arial", 16))
+        self.portfolio_label.pack(pady=5)
+        self.alert_label = ctk.CTkLabel(self.market_data_frame, text="", font=("Arial", 16), text_color="orange")
+        self.alert_label.pack(pady=5)
+        self.chart_frame = ctk.CTkFrame(self.root)
+        self.chart_frame.pack(pady=10, fill="both", expand=True)
+        self.news_frame = ctk.CTkFrame(self.root)
+        self.news_frame.pack(pady=10, fill="x")
+        self.comments_frame = ctk.CTkFrame(self.root)
+        self.comments_frame.pack(pady=10, fill="x")
+
+        self.update_interface_language()
+
+    def build_deferred_panels(self):
+        self.startup.mark("first_frame")
+        pending = [
+            builder for builder, built in (
+                (self.ensure_system_panel, self.system_panel_built),
+                (self.ensure_chart, self.chart is not None),
+                (self.ensure_news_panels, self.news_panels_built),
+            )
+            if not built
+        ]
+        if pending:
+            pending[0]()
+            self.root.after_idle(self.build_deferred_panels)
+
+    def ensure_panels(self):
+        self.ensure_system_panel()
+        self.ensure_chart()
+        self.ensure_news_panels()
+
+    def ensure_system_panel(self):
+        if self.system_panel_built:
+            return
+        system_frame = self.system_frame
         self.cpu_label = ctk.CTkLabel(system_frame, text="", anchor="w")
         self.cpu_label.pack(pady=(10, 2), padx=10, fill="x")
         self.cpu_progress = ctk.CTkProgressBar(system_frame, width=200)
@@ -155,41 +3791,36 @@ class CryptoApp:
         self.platform_label.pack(pady=(10, 2), padx=10, fill="x")
         self.cpu_temp_label = ctk.CTkLabel(system_frame, text="", anchor="w")
         self.cpu_temp_label.pack(pady=(10, 2), padx=10, fill="x")
-        self.market_data_frame = ctk.CTkFrame(self.root)
-        self.market_data_frame.pack(pady=10, fill="x", expand=True)
-        self.price_label = ctk.CTkLabel(self.market_data_frame, text="", font=("Arial", 20))
-        self.price_label.pack(pady=5)
-        self.change_label = ctk.CTkLabel(self.market_data_frame, text="", font=("Arial", 16))
-        self.change_label.pack(pady=5)
-        self.market_cap_label = ctk.CTkLabel(self.market_data_frame, text="", font=("Arial", 16))
-        self.market_cap_label.pack(pady=5)
-        self.volume_label = ctk.CTkLabel(self.market_data_frame, text="", font=("Arial", 16))
-        self.volume_label.pack(pady=5)
-        self.profit_label = ctk.CTkLabel(self.market_data_frame, text="", font=("Arial", 20))
-        self.profit_label.pack(pady=5)
-        self.chart_frame = ctk.CTkFrame(self.root)
-        self.chart_frame.pack(pady=10, fill="both", expand=True)
-        self.figure, self.ax = plt.subplots(figsize=(8, 4))
-        self.figure.patch.set_facecolor('#2B2B2B')
-        self.ax.set_facecolor('#2B2B2B')
-        self.ax.tick_params(axis='x', colors='white')
-        self.ax.tick_params(axis='y', colors='white')
-        self.ax.spines['bottom'].set_color('white')
-        self.ax.spines['top'].set_color('white')
-        self.ax.spines['left'].set_color('white')
-        self.ax.spines['right'].set_color('white')
-        self.canvas = FigureCanvasTkAgg(self.figure, master=self.chart_frame)
-        self.canvas.get_tk_widget().pack(fill="both", expand=True)
-        self.news_frame = ctk.CTkFrame(self.root)
-        self.news_frame.pack(pady=10, fill="x")
+        self.system_panel_built = True
+        self.translate_system_panel()
+        self.engine.metrics_collector.start()
+        self.scheduler.every("system_resources", SYSTEM_RESOURCES_REFRESH_MS, self.update_system_resources, run_now=True)
+        self.startup.mark("system_panel")
+
+    def ensure_chart(self):
+        if self.chart is not None:
+            return self.chart
+        self.chart_mode_button = ctk.CTkSegmentedButton(
+            self.chart_frame,
+            values=CHART_MODES,
+            command=self.on_chart_mode_change,
+            variable=self.chart_mode
+        )
+        self.chart_mode_button.pack(pady=5)
+        self.chart = PriceChart(self.chart_frame)
+        self.startup.mark("chart")
+        self.refresh_chart()
+        return self.chart
+
+    def ensure_news_panels(self):
+        if self.news_panels_built:
+            return
         self.news_label = ctk.CTkLabel(self.news_frame, text="", font=("Arial", 18))
         self.news_label.pack(pady=5)
         self.news_source_label = ctk.CTkLabel(self.news_frame, text="", font=("Arial", 12))
         self.news_source_label.pack(pady=5)
         self.news_listbox = tk.Listbox(self.news_frame, height=6, bg='#2B2B2B', fg='white', selectbackground='#1E1E1E')
         self.news_listbox.pack(fill="both", padx=10, pady=5)
-        self.comments_frame = ctk.CTkFrame(self.root)
-        self.comments_frame.pack(pady=10, fill="x")
         self.comments_label = ctk.CTkLabel(self.comments_frame, text="", font=("Arial", 18))
         self.comments_label.pack(pady=5)
         self.comments_source_label = ctk.CTkLabel(self.comments_frame, text="", font=("Arial", 12))
@@ -198,8 +3829,11 @@ class CryptoApp:
             self.comments_frame, height=6, bg='#2B2B2B', fg='white', selectbackground='#1E1E1E'
         )
         self.comments_listbox.pack(fill="both", padx=10, pady=5)
-
-        self.update_interface_language()
+        self.news_panels_built = True
+        self.translate_news_panels()
+        self.update_news()
+        self.update_comments()
+        self.startup.mark("news_panels")
 
     def get_float_value(self, var):
         value = var.get()
@@ -210,830 +3844,432 @@ class CryptoApp:
         except ValueError:
             return 0.0
 
+    def on_position_change(self, *args):
+        if self.updating_position:
+            return
+        self.engine.set_position(
+            self.get_float_value(self.investment_amount),
+            self.get_float_value(self.purchase_price),
+            self.get_float_value(self.stop_price),
+        )
+
     def on_language_change(self, value):
         self.selected_language.set(value)
         self.update_interface_language()
         self.set_default_currency()
-        self.update_static_data()
+        self.select_currency(self.selected_currency.get(), self.strings.code)
 
     def set_default_currency(self):
-        lang_code = LANGUAGES[self.selected_language.get()]
-        for currency, languages in CURRENCIES.items():
-            if lang_code in languages:
-                self.selected_currency.set(currency)
-                break
-        else:
-            self.selected_currency.set("USD")
+        currency = self.strings.currency
+        self.selected_currency.set(currency if currency in CURRENCIES else "USD")
 
     def on_currency_change(self, value):
         self.selected_currency.set(value)
-        self.update_static_data()
+        self.select_currency(value)
+        self.refresh_chart()
+
+    def select_currency(self, currency, language_code=None):
+        previous = self.engine.currency
+        self.engine.select(currency=currency, language_code=language_code)
+        if self.engine.currency != previous:
+            self.show_position()
+
+    def show_position(self):
+        if self.engine.pending_position is not None:
+            self.show_last_price()
+            return
+        rate = self.engine.fx_rate or 1.0
+        currency = self.selected_currency.get()
+        self.updating_position = True
+        try:
+            self.investment_amount.set(f"{self.engine.investment * rate:.8g}")
+            self.purchase_price.set(f"{self.engine.purchase_price * rate:.8g}")
+            self.stop_price.set(f"{self.engine.stop_price * rate:.8g}")
+        finally:
+            self.updating_position = False
+        self.investment_label.configure(text=self.strings.text('investment', currency=currency))
+        self.purchase_label.configure(text=self.strings.text('purchase_price', currency=currency))
+        self.stop_label.configure(text=self.strings.text('stop_price', currency=currency))
+        self.show_last_price()
+
+    def show_last_price(self):
+        last_price = self.current_tick_coalescer().last_price
+        if last_price is not None:
+            self.price.set(last_price * (self.engine.fx_rate or 1.0))
+            self.update_market_data()
 
     def update_interface_language(self):
-        lang_code = LANGUAGES[self.selected_language.get()]
-        translations = {
-            'title': {
-                'en': "Crypto Trading Dashboard",
-                'tr': "Kripto Ticaret Panosu",
-                'fr': "Tableau de Trading Crypto",
-                'de': "Krypto-Handelsübersicht",
-                'es': "Panel de Comercio Cripto",
-                'ru': "Панель Торговли Криптовалютой",
-            },
-            'language': {
-                'en': "Language:",
-                'tr': "Dil Seçimi:",
-                'fr': "Langue:",
-                'de': "Sprache:",
-                'es': "Idioma:",
-                'ru': "Язык:",
-            },
-            'currency': {
-                'en': "Currency:",
-                'tr': "Para Birimi:",
-                'fr': "Devise:",
-                'de': "Währung:",
-                'es': "Moneda:",
-                'ru': "Валюта:",
-            },
-            'cryptocurrency': {
-                'en': "Cryptocurrency:",
-                'tr': "Kripto Para Birimi:",
-                'fr': "Cryptomonnaie:",
-                'de': "Kryptowährung:",
-                'es': "Criptomoneda:",
-                'ru': "Криптовалюта:",
-            },
-            'investment': {
-                'en': "Investment Amount ({currency}):",
-                'tr': "Yatırım Tutarı ({currency}):",
-                'fr': "Montant de l'Investissement ({currency}):",
-                'de': "Investitionsbetrag ({currency}):",
-                'es': "Cantidad de Inversión ({currency}):",
-                'ru': "Сумма Инвестиций ({currency}):",
-            },
-            'purchase_price': {
-                'en': "Purchase Price ({currency}):",
-                'tr': "Satın Alma Fiyatı ({currency}):",
-                'fr': "Prix d'Achat ({currency}):",
-                'de': "Kaufpreis ({currency}):",
-                'es': "Precio de Compra ({currency}):",
-                'ru': "Цена Покупки ({currency}):",
-            },
-            'stop_price': {
-                'en': "Stop-Loss Price ({currency}):",
-                'tr': "Stop-Loss Fiyatı ({currency}):",
-                'fr': "Prix Stop-Loss ({currency}):",
-                'de': "Stop-Loss Preis ({currency}):",
-                'es': "Precio Stop-Loss ({currency}):",
-                'ru': "Цена Stop-Loss ({currency}):",
-            },
-            'profit_status': {
-                'en': "Profit/Loss:",
-                'tr': "Kâr/Zarar:",
-                'fr': "Profit/Perte:",
-                'de': "Gewinn/Verlust:",
-                'es': "Ganancia/Pérdida:",
-                'ru': "Прибыль/Убыток:",
-            },
-            'price_loading': {
-                'en': "Price Loading...",
-                'tr': "Fiyat Yükleniyor...",
-                'fr': "Chargement du Prix...",
-                'de': "Preis wird geladen...",
-                'es': "Cargando Precio...",
-                'ru': "Цена загружается...",
-            },
-            'change_loading': {
-                'en': "24h Change Loading...",
-                'tr': "24s Değişim Yükleniyor...",
-                'fr': "Changement sur 24h en cours...",
-                'de': "24h Änderung wird geladen...",
-                'es': "Cambiando en 24h...",
-                'ru': "Изменение за 24ч загружается...",
-            },
-            'market_cap_loading': {
-                'en': "Market Cap Loading...",
-                'tr': "Piyasa Değeri Yükleniyor...",
-                'fr': "Capitalisation Boursière en cours...",
-                'de': "Marktkapitalisierung wird geladen...",
-                'es': "Cargando Capitalización de Mercado...",
-                'ru': "Рыночная капитализация загружается...",
-            },
-            'volume_loading': {
-                'en': "24h Volume Loading...",
-                'tr': "24s Hacim Yükleniyor...",
-                'fr': "Volume sur 24h en cours...",
-                'de': "24h Volumen wird geladen...",
-                'es': "Cargando Volumen de 24h...",
-                'ru': "Объем за 24ч загружается...",
-            },
-            'profit_loading': {
-                'en': "Profit/Loss Loading...",
-                'tr': "Kâr/Zarar Yükleniyor...",
-                'fr': "Chargement du Profit/Perte...",
-                'de': "Gewinn/Verlust wird geladen...",
-                'es': "Cargando Ganancia/Pérdida...",
-                'ru': "Прибыль/Убыток загружается...",
-            },
-            'latest_news': {
-                'en': "Latest News",
-                'tr': "Son Haberler",
-                'fr': "Dernières Nouvelles",
-                'de': "Neueste Nachrichten",
-                'es': "Últimas Noticias",
-                'ru': "Последние Новости",
-            },
-            'no_news': {
-                'en': "No news available.",
-                'tr': "Haber bulunamadı.",
-                'fr': "Pas de nouvelles disponibles.",
-                'de': "Keine Nachrichten verfügbar.",
-                'es': "No hay noticias disponibles.",
-                'ru': "Новости недоступны.",
-            },
-            'news_source': {
-                'en': "News Source: {source}",
-                'tr': "Haber Kaynağı: {source}",
-                'fr': "Source des Nouvelles: {source}",
-                'de': "Nachrichtenquelle: {source}",
-                'es': "Fuente de Noticias: {source}",
-                'ru': "Источник новостей: {source}",
-            },
-            'professional_comments': {
-                'en': "Professional Comments",
-                'tr': "Profesyonel Yorumlar",
-                'fr': "Commentaires Professionnels",
-                'de': "Professionelle Kommentare",
-                'es': "Comentarios Profesionales",
-                'ru': "Профессиональные Комментарии",
-            },
-            'no_comments': {
-                'en': "No comments available.",
-                'tr': "Yorum bulunamadı.",
-                'fr': "Pas de commentaires disponibles.",
-                'de': "Keine Kommentare verfügbar.",
-                'es': "No hay comentarios disponibles.",
-                'ru': "Комментарии недоступны.",
-            },
-            'comments_source': {
-                'en': "Comments Source: {source}",
-                'tr': "Yorum Kaynağı: {source}",
-                'fr': "Source des Commentaires: {source}",
-                'de': "Kommentarquelle: {source}",
-                'es': "Fuente de Comentarios: {source}",
-                'ru': "Источник комментариев: {source}",
-            },
-            'cpu_usage': {
-                'en': "CPU Usage:",
-                'tr': "CPU Kullanımı:",
-                'fr': "Utilisation du CPU:",
-                'de': "CPU-Auslastung:",
-                'es': "Uso de CPU:",
-                'ru': "Использование CPU:",
-            },
-            'ram_usage': {
-                'en': "RAM Usage:",
-                'tr': "RAM Kullanımı:",
-                'fr': "Utilisation de la RAM:",
-                'de': "RAM-Auslastung:",
-                'es': "Uso de RAM:",
-                'ru': "Использование RAM:",
-            },
-            'disk_usage': {
-                'en': "Disk Usage:",
-                'tr': "Disk Kullanımı:",
-                'fr': "Utilisation du Disque:",
-                'de': "Festplattennutzung:",
-                'es': "Uso del Disco:",
-                'ru': "Использование Диска:",
-            },
-            'platform_info': {
-                'en': "Platform:",
-                'tr': "Platform:",
-                'fr': "Plateforme:",
-                'de': "Plattform:",
-                'es': "Plataforma:",
-                'ru': "Платформа:",
-            },
-            'cpu_freq': {
-                'en': "CPU Frequency:",
-                'tr': "CPU Frekansı:",
-                'fr': "Fréquence du CPU:",
-                'de': "CPU-Frequenz:",
-                'es': "Frecuencia de CPU:",
-                'ru': "Частота CPU:",
-            },
-            'network_usage': {
-                'en': "Network Usage:",
-                'tr': "Ağ Kullanımı:",
-                'fr': "Utilisation du Réseau:",
-                'de': "Netzwerknutzung:",
-                'es': "Uso de Red:",
-                'ru': "Использование Сети:",
-            },
-            'battery_status': {
-                'en': "Battery Status:",
-                'tr': "Batarya Durumu:",
-                'fr': "État de la Batterie:",
-                'de': "Batteriestatus:",
-                'es': "Estado de la Batería:",
-                'ru': "Состояние Батареи:",
-            },
-            'cpu_temp': {
-                'en': "CPU Temperature:",
-                'tr': "CPU Sıcaklığı:",
-                'fr': "Température du CPU:",
-                'de': "CPU-Temperatur:",
-                'es': "Temperatura de CPU:",
-                'ru': "Температура CPU:",
-            },
-            'chart_title': {
-                'en': "{name} Price Chart",
-                'tr': "{name} Fiyat Grafiği",
-                'fr': "Graphique du Prix de {name}",
-                'de': "{name} Preisdiagramm",
-                'es': "Gráfico de Precio de {name}",
-                'ru': "График Цены {name}",
-            },
-            'date': {
-                'en': "Date",
-                'tr': "Tarih",
-                'fr': "Date",
-                'de': "Datum",
-                'es': "Fecha",
-                'ru': "Дата",
-            },
-            'price_currency': {
-                'en': "Price ({currency})",
-                'tr': "Fiyat ({currency})",
-                'fr': "Prix ({currency})",
-                'de': "Preis ({currency})",
-                'es': "Precio ({currency})",
-                'ru': "Цена ({currency})",
-            },
-        }
-        self.root.title(translations['title'][lang_code].format(name=self.crypto_data.get('name', 'Crypto')))
-        self.language_label.configure(text=translations['language'][lang_code])
-        self.currency_label.configure(text=translations['currency'][lang_code])
-        self.crypto_label.configure(text=translations['cryptocurrency'][lang_code])
+        self.strings = TRANSLATIONS.get(LANGUAGES[self.selected_language.get()])
+        self.root.title(self.strings.text('title', name=self.engine.crypto_data.get('name', 'Crypto')))
+        self.language_label.configure(text=self.strings.text('language'))
+        self.currency_label.configure(text=self.strings.text('currency'))
+        self.crypto_label.configure(text=self.strings.text('cryptocurrency'))
         currency = self.selected_currency.get()
-        self.investment_label.configure(text=translations['investment'][lang_code].format(currency=currency))
-        self.purchase_label.configure(text=translations['purchase_price'][lang_code].format(currency=currency))
-        self.stop_label.configure(text=translations['stop_price'][lang_code].format(currency=currency))
-        self.profit_status_label.configure(text=translations['profit_status'][lang_code])
-        self.price_label.configure(text=translations['price_loading'][lang_code])
-        self.change_label.configure(text=translations['change_loading'][lang_code])
-        self.market_cap_label.configure(text=translations['market_cap_loading'][lang_code])
-        self.volume_label.configure(text=translations['volume_loading'][lang_code])
-        self.profit_label.configure(text=translations['profit_loading'][lang_code])
-        self.news_label.configure(text=translations['latest_news'][lang_code])
-        self.comments_label.configure(text=translations['professional_comments'][lang_code])
-        self.cpu_label.configure(text=translations['cpu_usage'][lang_code])
-        self.ram_label.configure(text=translations['ram_usage'][lang_code])
-        self.disk_label.configure(text=translations['disk_usage'][lang_code])
-        self.cpu_freq_label.configure(text=translations['cpu_freq'][lang_code])
-        self.net_sent_label.configure(text=f"{translations['network_usage'][lang_code]} Sent: ")
-        self.net_received_label.configure(text=f"{translations['network_usage'][lang_code]} Received: ")
-        self.battery_label.configure(text=translations['battery_status'][lang_code])
-        self.cpu_temp_label.configure(text=translations['cpu_temp'][lang_code])
-        self.platform_label.configure(text=f"{translations['platform_info'][lang_code]} {platform.system()} {platform.release()}")
-        if self.crypto_data.get('name'):
-            self.ax.set_title(translations['chart_title'][lang_code].format(name=self.crypto_data.get('name', 'Crypto')), color='white')
-            self.ax.set_xlabel(translations['date'][lang_code], color='white')
-            self.ax.set_ylabel(translations['price_currency'][lang_code].format(currency=self.selected_currency.get()), color='white')
-            self.canvas.draw()
+        self.investment_label.configure(text=self.strings.text('investment', currency=currency))
+        self.purchase_label.configure(text=self.strings.text('purchase_price', currency=currency))
+        self.stop_label.configure(text=self.strings.text('stop_price', currency=currency))
+        self.profit_status_label.configure(text=self.strings.text('profit_status'))
+        self.price_label.configure(text=self.strings.text('price_loading'))
+        self.change_label.configure(text=self.strings.text('change_loading'))
+        self.market_cap_label.configure(text=self.strings.text('market_cap_loading'))
+        self.volume_label.configure(text=self.strings.text('volume_loading'))
+        self.profit_label.configure(text=self.strings.text('profit_loading'))
+        self.portfolio_label.configure(text="")
+        self.translate_news_panels()
+        self.translate_system_panel()
+        if self.chart is not None and self.engine.crypto_data.get('name'):
+            self.set_chart_labels()
+
+    def translate_news_panels(self):
+        if not self.news_panels_built:
+            return
+        self.news_label.configure(text=self.strings.text('latest_news'))
+        self.comments_label.configure(text=self.strings.text('professional_comments'))
+
+    def translate_system_panel(self):
+        if not self.system_panel_built:
+            return
+        self.cpu_label.configure(text=self.strings.text('cpu_usage'))
+        self.ram_label.configure(text=self.strings.text('ram_usage'))
+        self.disk_label.configure(text=self.strings.text('disk_usage'))
+        self.cpu_freq_label.configure(text=self.strings.text('cpu_freq'))
+        self.net_sent_label.configure(text=f"{self.strings.text('network_usage')} Sent: ")
+        self.net_received_label.configure(text=f"{self.strings.text('network_usage')} Received: ")
+        self.battery_label.configure(text=self.strings.text('battery_status'))
+        self.cpu_temp_label.configure(text=self.strings.text('cpu_temp'))
+        self.platform_label.configure(text=f"{self.strings.text('platform_info')} {platform.system()} {platform.release()}")
     def on_crypto_change(self, value):
         for crypto in CRYPTOCURRENCIES:
             if crypto["symbol"] == value:
                 self.selected_crypto.set(crypto["id"])
                 self.selected_crypto_symbol.set(crypto["symbol"])
                 break
-        self.crypto_data = {}
-        self.price_history = []
-        self.news_items = []
-        self.comments_items = []
-        self.stop_websocket()
-        self.start_websocket()
-        self.update_static_data()
-    def start_websocket(self):
-        crypto_symbol = self.selected_crypto_symbol.get().lower() + 'usdt'
-        websocket_url = f"wss://stream.binance.com:9443/ws/{crypto_symbol}@trade"
-        self.ws = websocket.WebSocketApp(websocket_url,
-                                         on_message=self.on_message,
-                                         on_error=self.on_error,
-                                         on_close=self.on_close)
-        self.ws_thread = threading.Thread(target=self.ws.run_forever)
-        self.ws_thread.daemon = True
-        self.ws_thread.start()
-    def stop_websocket(self):
-        if hasattr(self, 'ws'):
-            self.ws.close()
-    def on_message(self, ws, message):
-        data = json.loads(message)
-        price = float(data['p'])
-        self.price.set(price)
-        self.root.after(0, self.update_market_data)
-    def on_error(self, ws, error):
-        print(f"WebSocket Error: {error}")
-    def on_close(self, ws, close_status_code, close_msg):
-        print("WebSocket Connection Closed")
-    def fetch_price_history(self, crypto_id):
-        url = f"{COINGECKO_API_URL}/coins/{crypto_id}/market_chart"
-        params = {
-            "vs_currency": self.selected_currency.get().lower(),
-            "days": "30",
-            "interval": "daily",
-        }
-        data = self.make_request(url, params, "price history")
-        return data.get("prices", []) if data else []
-
-    def fetch_static_data_threaded(self, crypto_id, crypto_symbol):
-        crypto_data = self.fetch_crypto_data(crypto_id)
-        price_history = self.fetch_price_history(crypto_id)
-        if crypto_data and price_history:
-            self.root.after(0, self.update_crypto_data, crypto_data, price_history)
-        news_items = self.fetch_news(crypto_id)
-        comments_items = self.fetch_professional_comments(crypto_symbol)
-        self.root.after(0, self.update_news_comments, news_items, comments_items)
-
-    def update_crypto_data(self, crypto_data, price_history):
-        self.crypto_data = crypto_data
-        self.price_history = price_history
-        self.update_chart()
-
-    def update_news_comments(self, news_items, comments_items):
-        self.news_items = news_items
-        self.comments_items = comments_items
-        self.update_news()
-        self.update_comments()
-
-    def update_static_data(self):
-        crypto_id = self.selected_crypto.get()
-        crypto_symbol = self.selected_crypto_symbol.get()
-        threading.Thread(target=self.fetch_static_data_threaded, args=(crypto_id, crypto_symbol)).start()
-        self.root.after(1800000, self.update_static_data)  
+        self.engine.select(self.selected_crypto.get(), self.selected_crypto_symbol.get())
+        tick_coalescer = self.current_tick_coalescer()
+        tick_coalescer.reset()
+        if self.chart_mode.get() in CANDLE_TIMEFRAMES and self.chart is not None:
+            self.chart.clear_candles()
+        self.refresh_chart()
+        self.show_last_price()
 
-    def fetch_crypto_data(self, crypto_id):
-        url = f"{COINGECKO_API_URL}/coins/markets"
-        params = {
-            "vs_currency": self.selected_currency.get().lower(),
-            "ids": crypto_id,
-            "order": "market_cap_desc",
-            "sparkline": False,
-            "price_change_percentage": "1h,24h,7d",
-        }
-        data = self.make_request(url, params, "crypto data")
-        if data and isinstance(data, list) and len(data) > 0:
-            return data[0]
-        else:
-            return None
+    def current_tick_coalescer(self):
+        return self.tick_coalescers[self.selected_crypto_symbol.get()]
 
-    def fetch_news(self, crypto_id):
-        lang_code = LANGUAGES[self.selected_language.get()]
-        news_api_key = self.api_keys.get('newsapi')
-        if not news_api_key:
-            print("NewsAPI.org API key not found.")
-            return []
+    def on_tick(self, symbol, price, quantity, trade_time):
+        self.tick_coalescers[symbol].push(price, quantity)
 
-        url = f"https://newsapi.org/v2/everything"
-        params = {
-            "q": crypto_id,
-            "language": lang_code,
-            "apiKey": news_api_key,
-        }
-        data = self.make_request(url, params, "news")
-        if data and "articles" in data:
-            self.news_source = "NewsAPI.org"
-            return [article["title"] for article in data["articles"]]
+    def show_alert(self, alert):
+        if alert["tag"] == "stop_loss":
+            text = f"{alert['symbol']}: {self.strings.text('stop_loss_triggered')}"
+        elif alert["kind"] == "percent":
+            percent = (alert["price"] / alert["reference"] - 1) * 100
+            text = self.strings.text('alert_percent', symbol=alert["symbol"], percent=percent, price=alert["price"])
+        elif alert["kind"] == "trailing":
+            text = self.strings.text('alert_trailing', symbol=alert["symbol"], price=alert["price"])
+        elif alert["kind"] == "atr_stop":
+            text = self.strings.text('alert_atr_stop', symbol=alert["symbol"], timeframe=alert["timeframe"], price=alert["price"])
+        elif alert["kind"] == "indicator":
+            key = "alert_indicator" if alert["threshold"] is None else "alert_threshold"
+            text = self.strings.text(
+                f"{key}_{alert['direction']}", symbol=alert["symbol"], indicator=INDICATOR_LABELS[alert["indicator"]],
+                timeframe=alert["timeframe"], level=alert["level"], price=alert["price"]
+            )
         else:
-            return []
+            text = self.strings.text(f"alert_{alert['direction']}", symbol=alert["symbol"], level=alert["level"])
+        self.alert_label.configure(text=text)
 
-    def fetch_professional_comments(self, crypto_symbol):
-        api_key = self.api_keys.get('cryptocompare')
-        if not api_key:
-            print("CryptoCompare API key not found.")
-            return []
+    def render_tick_frame(self):
+        tick_coalescer = self.current_tick_coalescer()
+        frame = tick_coalescer.drain()
+        if frame is not None:
+            self.price.set(frame["price"] * (self.engine.fx_rate or 1.0))
+            self.update_market_data()
+            self.startup.mark("first_price")
+            if self.chart_mode.get() in CANDLE_TIMEFRAMES:
+                self.update_live_chart()
+            tick_coalescer.record_render(frame)
+        if self.chart_mode.get() == "depth":
+            self.update_depth_chart()
 
-        url = f"https://min-api.cryptocompare.com/data/v2/news/"
-        params = {
-            "categories": crypto_symbol,
-            "lang": LANGUAGES[self.selected_language.get()],
-            "api_key": api_key,
-        }
-        data = self.make_request(url, params, "professional comments")
-        if data and "Data" in data:
-            self.comments_source = "CryptoCompare"
-            return [article["title"] for article in data.get("Data", [])]
-        else:
-            return []
+    def update_crypto_data(self, crypto_id, currency, crypto_data):
+        if crypto_id != self.engine.crypto_id:
+            return
+        self.update_chart()
 
-    def make_request(self, url, params, data_type):
-        max_retries = 3
-        wait_time = 5
-        for attempt in range(max_retries):
-            try:
-                response = requests.get(url, params=params)
-                if response.status_code == 429:
-                    print(f"Rate limit reached for {data_type}. Waiting...")
-                    time.sleep(wait_time)
-                    wait_time *= 2
-                    continue
-                response.raise_for_status()
-                return response.json()
-            except requests.exceptions.HTTPError as e:
-                print(f"Error fetching {data_type}: {e}")
-                return None
-            except Exception as e:
-                print(f"Error fetching {data_type}: {e}")
-                return None
-        print(f"Failed to fetch {data_type}. Please try again later.")
-        return None
+    def update_news_comments(self, news_items, comments_items):
+        self.update_news()
+        self.update_comments()
 
     def update_market_data(self):
         price = self.price.get()
-        if not self.crypto_data:
+        crypto_data = self.engine.crypto_data
+        if not crypto_data:
             return
 
-        price_change_24h = self.crypto_data.get("price_change_percentage_24h", 0)
-        market_cap = self.crypto_data.get("market_cap", 0)
-        volume = self.crypto_data.get("total_volume", 0)
+        price_change_24h = crypto_data.get("price_change_percentage_24h", 0)
+        market_cap = crypto_data.get("market_cap", 0)
+        volume = crypto_data.get("total_volume", 0)
 
         currency = self.selected_currency.get()
-        lang_code = LANGUAGES[self.selected_language.get()]
-        translations = {
-            'price': {
-                'en': f"Price: {currency} {price:,.2f}",
-                'tr': f"Fiyat: {price:,.2f} {currency}",
-                'fr': f"Prix: {price:,.2f} {currency}",
-                'de': f"Preis: {price:,.2f} {currency}",
-                'es': f"Precio: {price:,.2f} {currency}",
-                'ru': f"Цена: {price:,.2f} {currency}",
-            },
-            'change': {
-                'en': f"24h Change: {price_change_24h:+.2f}%",
-                'tr': f"24s Değişim: {price_change_24h:+.2f}%",
-                'fr': f"Changement 24h: {price_change_24h:+.2f}%",
-                'de': f"24h Änderung: {price_change_24h:+.2f}%",
-                'es': f"Cambio 24h: {price_change_24h:+.2f}%",
-                'ru': f"Изменение за 24ч: {price_change_24h:+.2f}%",
-            },
-            'market_cap': {
-                'en': f"Market Cap: {currency} {market_cap:,.0f}",
-                'tr': f"Piyasa Değeri: {market_cap:,.0f} {currency}",
-                'fr': f"Capitalisation Boursière: {market_cap:,.0f} {currency}",
-                'de': f"Marktkapitalisierung: {market_cap:,.0f} {currency}",
-                'es': f"Capitalización de Mercado: {market_cap:,.0f} {currency}",
-                'ru': f"Рыночная Капитализация: {market_cap:,.0f} {currency}",
-            },
-            'volume': {
-                'en': f"24h Volume: {currency} {volume:,.0f}",
-                'tr': f"24s Hacim: {volume:,.0f} {currency}",
-                'fr': f"Volume 24h: {volume:,.0f} {currency}",
-                'de': f"24h Volumen: {volume:,.0f} {currency}",
-                'es': f"Volumen 24h: {volume:,.0f} {currency}",
-                'ru': f"Объем за 24ч: {volume:,.0f} {currency}",
-            },
-            'profit_loss': {
-                'en': f"Profit/Loss: {currency} {self.calculate_profit(price):+.2f}",
-                'tr': f"Kâr/Zarar: {self.calculate_profit(price):+.2f} {currency}",
-                'fr': f"Profit/Perte: {self.calculate_profit(price):+.2f} {currency}",
-                'de': f"Gewinn/Verlust: {self.calculate_profit(price):+.2f} {currency}",
-                'es': f"Ganancia/Pérdida: {self.calculate_profit(price):+.2f} {currency}",
-                'ru': f"Прибыль/Убыток: {self.calculate_profit(price):+.2f} {currency}",
-            },
-        }
+        fx_rate = self.engine.fx_rate
+        if fx_rate is None:
+            return
+        profit_loss = self.engine.portfolio.summary(self.selected_crypto_symbol.get())["unrealized_pnl"] * fx_rate
+        totals = self.engine.portfolio.totals()
 
-        self.price_label.configure(text=translations['price'][lang_code])
-        self.change_label.configure(text=translations['change'][lang_code])
-        self.market_cap_label.configure(text=translations['market_cap'][lang_code])
-        self.volume_label.configure(text=translations['volume'][lang_code])
-        self.profit_label.configure(text=translations['profit_loss'][lang_code])
+        self.price_label.configure(text=self.strings.text('price', currency=currency, price=price))
+        self.change_label.configure(text=self.strings.text('change', change=price_change_24h))
+        self.market_cap_label.configure(text=self.strings.text('market_cap', currency=currency, market_cap=market_cap))
+        self.volume_label.configure(text=self.strings.text('volume', currency=currency, volume=volume))
+        self.profit_label.configure(text=self.strings.text('profit_loss', currency=currency, profit_loss=profit_loss))
+        self.portfolio_label.configure(text=self.strings.text(
+            'portfolio', currency=currency, exposure=totals["exposure"] * fx_rate, profit_loss=totals["unrealized_pnl"] * fx_rate
+        ))
         self.update_profit_status(price)
 
-    def calculate_profit(self, current_price):
-        investment = self.get_float_value(self.investment_amount)
-        purchase_price = self.get_float_value(self.purchase_price)
-        if purchase_price == 0:
-            return 0
-        crypto_amount = investment / purchase_price
-        current_value = crypto_amount * current_price
-        profit = current_value - investment
-        return profit
-
     def update_profit_status(self, current_price):
-        purchase_price = self.get_float_value(self.purchase_price)
-        stop_price = self.get_float_value(self.stop_price)
-        lang_code = LANGUAGES[self.selected_language.get()]
-        translations = {
-            'profit': {
-                'en': "Profit",
-                'tr': "Kâr",
-                'fr': "Profit",
-                'de': "Gewinn",
-                'es': "Ganancia",
-                'ru': "Прибыль",
-            },
-            'loss': {
-                'en': "Loss",
-                'tr': "Zarar",
-                'fr': "Perte",
-                'de': "Verlust",
-                'es': "Pérdida",
-                'ru': "Убыток",
-            },
-            'stop_loss_triggered': {
-                'en': "Stop-Loss Triggered",
-                'tr': "Stop-Loss Tetiklendi",
-                'fr': "Stop-Loss Déclenché",
-                'de': "Stop-Loss Ausgelöst",
-                'es': "Stop-Loss Activado",
-                'ru': "Стоп-лосс Сработал",
-            },
-        }
+        purchase_price = self.engine.purchase_price * (self.engine.fx_rate or 1.0)
 
         if purchase_price == 0:
             status = ""
             color = "white"
         else:
             if current_price >= purchase_price:
-                status = translations['profit'][lang_code]
+                status = self.strings.text('profit')
                 color = "green"
-            elif current_price <= stop_price and stop_price > 0:
-                status = translations['stop_loss_triggered'][lang_code]
+            elif self.engine.stop_triggered:
+                status = self.strings.text('stop_loss_triggered')
                 color = "red"
             else:
-                status = translations['loss'][lang_code]
+                status = self.strings.text('loss')
                 color = "red"
 
         self.profit_status.set(status)
         self.profit_status_label.configure(text=status, text_color=color)
 
     def update_chart(self):
-        if not self.price_history:
+        days = HISTORY_RANGES.get(self.chart_mode.get())
+        if days is None:
             return
+        start_ms = int(time.time() * 1000) - days * DAY_MS
+        timestamps, prices = self.engine.price_history_store.downsample(
+            self.engine.crypto_id, QUOTE_CURRENCY, PRICE_CHART_MAX_POINTS, start_ms
+        )
+        prices = self.engine.fx.convert(prices, self.engine.currency)
+        if not len(timestamps) or prices is None:
+            return
+        overlay = self.engine.history_overlays.get(self.engine.crypto_id)
+        if overlay is not None:
+            start = int(np.searchsorted(overlay[0], start_ms))
+            step = max(-(-(len(overlay[0]) - start) // PRICE_CHART_MAX_POINTS), 1)
+            x, ema, upper, lower = (column[start::step] for column in overlay)
+            rate = self.engine.fx.rate(self.engine.currency)
+            overlay = (epoch_ms_to_num(x), ema * rate, upper * rate, lower * rate)
 
-        dates = [datetime.datetime.fromtimestamp(d[0]/1000) for d in self.price_history]
-        prices = [d[1] for d in self.price_history]
-
-        self.ax.clear()
-        self.ax.plot(dates, prices, label='Price', color='cyan')
+        self.ensure_chart()
+        self.set_chart_labels()
+        self.chart.set_history(epoch_ms_to_num(timestamps), prices, overlay)
 
-        lang_code = LANGUAGES[self.selected_language.get()]
+    def set_chart_labels(self):
         currency = self.selected_currency.get()
-        translations = {
-            'chart_title': {
-                'en': "{name} Price Chart",
-                'tr': "{name} Fiyat Grafiği",
-                'fr': "Graphique du Prix de {name}",
-                'de': "{name} Preisdiagramm",
-                'es': "Gráfico de Precio de {name}",
-                'ru': "График Цены {name}",
-            },
-            'date': {
-                'en': "Date",
-                'tr': "Tarih",
-                'fr': "Date",
-                'de': "Datum",
-                'es': "Fecha",
-                'ru': "Дата",
-            },
-            'price_currency': {
-                'en': "Price ({currency})",
-                'tr': "Fiyat ({currency})",
-                'fr': "Prix ({currency})",
-                'de': "Preis ({currency})",
-                'es': "Precio ({currency})",
-                'ru': "Цена ({currency})",
-            },
-        }
+        self.chart.set_labels(
+            self.strings.text('chart_title', name=self.engine.crypto_data.get('name', 'Crypto')),
+            self.strings.text('date'),
+            self.strings.text('price_currency', currency=currency),
+        )
+
+    def on_chart_mode_change(self, value):
+        self.chart_mode.set(value)
+        self.refresh_chart()
 
-        self.ax.set_title(translations['chart_title'][lang_code].format(name=self.crypto_data.get('name', 'Crypto')), color='white')
-        self.ax.set_xlabel(translations['date'][lang_code], color='white')
-        self.ax.set_ylabel(translations['price_currency'][lang_code].format(currency=currency), color='white')
+    def refresh_chart(self):
+        mode = self.chart_mode.get()
+        if mode in HISTORY_RANGES:
+            self.update_chart()
+        elif mode == "depth":
+            self.update_depth_chart(force=True)
+        else:
+            self.update_live_chart()
 
-        self.ax.legend()
-        self.ax.grid(True, linestyle='--', alpha=0.5)
+    def update_depth_chart(self, force=False):
+        book = self.engine.order_books[self.selected_crypto_symbol.get()]
+        sides = book.take_changes(DEPTH_CHART_LEVELS)
+        if force:
+            sides = {"bids", "asks"}
+        if not sides:
+            return
+        bid_prices, bid_depth, ask_prices, ask_depth = book.cumulative_depth(DEPTH_CHART_LEVELS)
+        fx_rate = self.engine.fx_rate or 1.0
+        spread = book.spread()
+        spread_text = "" if spread is None else self.strings.text(
+            'spread', spread=spread["spread"] * fx_rate, spread_bps=spread["spread_bps"]
+        )
+        self.ensure_chart()
+        self.chart.set_depth_labels(
+            self.strings.text('depth_chart_title', name=self.engine.crypto_data.get('name', 'Crypto')),
+            self.strings.text('price_currency', currency=self.selected_currency.get()),
+            self.strings.text('cumulative_quantity'),
+        )
+        self.chart.update_depth(bid_prices * fx_rate, bid_depth, ask_prices * fx_rate, ask_depth, sides, spread_text)
 
-        self.ax.tick_params(axis='x', colors='white')
-        self.ax.tick_params(axis='y', colors='white')
-        self.ax.spines['bottom'].set_color('white')
-        self.ax.spines['top'].set_color('white')
-        self.ax.spines['left'].set_color('white')
-        self.ax.spines['right'].set_color('white')
+    def update_live_chart(self):
+        timeframe = self.chart_mode.get()
+        aggregator = self.engine.candle_aggregators[self.selected_crypto_symbol.get()]
+        candles = aggregator.get_candles(timeframe, LIVE_CHART_WINDOW)
+        overlay = aggregator.get_overlay(timeframe, LIVE_CHART_WINDOW)
+        values = aggregator.indicator_values(timeframe)
+        fx_rate = self.engine.fx_rate or 1.0
+        if fx_rate != 1.0:
+            candles = [[start, o * fx_rate, h * fx_rate, l * fx_rate, c * fx_rate, v] for start, o, h, l, c, v in candles]
+            overlay[:, 1:] *= fx_rate
+        overlay = (epoch_ms_to_num(overlay[:, 0] * 1000), overlay[:, 1], overlay[:, 3], overlay[:, 4])
+        self.ensure_chart()
+        self.set_chart_labels()
+        self.chart.update_candles(candles, CANDLE_TIMEFRAMES[timeframe], overlay, self.format_indicators(values, fx_rate))
 
-        self.figure.autofmt_xdate()
-        self.canvas.draw()
+    def format_indicators(self, values, fx_rate):
+        parts = []
+        if values.get("rsi") is not None:
+            parts.append(f"{INDICATOR_LABELS['rsi']}: {values['rsi']:.1f}")
+        if values.get("atr") is not None:
+            parts.append(f"{INDICATOR_LABELS['atr']}: {values['atr'] * fx_rate:,.2f}")
+        if values.get("vwap") is not None:
+            parts.append(f"{INDICATOR_LABELS['vwap']}: {values['vwap'] * fx_rate:,.2f}")
+        return "   ".join(parts)
 
     def update_news(self):
+        if not self.news_panels_built:
+            return self.ensure_news_panels()
         self.news_listbox.delete(0, tk.END)
-        lang_code = LANGUAGES[self.selected_language.get()]
-        translations = {
-            'no_news': {
-                'en': "No news available.",
-                'tr': "Haber bulunamadı.",
-                'fr': "Pas de nouvelles disponibles.",
-                'de': "Keine Nachrichten verfügbar.",
-                'es': "No hay noticias disponibles.",
-                'ru': "Новости недоступны.",
-            },
-            'news_source': {
-                'en': "News Source: {source}",
-                'tr': "Haber Kaynağı: {source}",
-                'fr': "Source des Nouvelles: {source}",
-                'de': "Nachrichtenquelle: {source}",
-                'es': "Fuente de Noticias: {source}",
-                'ru': "Источник новостей: {source}",
-            },
-        }
-
-        if self.news_items:
-            for news in self.news_items[:5]:
+        if self.engine.news_items:
+            for news in self.engine.news_items[:5]:
                 self.news_listbox.insert(tk.END, news)
         else:
-            self.news_listbox.insert(tk.END, translations['no_news'][lang_code])
+            self.news_listbox.insert(tk.END, self.strings.text('no_news'))
 
-        if self.news_source:
-            self.news_source_label.configure(text=translations['news_source'][lang_code].format(source=self.news_source))
+        if self.engine.news_source:
+            self.news_source_label.configure(text=self.strings.text('news_source', source=self.engine.news_source))
         else:
             self.news_source_label.configure(text="")
 
     def update_comments(self):
+        if not self.news_panels_built:
+            return self.ensure_news_panels()
         self.comments_listbox.delete(0, tk.END)
-        lang_code = LANGUAGES[self.selected_language.get()]
-        translations = {
-            'no_comments': {
-                'en': "No comments available.",
-                'tr': "Yorum bulunamadı.",
-                'fr': "Pas de commentaires disponibles.",
-                'de': "Keine Kommentare verfügbar.",
-                'es': "No hay comentarios disponibles.",
-                'ru': "Комментарии недоступны.",
-            },
-            'comments_source': {
-                'en': "Comments Source: {source}",
-                'tr': "Yorum Kaynağı: {source}",
-                'fr': "Source des Commentaires: {source}",
-                'de': "Kommentarquelle: {source}",
-                'es': "Fuente de Comentarios: {source}",
-                'ru': "Источник комментариев: {source}",
-            },
-        }
-
-        if self.comments_items:
-            for comment in self.comments_items[:5]:
+        if self.engine.comments_items:
+            for comment in self.engine.comments_items[:5]:
                 self.comments_listbox.insert(tk.END, comment)
         else:
-            self.comments_listbox.insert(tk.END, translations['no_comments'][lang_code])
+            self.comments_listbox.insert(tk.END, self.strings.text('no_comments'))
 
-        if self.comments_source:
+        if self.engine.comments_source:
             self.comments_source_label.configure(
-                text=translations['comments_source'][lang_code].format(source=self.comments_source)
+                text=self.strings.text('comments_source', source=self.engine.comments_source)
             )
         else:
             self.comments_source_label.configure(text="")
 
     def update_system_resources(self):
-        lang_code = LANGUAGES[self.selected_language.get()]
-        translations = {
-            'cpu_usage': {
-                'en': "CPU Usage:",
-                'tr': "CPU Kullanımı:",
-                'fr': "Utilisation du CPU:",
-                'de': "CPU-Auslastung:",
-                'es': "Uso de CPU:",
-                'ru': "Использование CPU:",
-            },
-            'ram_usage': {
-                'en': "RAM Usage:",
-                'tr': "RAM Kullanımı:",
-                'fr': "Utilisation de la RAM:",
-                'de': "RAM-Auslastung:",
-                'es': "Uso de RAM:",
-                'ru': "Использование RAM:",
-            },
-            'disk_usage': {
-                'en': "Disk Usage:",
-                'tr': "Disk Kullanımı:",
-                'fr': "Utilisation du Disque:",
-                'de': "Festplattennutzung:",
-                'es': "Uso del Disco:",
-                'ru': "Использование Диска:",
-            },
-            'platform_info': {
-                'en': "Platform:",
-                'tr': "Platform:",
-                'fr': "Plateforme:",
-                'de': "Plattform:",
-                'es': "Plataforma:",
-                'ru': "Платформа:",
-            },
-            'cpu_freq': {
-                'en': "CPU Frequency:",
-                'tr': "CPU Frekansı:",
-                'fr': "Fréquence du CPU:",
-                'de': "CPU-Frequenz:",
-                'es': "Frecuencia de CPU:",
-                'ru': "Частота CPU:",
-            },
-            'network_usage': {
-                'en': "Network Usage:",
-                'tr': "Ağ Kullanımı:",
-                'fr': "Utilisation du Réseau:",
-                'de': "Netzwerknutzung:",
-                'es': "Uso de Red:",
-                'ru': "Использование Сети:",
-            },
-            'battery_status': {
-                'en': "Battery Status:",
-                'tr': "Batarya Durumu:",
-                'fr': "État de la Batterie:",
-                'de': "Batteriestatus:",
-                'es': "Estado de la Batería:",
-                'ru': "Состояние Батареи:",
-            },
-            'cpu_temp': {
-                'en': "CPU Temperature:",
-                'tr': "CPU Sıcaklığı:",
-                'fr': "Température du CPU:",
-                'de': "CPU-Temperatur:",
-                'es': "Temperatura de CPU:",
-                'ru': "Температура CPU:",
-            },
-        }
-
-        cpu_percent = psutil.cpu_percent(interval=1)
-        self.cpu_progress.set(cpu_percent / 100)
-        self.cpu_label.configure(text=f"{translations['cpu_usage'][lang_code]} {cpu_percent}%")
+        if not self.system_panel_built:
+            return
+        snapshot = self.engine.metrics_collector.snapshot
+        self.cpu_progress.set(snapshot.cpu_percent / 100)
+        self.cpu_label.configure(text=f"{self.strings.text('cpu_usage')} {snapshot.cpu_percent}%")
 
-        ram_percent = psutil.virtual_memory().percent
-        self.ram_progress.set(ram_percent / 100)
-        self.ram_label.configure(text=f"{translations['ram_usage'][lang_code]} {ram_percent}%")
+        self.ram_progress.set(snapshot.ram_percent / 100)
+        self.ram_label.configure(text=f"{self.strings.text('ram_usage')} {snapshot.ram_percent}%")
 
-        disk_percent = psutil.disk_usage('/').percent
-        self.disk_progress.set(disk_percent / 100)
-        self.disk_label.configure(text=f"{translations['disk_usage'][lang_code]} {disk_percent}%")
+        self.disk_progress.set(snapshot.disk_percent / 100)
+        self.disk_label.configure(text=f"{self.strings.text('disk_usage')} {snapshot.disk_percent}%")
 
-        cpu_freq = psutil.cpu_freq()
-        if cpu_freq:
-            current_freq = cpu_freq.current
-            max_freq = cpu_freq.max
-            self.cpu_freq_label.configure(text=f"{translations['cpu_freq'][lang_code]} {current_freq:.2f} MHz (Max: {max_freq:.2f} MHz)")
+        if snapshot.cpu_freq_current is not None:
+            self.cpu_freq_label.configure(text=f"{self.strings.text('cpu_freq')} {snapshot.cpu_freq_current:.2f} MHz (Max: {snapshot.cpu_freq_max:.2f} MHz)")
         else:
-            self.cpu_freq_label.configure(text=f"{translations['cpu_freq'][lang_code]} N/A")
+            self.cpu_freq_label.configure(text=f"{self.strings.text('cpu_freq')} N/A")
 
-        net_io = psutil.net_io_counters()
-        sent_mb = net_io.bytes_sent / (1024 * 1024)
-        recv_mb = net_io.bytes_recv / (1024 * 1024)
-        self.net_sent_label.configure(text=f"{translations['network_usage'][lang_code]} Sent: {sent_mb:.2f} MB")
-        self.net_received_label.configure(text=f"{translations['network_usage'][lang_code]} Received: {recv_mb:.2f} MB")
-
-        if hasattr(psutil, "sensors_battery"):
-            battery = psutil.sensors_battery()
-            if battery:
-                percent = battery.percent
-                plugged = battery.power_plugged
-                status = "Plugged In" if plugged else "On Battery"
-                if lang_code == 'tr':
-                    status = "Şarjda" if plugged else "Pil Üzerinde"
-                elif lang_code == 'fr':
-                    status = "Branché" if plugged else "Sur Batterie"
-                elif lang_code == 'de':
-                    status = "Eingesteckt" if plugged else "Am Akku"
-                elif lang_code == 'es':
-                    status = "Conectado" if plugged else "En Batería"
-                elif lang_code == 'ru':
-                    status = "В сети" if plugged else "От батареи"
-                self.battery_label.configure(text=f"{translations['battery_status'][lang_code]} {percent}% ({status})")
-            else:
-                self.battery_label.configure(text=f"{translations['battery_status'][lang_code]} N/A")
+        self.net_sent_label.configure(text=f"{self.strings.text('network_usage')} Sent: {snapshot.net_sent_mb:.2f} MB ({snapshot.net_sent_rate:.1f} KB/s)")
+        self.net_received_label.configure(text=f"{self.strings.text('network_usage')} Received: {snapshot.net_recv_mb:.2f} MB ({snapshot.net_recv_rate:.1f} KB/s)")
+
+        if snapshot.battery_percent is not None:
+            status = self.strings.text('plugged_in' if snapshot.battery_plugged else 'on_battery')
+            self.battery_label.configure(text=f"{self.strings.text('battery_status')} {snapshot.battery_percent}% ({status})")
         else:
-            self.battery_label.configure(text=f"{translations['battery_status'][lang_code]} N/A")
-        temps = {}
-        try:
-            temps = psutil.sensors_temperatures()
-        except AttributeError:
-            pass  
-        if temps:
-            cpu_temps = temps.get('coretemp') or temps.get('cpu-thermal') or []
-            if cpu_temps:
-                temp_values = [t.current for t in cpu_temps if t.current is not None]
-                if temp_values:
-                    avg_temp = sum(temp_values) / len(temp_values)
-                    self.cpu_temp_label.configure(text=f"{translations['cpu_temp'][lang_code]} {avg_temp:.1f}°C")
-                else:
-                    self.cpu_temp_label.configure(text=f"{translations['cpu_temp'][lang_code]} N/A")
-            else:
-                self.cpu_temp_label.configure(text=f"{translations['cpu_temp'][lang_code]} N/A")
+            self.battery_label.configure(text=f"{self.strings.text('battery_status')} N/A")
+
+        if snapshot.cpu_temp is not None:
+            self.cpu_temp_label.configure(text=f"{self.strings.text('cpu_temp')} {snapshot.cpu_temp:.1f}°C")
         else:
-            self.cpu_temp_label.configure(text=f"{translations['cpu_temp'][lang_code]} N/A")
+            self.cpu_temp_label.configure(text=f"{self.strings.text('cpu_temp')} N/A")
+
+def configure_engine(engine, args):
+    if args.replay:
+        engine.replayer = TickReplayer(args.replay, speed=args.speed)
+    elif args.record:
+        recorder = TickRecorder(args.record)
+        engine.subscribe("tick", recorder.record_tick)
+        engine.scheduler.every("tick_record_flush", TICK_RECORD_FLUSH_MS, recorder.flush)
+        engine.recorder = recorder
+    if args.serve:
+        host, _, port = args.serve.rpartition(":")
+        engine.hub = FanoutServer(engine, host or HUB_HOST, int(port)).start()
+    return engine
 
-        self.root.after(2000, self.update_system_resources)  
+def run_headless(args):
+    engine = configure_engine(CryptoEngine(load_api_keys(required=not args.connect)), args)
+    engine.subscribe("market", lambda crypto_id, currency, data: print(
+        f"{data.get('name', crypto_id)}: {data.get('current_price')} {currency} "
+        f"({data.get('price_change_percentage_24h', 0):+.2f}%)"
+    ))
+    engine.subscribe("alert", lambda alert: print(
+        f"Alert {alert['id']}: {alert['symbol']} {alert['kind']} at {alert['price']:,.2f} "
+        f"({alert['exchange_to_fire_ms']:.0f} ms after the trade)"
+    ))
+    engine.subscribe("news", lambda news_items, comments_items: print(
+        f"News: {len(news_items)}, Comments: {len(comments_items)}"
+    ))
+    engine.subscribe("metrics", lambda snapshot: print(
+        f"{engine.crypto_symbol}: {engine.prices.get(engine.crypto_symbol, 0.0):,.2f} USDT | "
+        f"CPU {snapshot.cpu_percent}% RAM {snapshot.ram_percent}%"
+    ))
+    engine.start()
+    engine.metrics_collector.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        engine.stop()
+        if engine.recorder is not None:
+            engine.recorder.close()
 
 def main():
+    parser = argparse.ArgumentParser(description="Crypto Trading Dashboard")
+    parser.add_argument("--headless", action="store_true", help="run the data engine without the GUI")
+    parser.add_argument("--record", nargs="?", const=TICK_RECORD_DIR, help="record live ticks to this directory")
+    parser.add_argument("--replay", nargs="?", const=TICK_RECORD_DIR, help="replay recorded ticks instead of connecting")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier, 0 for as fast as possible")
+    parser.add_argument("--startup-timing", action="store_true", help="print a startup timing breakdown")
+    parser.add_argument("--serve", nargs="?", const=f"{HUB_HOST}:{HUB_PORT}",
+                        help="re-publish ticks, candles and market data to local subscribers on HOST:PORT")
+    parser.add_argument("--connect", help="take all data from a dashboard started with --serve at this URL")
+    args = parser.parse_args()
+    if args.connect:
+        use_hub(args.connect)
+    if args.headless:
+        run_headless(args)
+        return
+    startup = StartupTimer(verbose=args.startup_timing)
+    startup.mark("imports")
     root = ctk.CTk()
-    app = CryptoApp(root)
+    startup.mark("window")
+    engine = configure_engine(CryptoEngine(load_api_keys(required=not args.connect), timer=root), args)
+    startup.mark("engine")
+    app = CryptoApp(root, engine, startup)
     root.mainloop()
+    engine.response_cache.save()
+    if engine.hub is not None:
+        engine.hub.close()
+    if engine.recorder is not None:
+        engine.recorder.close()
 
 if __name__ == "__main__":
     main()